@@ -0,0 +1,359 @@
+"""对局库：流式导入棋谱，按局面键建立内存映射索引
+
+导入时逐局读取PGN棋谱（ICCS记谱），用Board校验并重演每一步，把每个局面的
+(局面键, 对局编号, 步数, 下一步走法)写入有界大小的临时分段，分段排序后再
+多路归并为按局面键排序的定长记录文件。查询时只需内存映射并二分查找，
+打开对局库不会读取整个文件。
+
+对局库目录结构：
+    positions.bin  文件头 + 按局面键排序的定长局面记录
+    games.idx      每局一条：对局信息在games.jsonl中的偏移和比赛结果
+    games.jsonl    每局一行：棋谱头信息和ICCS走法
+
+用法：
+    python -m chess.archive import -o games.db games/*.pgn
+    python -m chess.archive query games.db --fen "<FEN>"
+"""
+import argparse
+import heapq
+import json
+import mmap
+import os
+import re
+import struct
+import sys
+from dataclasses import dataclass
+from functools import partial
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from .board import Board, encode_move, decode_move
+from .notation import iccs_to_move, move_to_iccs
+from .piece import Position
+
+Move = Tuple[Position, Position]
+
+POSITIONS_FILE = "positions.bin"
+GAMES_INDEX_FILE = "games.idx"
+GAMES_FILE = "games.jsonl"
+
+_MAGIC = b"XQARCH01"
+# 局面记录：局面键、对局编号、步数、下一步走法（0表示对局在此结束）。
+# 使用大端序，按字节比较即按(局面键, 对局编号, 步数)排序
+_POSITION_RECORD = struct.Struct(">QIHH")
+_GAME_ENTRY = struct.Struct(">QB")  # games.jsonl中的偏移、比赛结果
+NO_MOVE = 0
+
+# 比赛结果编码
+RESULT_UNKNOWN, RESULT_RED_WIN, RESULT_DRAW, RESULT_BLACK_WIN = range(4)
+_RESULT_CODES = {"1-0": RESULT_RED_WIN, "1/2-1/2": RESULT_DRAW, "0-1": RESULT_BLACK_WIN}
+
+_HEADER_PATTERN = re.compile(r'\[(\w+)\s+"(.*)"\]')
+_TOKEN_PATTERN = re.compile(r'[{}()]|;.*|[^\s{}();]+')
+_MOVE_NUMBER_PATTERN = re.compile(r'^\d+\.+')
+_RESULTS = {"1-0", "0-1", "1/2-1/2", "*"}
+
+def read_pgn_games(lines: Iterable[str]) -> Iterator[Tuple[Dict[str, str], List[str]]]:
+    """逐局解析PGN文本，产生(头信息, 走法列表)；注释、变着和评注符号会被忽略"""
+    headers: Dict[str, str] = {}
+    moves: List[str] = []
+    in_moves = False
+    depth = 0  # 注释{}和变着()的嵌套深度
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        if depth == 0 and line.startswith('['):
+            match = _HEADER_PATTERN.match(line)
+            if match:
+                if in_moves:
+                    yield headers, moves
+                    headers, moves, in_moves = {}, [], False
+                headers[match.group(1)] = match.group(2)
+                continue
+        in_moves = True
+        for token in _TOKEN_PATTERN.findall(line):
+            if token in ('{', '('):
+                depth += 1
+            elif token in ('}', ')'):
+                depth = max(depth - 1, 0)
+            elif depth or token.startswith(';') or token.startswith('$'):
+                continue
+            elif token in _RESULTS:
+                headers.setdefault("Result", token)
+                yield headers, moves
+                headers, moves, in_moves = {}, [], False
+            else:
+                token = _MOVE_NUMBER_PATTERN.sub('', token).rstrip('!?+#')
+                if token:
+                    moves.append(token)
+    if in_moves or headers:
+        yield headers, moves
+
+@dataclass
+class ImportStats:
+    """导入统计"""
+    games: int = 0
+    positions: int = 0
+    skipped: int = 0  # 含非法走法而被跳过的对局数
+
+@dataclass
+class MoveStat:
+    """某个局面下一步走法的统计"""
+    move: Move
+    count: int
+    red_wins: int = 0
+    draws: int = 0
+    black_wins: int = 0
+
+def replay_game(moves: List[str], fen: Optional[str] = None) -> Optional[List[Tuple[int, int]]]:
+    """用Board校验并重演一局，返回每个局面的(局面键, 下一步走法编码)；有非法走法时返回None"""
+    try:
+        board = Board.from_fen(fen) if fen else Board()
+        positions = []
+        for text in moves:
+            from_pos, to_pos = iccs_to_move(text)
+            piece = board.get_piece_at(from_pos)
+            if piece is None or piece.color != board.side_to_move:
+                return None
+            key = board.zobrist_key
+            success, _ = board.move_piece(from_pos, to_pos)
+            if not success:
+                return None
+            positions.append((key, encode_move(from_pos, to_pos)))
+    except ValueError:
+        return None
+    positions.append((board.zobrist_key, NO_MOVE))
+    return positions
+
+class ArchiveImporter:
+    """把对局流式写入对局库目录，内存中最多保留chunk_size条局面记录"""
+
+    def __init__(self, path: str, chunk_size: int = 1_000_000):
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.chunk_size = chunk_size
+        self.stats = ImportStats()
+        self._buffer: List[bytes] = []
+        self._runs: List[str] = []
+        self._games = open(os.path.join(path, GAMES_FILE), 'wb')
+        self._games_index = open(os.path.join(path, GAMES_INDEX_FILE), 'wb')
+
+    def __enter__(self) -> 'ArchiveImporter':
+        return self
+
+    def __exit__(self, exc_type, *exc_info):
+        if exc_type is None:
+            self.finish()
+        else:
+            self._close()
+
+    def add_game(self, headers: Dict[str, str], moves: List[str]) -> bool:
+        """校验并加入一局，返回是否成功"""
+        positions = replay_game(moves, headers.get("FEN"))
+        if positions is None:
+            self.stats.skipped += 1
+            return False
+        game_id = self.stats.games
+        self.stats.games += 1
+        self.stats.positions += len(positions)
+
+        result = _RESULT_CODES.get(headers.get("Result", ""), RESULT_UNKNOWN)
+        self._games_index.write(_GAME_ENTRY.pack(self._games.tell(), result))
+        record = {'headers': headers, 'moves': ' '.join(move.lower().replace('-', '') for move in moves)}
+        self._games.write(json.dumps(record, ensure_ascii=False).encode('utf-8') + b'\n')
+
+        pack = _POSITION_RECORD.pack
+        for ply, (key, move) in enumerate(positions):
+            self._buffer.append(pack(key, game_id, min(ply, 0xFFFF), move))
+        if len(self._buffer) >= self.chunk_size:
+            self._flush_run()
+        return True
+
+    def import_file(self, path: str):
+        """逐行读取一个PGN文件并导入其中所有对局"""
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            for headers, moves in read_pgn_games(f):
+                self.add_game(headers, moves)
+
+    def finish(self) -> ImportStats:
+        """归并所有分段，写出按局面键排序的局面文件"""
+        self._flush_run()
+        self._close()
+        runs = [open(run, 'rb') for run in self._runs]
+        try:
+            with open(os.path.join(self.path, POSITIONS_FILE), 'wb') as out:
+                out.write(_MAGIC)
+                readers = [iter(partial(run.read, _POSITION_RECORD.size), b'') for run in runs]
+                for record in heapq.merge(*readers):
+                    out.write(record)
+        finally:
+            for run in runs:
+                run.close()
+            for run in self._runs:
+                os.remove(run)
+            self._runs = []
+        return self.stats
+
+    def _flush_run(self):
+        """把缓冲区排序后写入一个临时分段文件"""
+        if not self._buffer:
+            return
+        self._buffer.sort()
+        run = os.path.join(self.path, f"run-{len(self._runs):05d}.tmp")
+        with open(run, 'wb') as f:
+            f.write(b''.join(self._buffer))
+        self._runs.append(run)
+        self._buffer = []
+
+    def _close(self):
+        self._games.close()
+        self._games_index.close()
+
+def import_archive(paths: Iterable[str], output: str, chunk_size: int = 1_000_000) -> ImportStats:
+    """把若干PGN文件导入为对局库"""
+    with ArchiveImporter(output, chunk_size) as importer:
+        for path in paths:
+            importer.import_file(path)
+    return importer.stats
+
+def _map_file(path: str):
+    """只读内存映射文件，空文件返回空字节串"""
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return b''
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+class ArchiveStore:
+    """只读打开对局库，按局面查询对局和走法统计"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._positions = _map_file(os.path.join(path, POSITIONS_FILE))
+        if self._positions[:len(_MAGIC)] != _MAGIC:
+            raise ValueError(f"不是有效的对局库：{path}")
+        self._games_index = _map_file(os.path.join(path, GAMES_INDEX_FILE))
+        self._games = _map_file(os.path.join(path, GAMES_FILE))
+
+    def __enter__(self) -> 'ArchiveStore':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        for mapped in (self._positions, self._games_index, self._games):
+            if isinstance(mapped, mmap.mmap):
+                mapped.close()
+
+    def __len__(self) -> int:
+        """局面记录数"""
+        return (len(self._positions) - len(_MAGIC)) // _POSITION_RECORD.size
+
+    @property
+    def game_count(self) -> int:
+        return len(self._games_index) // _GAME_ENTRY.size
+
+    def _lower_bound(self, key: bytes) -> int:
+        """第一条局面键不小于key的记录序号"""
+        data = self._positions
+        size = _POSITION_RECORD.size
+        base = len(_MAGIC)
+        low, high = 0, len(self)
+        while low < high:
+            middle = (low + high) // 2
+            offset = base + middle * size
+            if data[offset:offset + 8] < key:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def positions(self, position: Union[Board, int]) -> Iterator[Tuple[int, int, int]]:
+        """产生到达该局面的全部记录(对局编号, 步数, 下一步走法编码)"""
+        key = position.zobrist_key if isinstance(position, Board) else position
+        key_bytes = key.to_bytes(8, 'big')
+        data = self._positions
+        size = _POSITION_RECORD.size
+        offset = len(_MAGIC) + self._lower_bound(key_bytes) * size
+        while offset < len(data) and data[offset:offset + 8] == key_bytes:
+            _, game_id, ply, move = _POSITION_RECORD.unpack_from(data, offset)
+            yield game_id, ply, move
+            offset += size
+
+    def games_reaching(self, position: Union[Board, int]) -> List[int]:
+        """到达过该局面的对局编号（升序）"""
+        return sorted({game_id for game_id, _, _ in self.positions(position)})
+
+    def move_stats(self, position: Union[Board, int]) -> List[MoveStat]:
+        """该局面下各走法被走过的对局数及胜负，按次数从多到少排列"""
+        stats: Dict[int, MoveStat] = {}
+        seen = set()
+        for game_id, _, move in self.positions(position):
+            if move == NO_MOVE or (game_id, move) in seen:
+                continue
+            seen.add((game_id, move))
+            stat = stats.get(move)
+            if stat is None:
+                from_pos, to_pos, _ = decode_move(move)
+                stat = stats[move] = MoveStat((from_pos, to_pos), 0)
+            stat.count += 1
+            result = self.result(game_id)
+            if result == RESULT_RED_WIN:
+                stat.red_wins += 1
+            elif result == RESULT_DRAW:
+                stat.draws += 1
+            elif result == RESULT_BLACK_WIN:
+                stat.black_wins += 1
+        return sorted(stats.values(), key=lambda stat: stat.count, reverse=True)
+
+    def result(self, game_id: int) -> int:
+        """对局的比赛结果编码"""
+        return _GAME_ENTRY.unpack_from(self._games_index, game_id * _GAME_ENTRY.size)[1]
+
+    def game(self, game_id: int) -> Dict[str, Any]:
+        """读取对局的头信息和走法，返回{'headers': {...}, 'moves': 'h2e2 h9g7 ...'}"""
+        if not 0 <= game_id < self.game_count:
+            raise IndexError(f"对局编号超出范围：{game_id}")
+        offset = _GAME_ENTRY.unpack_from(self._games_index, game_id * _GAME_ENTRY.size)[0]
+        end = self._games.find(b'\n', offset)
+        return json.loads(self._games[offset:end if end >= 0 else len(self._games)])
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m chess.archive", description="导入和查询对局库")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    import_parser = commands.add_parser("import", help="把PGN棋谱导入对局库")
+    import_parser.add_argument("files", nargs="+", help="PGN文件（ICCS记谱）")
+    import_parser.add_argument("-o", "--output", required=True, help="对局库目录")
+    import_parser.add_argument("--chunk", type=int, default=1_000_000,
+                               help="内存中缓冲的局面记录数（默认1000000）")
+
+    query_parser = commands.add_parser("query", help="查询到达某局面的对局和走法统计")
+    query_parser.add_argument("archive", help="对局库目录")
+    query_parser.add_argument("--fen", help="查询的局面，默认为初始局面")
+    query_parser.add_argument("--games", type=int, default=10, help="列出的对局数（默认10）")
+    args = parser.parse_args(argv)
+
+    if args.command == "import":
+        stats = import_archive(args.files, args.output, args.chunk)
+        print(f"导入 {stats.games} 局，{stats.positions} 个局面，跳过 {stats.skipped} 局")
+        return 0
+
+    try:
+        board = Board.from_fen(args.fen) if args.fen else Board()
+    except ValueError as e:
+        parser.error(str(e))
+    with ArchiveStore(args.archive) as store:
+        games = store.games_reaching(board)
+        print(f"{len(games)} 局到达该局面")
+        for stat in store.move_stats(board):
+            print(f"{move_to_iccs(*stat.move)}: {stat.count} 局  "
+                  f"红胜 {stat.red_wins}  和 {stat.draws}  黑胜 {stat.black_wins}")
+        for game_id in games[:args.games]:
+            headers = store.game(game_id)['headers']
+            print(f"#{game_id} {headers.get('Red', '?')} - {headers.get('Black', '?')} "
+                  f"{headers.get('Result', '*')}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,292 @@
+"""批量局面的NumPy向量化走法生成（需要NumPy）
+
+一批N个局面表示为N×90的int8数组：0为空，红方棋子为类型编号+1（1-7，顺序同
+bitboard.PIECE_TYPES），黑方取负；另有长度为N的走子方数组（0红1黑）。
+
+每种棋子的走法由bitboard中的走法表展开为定长的收集表（目标格、马腿/象眼格），
+车炮使用按方向展开的射线表。走法生成先找出所有(局面, 格子)上的棋子，再一次性
+按表收集目标格上的棋子并判断，整批局面没有逐个棋子的Python循环。
+将军检测从将帅所在格反向查表：射线上第一个子是车或对方将帅、第二个子是炮，
+以及能跳到将帅位置且马腿为空的马、能走到将帅位置的兵。
+
+用法：
+    python -m chess.batch -d 3
+"""
+import argparse
+import sys
+import time
+from dataclasses import dataclass
+from typing import Iterable, List, Sequence
+
+import numpy as np
+
+from .board import Board, BOARD_SIZE, BOARD_WIDTH, PIECE_CLASSES
+from .piece import SQUARES
+from .bitboard import (
+    KING, ADVISOR, ELEPHANT, HORSE, CHARIOT, CANNON, PAWN, PIECE_TYPES, COLORS, COLOR_INDEX, TYPE_INDEX,
+    KING_MOVES, ADVISOR_MOVES, ELEPHANT_MOVES, HORSE_MOVES, PAWN_MOVES, iter_squares
+)
+
+PAD = BOARD_SIZE  # 补在每个局面末尾、始终为空的格子，用于填充定长表
+DEFAULT_CHUNK = 4096  # 合法性检查时每次展开的走法数
+
+def _padded(entries: List[List[tuple]]):
+    """把每格的(目标格, 阻挡格)列表填充为定长数组"""
+    width = max(len(row) for row in entries)
+    targets = np.full((BOARD_SIZE + 1, width), PAD, dtype=np.intp)
+    blocks = np.full((BOARD_SIZE + 1, width), PAD, dtype=np.intp)
+    for sq, row in enumerate(entries):
+        for i, (target, block) in enumerate(row):
+            targets[sq, i] = target
+            blocks[sq, i] = block
+    return targets, blocks
+
+def _mask_entries(table: List[int]) -> List[List[tuple]]:
+    return [[(target, PAD) for target in iter_squares(mask)] for mask in table]
+
+def _leaper_tables():
+    """LEAPERS[颜色][棋子类型] = (目标格表, 阻挡格表)，车炮为None"""
+    tables = []
+    for color in range(2):
+        tables.append({
+            KING: _padded(_mask_entries(KING_MOVES[color])),
+            ADVISOR: _padded(_mask_entries(ADVISOR_MOVES[color])),
+            ELEPHANT: _padded(ELEPHANT_MOVES[color]),
+            HORSE: _padded(HORSE_MOVES),
+            PAWN: _padded(_mask_entries(PAWN_MOVES[color])),
+        })
+    return tables
+
+def _ray_table() -> np.ndarray:
+    """RAYS[格子, 方向, 步数] = 沿该方向的格子下标，出界部分为PAD"""
+    rays = np.full((BOARD_SIZE + 1, 4, 9), PAD, dtype=np.intp)
+    for sq in range(BOARD_SIZE):
+        x, y = sq % BOARD_WIDTH, sq // BOARD_WIDTH
+        for direction, (dx, dy) in enumerate([(0, 1), (0, -1), (1, 0), (-1, 0)]):
+            step = 0
+            nx, ny = x + dx, y + dy
+            while 0 <= nx <= 8 and 0 <= ny <= 9:
+                rays[sq, direction, step] = ny * BOARD_WIDTH + nx
+                step += 1
+                nx, ny = nx + dx, ny + dy
+    return rays
+
+def _attacker_tables():
+    """反向查表：HORSE_ATTACKERS为能跳到该格的(马所在格, 马腿格)，
+    PAWN_ATTACKERS[兵的颜色]为能走到该格的兵所在格"""
+    horse = [[] for _ in range(BOARD_SIZE)]
+    for sq in range(BOARD_SIZE):
+        for target, leg in HORSE_MOVES[sq]:
+            horse[target].append((sq, leg))
+    pawn = []
+    for color in range(2):
+        rows = [[] for _ in range(BOARD_SIZE)]
+        for sq in range(BOARD_SIZE):
+            for target in iter_squares(PAWN_MOVES[color][sq]):
+                rows[target].append((sq, PAD))
+        pawn.append(_padded(rows)[0])
+    return _padded(horse), pawn
+
+LEAPERS = _leaper_tables()
+RAYS = _ray_table()
+HORSE_ATTACKERS, PAWN_ATTACKERS = _attacker_tables()
+
+@dataclass
+class MoveBatch:
+    """一批走法：第i步属于第board[i]个局面，从from_square[i]走到to_square[i]"""
+    board: np.ndarray
+    from_square: np.ndarray
+    to_square: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.board)
+
+    def counts(self, size: int) -> np.ndarray:
+        """每个局面的走法数"""
+        return np.bincount(self.board, minlength=size)
+
+def _relative(squares: np.ndarray, sides: np.ndarray) -> np.ndarray:
+    """转换为走子方视角：己方棋子为正、对方为负，末尾补一列空格"""
+    sign = np.where(sides == 0, 1, -1).astype(np.int8)
+    relative = np.zeros((len(squares), BOARD_SIZE + 1), dtype=np.int8)
+    relative[:, :BOARD_SIZE] = squares * sign[:, None]
+    return relative
+
+def _attacked(relative: np.ndarray, squares: np.ndarray, colors: np.ndarray) -> np.ndarray:
+    """relative中每个局面的squares格（属于colors一方）是否被对方攻击"""
+    rows = np.arange(len(relative))[:, None]
+    result = np.zeros(len(relative), dtype=bool)
+
+    # 车、将帅对面和炮
+    ray = relative[rows[:, :, None], RAYS[squares]]
+    occupied = ray != 0
+    before = np.cumsum(occupied, axis=2) - occupied
+    first = occupied & (before == 0)
+    second = occupied & (before == 1)
+    result |= (first & ((ray == -(CHARIOT + 1)) | (ray == -(KING + 1)))).any(axis=(1, 2))
+    result |= (second & (ray == -(CANNON + 1))).any(axis=(1, 2))
+
+    # 马：马腿为马所在格向目标方向的相邻格
+    horse_squares, legs = HORSE_ATTACKERS[0][squares], HORSE_ATTACKERS[1][squares]
+    result |= ((relative[rows, horse_squares] == -(HORSE + 1)) & (relative[rows, legs] == 0)).any(axis=1)
+
+    # 兵：按对方兵的走法反查
+    pawn_squares = np.where((colors == 0)[:, None], PAWN_ATTACKERS[1][squares], PAWN_ATTACKERS[0][squares])
+    result |= (relative[rows, pawn_squares] == -(PAWN + 1)).any(axis=1)
+    return result
+
+def _king_squares(relative: np.ndarray) -> np.ndarray:
+    """己方将帅所在格，没有将帅的局面为PAD"""
+    is_king = relative[:, :BOARD_SIZE] == KING + 1
+    return np.where(is_king.any(axis=1), is_king.argmax(axis=1), PAD)
+
+def _pseudo_moves(relative: np.ndarray, sides: np.ndarray) -> MoveBatch:
+    boards: List[np.ndarray] = []
+    froms: List[np.ndarray] = []
+    tos: List[np.ndarray] = []
+    pieces = relative[:, :BOARD_SIZE]
+
+    for piece_type in (KING, ADVISOR, ELEPHANT, HORSE, PAWN):
+        rows, from_squares = np.nonzero(pieces == piece_type + 1)
+        if not len(rows):
+            continue
+        colors = sides[rows]
+        targets = np.empty((len(rows), LEAPERS[0][piece_type][0].shape[1]), dtype=np.intp)
+        blocks = np.empty_like(targets)
+        for color in range(2):
+            selected = colors == color
+            targets[selected] = LEAPERS[color][piece_type][0][from_squares[selected]]
+            blocks[selected] = LEAPERS[color][piece_type][1][from_squares[selected]]
+        row_index = rows[:, None]
+        ok = (targets != PAD) & (relative[row_index, targets] <= 0) & (relative[row_index, blocks] == 0)
+        move_rows, columns = np.nonzero(ok)
+        boards.append(rows[move_rows])
+        froms.append(from_squares[move_rows])
+        tos.append(targets[move_rows, columns])
+
+    for piece_type in (CHARIOT, CANNON):
+        rows, from_squares = np.nonzero(pieces == piece_type + 1)
+        if not len(rows):
+            continue
+        ray_squares = RAYS[from_squares]
+        ray = relative[rows[:, None, None], ray_squares]
+        valid = ray_squares != PAD
+        occupied = ray != 0
+        before = np.cumsum(occupied, axis=2) - occupied
+        if piece_type == CHARIOT:
+            ok = valid & (before == 0) & (ray <= 0)
+        else:
+            ok = valid & (((before == 0) & ~occupied) | ((before == 1) & (ray < 0)))
+        move_rows, directions, steps = np.nonzero(ok)
+        boards.append(rows[move_rows])
+        froms.append(from_squares[move_rows])
+        tos.append(ray_squares[move_rows, directions, steps])
+
+    if not boards:
+        empty = np.zeros(0, dtype=np.intp)
+        return MoveBatch(empty, empty, empty)
+    board = np.concatenate(boards)
+    order = np.argsort(board, kind='stable')
+    return MoveBatch(board[order], np.concatenate(froms)[order], np.concatenate(tos)[order])
+
+class BoardBatch:
+    """一批局面"""
+
+    def __init__(self, squares: np.ndarray, sides: np.ndarray):
+        self.squares = np.ascontiguousarray(squares, dtype=np.int8)
+        self.sides = np.ascontiguousarray(sides, dtype=np.int8)
+
+    def __len__(self) -> int:
+        return len(self.squares)
+
+    @classmethod
+    def from_boards(cls, boards: Iterable[Board]) -> 'BoardBatch':
+        """由Board对象创建"""
+        boards = list(boards)
+        squares = np.zeros((len(boards), BOARD_SIZE), dtype=np.int8)
+        sides = np.zeros(len(boards), dtype=np.int8)
+        for i, board in enumerate(boards):
+            for sq, piece in enumerate(board.grid):
+                if piece is not None:
+                    code = TYPE_INDEX[piece.piece_type] + 1
+                    squares[i, sq] = code if COLOR_INDEX[piece.color] == 0 else -code
+            sides[i] = COLOR_INDEX[board.side_to_move]
+        return cls(squares, sides)
+
+    @classmethod
+    def from_bytes(cls, snapshots: Sequence[bytes]) -> 'BoardBatch':
+        """由Board.to_bytes()的定长二进制局面批量创建，不经过Board对象"""
+        data = np.frombuffer(b''.join(snapshots), dtype=np.uint8).reshape(len(snapshots), -1)
+        codes = np.empty((len(snapshots), BOARD_SIZE), dtype=np.uint8)
+        codes[:, 0::2] = data[:, 1:] & 0x0F
+        codes[:, 1::2] = data[:, 1:] >> 4
+        # 二进制编码1-7为红方、8-14为黑方，棋子类型顺序与PIECE_TYPES相同
+        lookup = np.array([0] + list(range(1, 8)) + [-code for code in range(1, 8)] + [0], dtype=np.int8)
+        return cls(lookup[codes], data[:, 0].astype(np.int8))
+
+    def to_board(self, index: int) -> Board:
+        """取出第index个局面为Board对象"""
+        board = Board(setup=False)
+        for sq in np.nonzero(self.squares[index])[0]:
+            code = int(self.squares[index, sq])
+            color = COLORS[0] if code > 0 else COLORS[1]
+            board.pieces.append(PIECE_CLASSES[PIECE_TYPES[abs(code) - 1]](color, SQUARES[sq]))
+        board.side_to_move = COLORS[int(self.sides[index])]
+        board._rebuild_grid()
+        return board
+
+    def in_check(self) -> np.ndarray:
+        """每个局面的走子方是否正被将军"""
+        relative = _relative(self.squares, self.sides)
+        return _attacked(relative, _king_squares(relative), self.sides)
+
+    def pseudo_moves(self) -> MoveBatch:
+        """全部伪合法走法（未检查走后是否被将军），按局面顺序排列"""
+        return _pseudo_moves(_relative(self.squares, self.sides), self.sides)
+
+    def legal_moves(self, chunk: int = DEFAULT_CHUNK) -> MoveBatch:
+        """全部合法走法，按局面顺序排列；每次最多展开chunk个走后局面做将军检测"""
+        moves = self.pseudo_moves()
+        keep = np.zeros(len(moves), dtype=bool)
+        for start in range(0, len(moves), chunk):
+            part = slice(start, start + chunk)
+            children = self._children(moves.board[part], moves.from_square[part], moves.to_square[part])
+            sides = self.sides[moves.board[part]]
+            relative = _relative(children, sides)
+            keep[part] = ~_attacked(relative, _king_squares(relative), sides)
+        return MoveBatch(moves.board[keep], moves.from_square[keep], moves.to_square[keep])
+
+    def apply(self, moves: MoveBatch) -> 'BoardBatch':
+        """对每一步走法生成走后的局面，返回与moves等长的新批次"""
+        return BoardBatch(self._children(moves.board, moves.from_square, moves.to_square),
+                          1 - self.sides[moves.board])
+
+    def _children(self, boards: np.ndarray, from_squares: np.ndarray, to_squares: np.ndarray) -> np.ndarray:
+        children = self.squares[boards]
+        rows = np.arange(len(children))
+        children[rows, to_squares] = children[rows, from_squares]
+        children[rows, from_squares] = 0
+        return children
+
+def perft(batch: BoardBatch, depth: int) -> int:
+    """逐层展开整批局面统计走法树叶子数，用于校验和测速"""
+    for _ in range(depth - 1):
+        batch = batch.apply(batch.legal_moves())
+    return len(batch.legal_moves()) if depth >= 1 else len(batch)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m chess.batch", description="批量走法生成测速")
+    parser.add_argument("-d", "--depth", type=int, default=3, help="展开深度（默认3）")
+    parser.add_argument("--fen", help="起始局面，默认为初始局面")
+    args = parser.parse_args(argv)
+
+    board = Board.from_fen(args.fen) if args.fen else Board()
+    start = time.perf_counter()
+    nodes = perft(BoardBatch.from_boards([board]), args.depth)
+    elapsed = time.perf_counter() - start
+    nps = nodes / elapsed if elapsed > 0 else 0.0
+    print(f"深度 {args.depth}: {nodes} 个节点，用时 {elapsed:.3f} 秒，{nps:,.0f} 节点/秒")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,80 @@
+"""棋子对象的内存与名称查询基准
+
+python -m chess.benchmarks.pieces -n 1000
+"""
+import argparse
+import sys
+import timeit
+import tracemalloc
+
+from ..board import Board
+from ..piece import PieceColor, PieceType
+
+def _legacy_name(piece) -> str:
+    """旧版Piece.name的写法：每次访问都重新构造名称字典，用于对比"""
+    if piece.color == PieceColor.RED:
+        names = {
+            PieceType.KING: "帅", PieceType.ADVISOR: "仕", PieceType.ELEPHANT: "相",
+            PieceType.HORSE: "马", PieceType.CHARIOT: "车", PieceType.CANNON: "炮",
+            PieceType.PAWN: "兵"
+        }
+    else:
+        names = {
+            PieceType.KING: "将", PieceType.ADVISOR: "士", PieceType.ELEPHANT: "象",
+            PieceType.HORSE: "马", PieceType.CHARIOT: "车", PieceType.CANNON: "炮",
+            PieceType.PAWN: "卒"
+        }
+    return names[piece.piece_type]
+
+def measure_board_memory(count: int):
+    """创建count个初始局面棋盘，返回(每个棋盘字节数, 每个棋子字节数)"""
+    Board()  # 预先完成模块级的表和缓存初始化
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    boards = [Board() for _ in range(count)]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    total = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+
+    pieces = [piece for board in boards for piece in board.pieces]
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    copies = [type(piece)(piece.color, piece.position) for piece in pieces]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    piece_total = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+    del copies
+    return total / count, piece_total / len(pieces)
+
+def measure_name_lookup(repeat: int):
+    """返回(新写法, 旧写法)读取32个棋子名称一次的耗时（微秒）"""
+    pieces = Board().pieces
+
+    def current():
+        for piece in pieces:
+            piece.name
+
+    def legacy():
+        for piece in pieces:
+            _legacy_name(piece)
+
+    current_time = min(timeit.repeat(current, number=repeat, repeat=5)) / repeat
+    legacy_time = min(timeit.repeat(legacy, number=repeat, repeat=5)) / repeat
+    return current_time * 1e6, legacy_time * 1e6
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m chess.benchmarks.pieces",
+                                     description="测量棋盘内存占用和棋子名称查询耗时")
+    parser.add_argument("-n", "--boards", type=int, default=1000, help="创建的棋盘数量（默认1000）")
+    parser.add_argument("-r", "--repeat", type=int, default=10000, help="名称查询的重复次数（默认10000）")
+    args = parser.parse_args(argv)
+
+    per_board, per_piece = measure_board_memory(args.boards)
+    print(f"每个棋盘: {per_board:,.0f} 字节（{args.boards} 个初始局面）")
+    print(f"每个棋子: {per_piece:,.0f} 字节")
+    current, legacy = measure_name_lookup(args.repeat)
+    print(f"读取32个棋子名称: {current:.2f} 微秒（重建字典的旧写法 {legacy:.2f} 微秒）")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
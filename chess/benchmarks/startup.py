@@ -0,0 +1,71 @@
+"""启动时间基准
+
+在新的解释器进程中分别测量空解释器、导入规则核心和运行命令行入口的耗时，
+并检查规则核心没有导入PyQt6。给出--max-ms时，命令行入口的中位耗时超过
+该值或规则核心导入了Qt都以非零状态退出，可用于发现启动时间的退化。
+
+python -m chess.benchmarks.startup -r 20 --max-ms 80
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+# (名称, 解释器参数)
+CASES = [
+    ("空解释器", ["-c", "pass"]),
+    ("导入规则核心", ["-c", "import chess.board, chess.notation"]),
+    ("命令行入口", ["-m", "chess.cli", "show"]),
+]
+
+_QT_CHECK = ("import sys, chess.board, chess.notation, chess.cli; "
+             "sys.exit(any(name.startswith('PyQt') for name in sys.modules))")
+
+def _project_root() -> str:
+    return os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def time_command(args: List[str], repeat: int) -> List[float]:
+    """在新进程中运行repeat次（另加一次预热），返回每次的毫秒数"""
+    command = [sys.executable] + args
+    root = _project_root()
+    subprocess.run(command, cwd=root, stdout=subprocess.DEVNULL, check=True)
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(command, cwd=root, stdout=subprocess.DEVNULL, check=True)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+def core_imports_qt() -> bool:
+    """导入规则核心和命令行入口后是否加载了PyQt"""
+    return subprocess.run([sys.executable, "-c", _QT_CHECK], cwd=_project_root()).returncode != 0
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m chess.benchmarks.startup", description="启动时间基准")
+    parser.add_argument("-r", "--repeat", type=int, default=10, help="每项运行次数（默认10）")
+    parser.add_argument("--max-ms", type=float, help="命令行入口中位耗时的上限（毫秒）")
+    args = parser.parse_args(argv)
+
+    medians: Dict[str, float] = {}
+    for name, command in CASES:
+        timings = time_command(command, args.repeat)
+        medians[name] = statistics.median(timings)
+        print(f"{name}：中位 {medians[name]:.1f} 毫秒  最快 {min(timings):.1f} 毫秒")
+
+    failed = False
+    if core_imports_qt():
+        print("错误：规则核心导入了PyQt")
+        failed = True
+    else:
+        print("规则核心未导入PyQt")
+    cli_time = medians["命令行入口"]
+    if args.max_ms is not None and cli_time > args.max_ms:
+        print(f"错误：命令行入口耗时 {cli_time:.1f} 毫秒，超过上限 {args.max_ms:g} 毫秒")
+        failed = True
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,371 @@
+from typing import List, Tuple, Iterator
+from .piece import PieceColor, PieceType
+from .board import BOARD_WIDTH, BOARD_HEIGHT, BOARD_SIZE, square_index
+
+# 位棋盘后端：每种颜色、每种棋子用一个90位整数表示，第 y*9+x 位对应坐标(x, y)
+# 走法生成和将军检测（反向查表）全程在掩码上完成，结果为(起点下标, 终点下标)
+
+COLORS = [PieceColor.RED, PieceColor.BLACK]
+PIECE_TYPES = [
+    PieceType.KING, PieceType.ADVISOR, PieceType.ELEPHANT, PieceType.HORSE,
+    PieceType.CHARIOT, PieceType.CANNON, PieceType.PAWN
+]
+COLOR_INDEX = {color: i for i, color in enumerate(COLORS)}
+TYPE_INDEX = {piece_type: i for i, piece_type in enumerate(PIECE_TYPES)}
+
+KING, ADVISOR, ELEPHANT, HORSE, CHARIOT, CANNON, PAWN = range(7)
+
+def iter_squares(mask: int) -> Iterator[int]:
+    """依次取出掩码中每个置位对应的格子下标"""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+def _on_board(x: int, y: int) -> bool:
+    return 0 <= x < BOARD_WIDTH and 0 <= y < BOARD_HEIGHT
+
+def _in_palace(color_index: int, x: int, y: int) -> bool:
+    if color_index == 0:
+        return 3 <= x <= 5 and 0 <= y <= 2
+    return 3 <= x <= 5 and 7 <= y <= 9
+
+def _step_table(color_index: int, directions) -> List[int]:
+    """九宫内单步走法表（将/帅、士）"""
+    table = []
+    for sq in range(BOARD_SIZE):
+        x, y = sq % BOARD_WIDTH, sq // BOARD_WIDTH
+        mask = 0
+        for dx, dy in directions:
+            if _in_palace(color_index, x + dx, y + dy):
+                mask |= 1 << square_index(x + dx, y + dy)
+        table.append(mask)
+    return table
+
+def _elephant_table(color_index: int) -> List[List[Tuple[int, int]]]:
+    """相/象走法表：每格对应(目标格, 象眼格)列表"""
+    table = []
+    for sq in range(BOARD_SIZE):
+        x, y = sq % BOARD_WIDTH, sq // BOARD_WIDTH
+        entries = []
+        for dx, dy in [(2, 2), (2, -2), (-2, 2), (-2, -2)]:
+            new_x, new_y = x + dx, y + dy
+            own_side = 0 <= new_y <= 4 if color_index == 0 else 5 <= new_y <= 9
+            if 0 <= new_x <= 8 and own_side:
+                entries.append((square_index(new_x, new_y), square_index(x + dx // 2, y + dy // 2)))
+        table.append(entries)
+    return table
+
+def _horse_table() -> List[List[Tuple[int, int]]]:
+    """马走法表：每格对应(目标格, 马腿格)列表"""
+    table = []
+    for sq in range(BOARD_SIZE):
+        x, y = sq % BOARD_WIDTH, sq // BOARD_WIDTH
+        entries = []
+        for dx, dy in [(-2, -1), (-2, 1), (2, -1), (2, 1), (-1, -2), (1, -2), (-1, 2), (1, 2)]:
+            if _on_board(x + dx, y + dy):
+                leg_x = x + (dx // 2 if abs(dx) == 2 else 0)
+                leg_y = y + (dy // 2 if abs(dy) == 2 else 0)
+                entries.append((square_index(x + dx, y + dy), square_index(leg_x, leg_y)))
+        table.append(entries)
+    return table
+
+def _pawn_table(color_index: int) -> List[int]:
+    """兵/卒走法表，过河后可以左右移动"""
+    table = []
+    for sq in range(BOARD_SIZE):
+        x, y = sq % BOARD_WIDTH, sq // BOARD_WIDTH
+        if color_index == 0:
+            directions = [(0, 1)] + ([(1, 0), (-1, 0)] if y > 4 else [])
+        else:
+            directions = [(0, -1)] + ([(1, 0), (-1, 0)] if y < 5 else [])
+        mask = 0
+        for dx, dy in directions:
+            if _on_board(x + dx, y + dy):
+                mask |= 1 << square_index(x + dx, y + dy)
+        table.append(mask)
+    return table
+
+def _line_tables(length: int) -> Tuple[List[List[int]], List[List[int]]]:
+    """一条直线上的车、炮走法表，按[位置][该线占位]索引，结果为该线上的目标位"""
+    chariot = []
+    cannon = []
+    for i in range(length):
+        chariot_row = []
+        cannon_row = []
+        for occ in range(1 << length):
+            chariot_mask = 0
+            cannon_mask = 0
+            for step in (1, -1):
+                j = i + step
+                found_platform = False
+                while 0 <= j < length:
+                    occupied = occ >> j & 1
+                    if not found_platform:
+                        if occupied:
+                            chariot_mask |= 1 << j
+                            found_platform = True
+                        else:
+                            chariot_mask |= 1 << j
+                            cannon_mask |= 1 << j
+                    elif occupied:
+                        cannon_mask |= 1 << j
+                        break
+                    j += step
+            chariot_row.append(chariot_mask)
+            cannon_row.append(cannon_mask)
+        chariot.append(chariot_row)
+        cannon.append(cannon_row)
+    return chariot, cannon
+
+def _file_spread_table() -> List[List[int]]:
+    """把某一列的10位掩码展开为整盘掩码"""
+    table = []
+    for x in range(BOARD_WIDTH):
+        row = []
+        for bits in range(1 << BOARD_HEIGHT):
+            mask = 0
+            for y in range(BOARD_HEIGHT):
+                if bits >> y & 1:
+                    mask |= 1 << square_index(x, y)
+            row.append(mask)
+        table.append(row)
+    return table
+
+KING_MOVES = [_step_table(c, [(0, 1), (0, -1), (1, 0), (-1, 0)]) for c in range(2)]
+ADVISOR_MOVES = [_step_table(c, [(1, 1), (1, -1), (-1, 1), (-1, -1)]) for c in range(2)]
+ELEPHANT_MOVES = [_elephant_table(c) for c in range(2)]
+HORSE_MOVES = _horse_table()
+PAWN_MOVES = [_pawn_table(c) for c in range(2)]
+RANK_CHARIOT, RANK_CANNON = _line_tables(BOARD_WIDTH)
+FILE_CHARIOT, FILE_CANNON = _line_tables(BOARD_HEIGHT)
+FILE_SPREAD = _file_spread_table()
+RANK_MASK = (1 << BOARD_WIDTH) - 1
+
+def _horse_attacker_table() -> List[List[Tuple[int, int]]]:
+    """反向马表：每格对应能跳到该格的(马所在格, 马腿格)列表"""
+    table = [[] for _ in range(BOARD_SIZE)]
+    for sq in range(BOARD_SIZE):
+        for target, leg in HORSE_MOVES[sq]:
+            table[target].append((sq, leg))
+    return table
+
+def _pawn_attacker_table(color_index: int) -> List[int]:
+    """反向兵表：每格对应能走到该格的兵/卒所在格的掩码"""
+    table = [0] * BOARD_SIZE
+    for sq in range(BOARD_SIZE):
+        for target in iter_squares(PAWN_MOVES[color_index][sq]):
+            table[target] |= 1 << sq
+    return table
+
+HORSE_ATTACKERS = _horse_attacker_table()
+HORSE_ATTACKER_MASK = [sum(1 << sq for sq, _ in entries) for entries in HORSE_ATTACKERS]
+PAWN_ATTACKERS = [_pawn_attacker_table(c) for c in range(2)]
+
+class BitboardPosition:
+    """位棋盘表示的局面，与Board中的棋子对象保持同步"""
+
+    def __init__(self):
+        # masks[颜色][棋子类型]
+        self.masks = [[0] * len(PIECE_TYPES) for _ in COLORS]
+        self.occupancy = [0, 0]
+        self.file_occupancy = [0] * BOARD_WIDTH  # 每列10位占位，供车炮纵向查表
+        self.squares: List[int] = [-1] * BOARD_SIZE  # 每格棋子编码 颜色*7+类型，空格为-1
+
+    @classmethod
+    def from_board(cls, board) -> 'BitboardPosition':
+        """根据Board的棋子列表创建位棋盘"""
+        position = cls()
+        for piece in board.pieces:
+            position.add_object(piece, piece.position.index)
+        return position
+
+    def add_piece(self, color: int, piece_type: int, sq: int):
+        """在指定格放置棋子"""
+        bit = 1 << sq
+        self.masks[color][piece_type] |= bit
+        self.occupancy[color] |= bit
+        self.file_occupancy[sq % BOARD_WIDTH] |= 1 << (sq // BOARD_WIDTH)
+        self.squares[sq] = color * 7 + piece_type
+
+    def remove_piece(self, color: int, piece_type: int, sq: int):
+        """移除指定格的棋子"""
+        bit = 1 << sq
+        self.masks[color][piece_type] &= ~bit
+        self.occupancy[color] &= ~bit
+        self.file_occupancy[sq % BOARD_WIDTH] &= ~(1 << (sq // BOARD_WIDTH))
+        self.squares[sq] = -1
+
+    def move_piece(self, color: int, piece_type: int, from_sq: int, to_sq: int):
+        """移动棋子（不处理目标格上的棋子）"""
+        self.remove_piece(color, piece_type, from_sq)
+        self.add_piece(color, piece_type, to_sq)
+
+    def add_object(self, piece, sq: int):
+        """按棋子对象放置，供Board同步使用"""
+        self.add_piece(COLOR_INDEX[piece.color], TYPE_INDEX[piece.piece_type], sq)
+
+    def remove_object(self, piece, sq: int):
+        """按棋子对象移除，供Board同步使用"""
+        self.remove_piece(COLOR_INDEX[piece.color], TYPE_INDEX[piece.piece_type], sq)
+
+    def move_object(self, piece, from_sq: int, to_sq: int):
+        """按棋子对象移动，供Board同步使用"""
+        color = COLOR_INDEX[piece.color]
+        piece_type = TYPE_INDEX[piece.piece_type]
+        self.remove_piece(color, piece_type, from_sq)
+        self.add_piece(color, piece_type, to_sq)
+
+    def in_check_object(self, color) -> bool:
+        """按PieceColor做将军检测，供Board使用"""
+        return self.in_check(COLOR_INDEX[color])
+
+    def pseudo_object_moves(self, color) -> List[Tuple[int, int]]:
+        """按PieceColor生成伪合法走法的下标对，供Board使用"""
+        return self.generate_moves(COLOR_INDEX[color])
+
+    def legal_object_moves(self, color) -> List[Tuple[int, int]]:
+        """按PieceColor生成合法走法的下标对，供Board使用"""
+        return self.legal_moves(COLOR_INDEX[color])
+
+    def object_targets(self, piece, sq: int) -> int:
+        """返回棋子对象的目标格掩码"""
+        return self.piece_targets(COLOR_INDEX[piece.color], TYPE_INDEX[piece.piece_type], sq)
+
+    def make(self, from_sq: int, to_sq: int) -> int:
+        """在位棋盘上走一步（不检查合法性），返回被吃棋子的编码，未吃子为-1"""
+        code = self.squares[from_sq]
+        captured = self.squares[to_sq]
+        if captured >= 0:
+            self.remove_piece(captured // 7, captured % 7, to_sq)
+        self.remove_piece(code // 7, code % 7, from_sq)
+        self.add_piece(code // 7, code % 7, to_sq)
+        return captured
+
+    def unmake(self, from_sq: int, to_sq: int, captured: int):
+        """撤销make"""
+        code = self.squares[to_sq]
+        self.remove_piece(code // 7, code % 7, to_sq)
+        self.add_piece(code // 7, code % 7, from_sq)
+        if captured >= 0:
+            self.add_piece(captured // 7, captured % 7, to_sq)
+
+    def in_check(self, color: int) -> bool:
+        """color方的将/帅是否被将军（含将帅照面），只用掩码反向查表"""
+        king = self.masks[color][KING]
+        if not king:
+            return False
+        sq = king.bit_length() - 1
+        enemy = self.masks[1 - color]
+        x, y = sq % BOARD_WIDTH, sq // BOARD_WIDTH
+        occupied = self.occupancy[0] | self.occupancy[1]
+        rank_shift = y * BOARD_WIDTH
+        rank_occ = (occupied >> rank_shift) & RANK_MASK
+        file_occ = self.file_occupancy[x]
+        spread = FILE_SPREAD[x]
+        # 车和将帅照面：从将位沿直线看到的第一个子；炮：隔一个子看到的第一个子
+        file_first = spread[FILE_CHARIOT[y][file_occ]]
+        if file_first & enemy[KING]:
+            return True
+        if ((RANK_CHARIOT[x][rank_occ] << rank_shift) | file_first) & enemy[CHARIOT]:
+            return True
+        if enemy[CANNON]:
+            screened = (RANK_CANNON[x][rank_occ] << rank_shift) | spread[FILE_CANNON[y][file_occ]]
+            if screened & occupied & enemy[CANNON]:
+                return True
+        if PAWN_ATTACKERS[1 - color][sq] & enemy[PAWN]:
+            return True
+        horses = enemy[HORSE]
+        if horses & HORSE_ATTACKER_MASK[sq]:
+            for origin, leg in HORSE_ATTACKERS[sq]:
+                if horses >> origin & 1 and not occupied >> leg & 1:
+                    return True
+        return False
+
+    def legal_moves(self, color: int) -> List[Tuple[int, int]]:
+        """生成指定颜色的全部合法走法，返回(起点下标, 终点下标)列表"""
+        moves = []
+        for from_sq, to_sq in self.generate_moves(color):
+            captured = self.make(from_sq, to_sq)
+            if not self.in_check(color):
+                moves.append((from_sq, to_sq))
+            self.unmake(from_sq, to_sq, captured)
+        return moves
+
+    def perft(self, color: int, depth: int) -> int:
+        """只在位棋盘上统计depth层合法走法树的叶子数"""
+        moves = self.legal_moves(color)
+        if depth <= 1:
+            return len(moves) if depth == 1 else 1
+        nodes = 0
+        for from_sq, to_sq in moves:
+            captured = self.make(from_sq, to_sq)
+            nodes += self.perft(1 - color, depth - 1)
+            self.unmake(from_sq, to_sq, captured)
+        return nodes
+
+    def piece_targets(self, color: int, piece_type: int, sq: int) -> int:
+        """返回指定格上棋子的目标格掩码，已排除己方棋子所在格"""
+        occupied = self.occupancy[0] | self.occupancy[1]
+        if piece_type == CHARIOT or piece_type == CANNON:
+            x, y = sq % BOARD_WIDTH, sq // BOARD_WIDTH
+            rank_shift = y * BOARD_WIDTH
+            rank_occ = (occupied >> rank_shift) & RANK_MASK
+            file_occ = self.file_occupancy[x]
+            if piece_type == CHARIOT:
+                targets = (RANK_CHARIOT[x][rank_occ] << rank_shift) | FILE_SPREAD[x][FILE_CHARIOT[y][file_occ]]
+            else:
+                targets = (RANK_CANNON[x][rank_occ] << rank_shift) | FILE_SPREAD[x][FILE_CANNON[y][file_occ]]
+        elif piece_type == HORSE:
+            targets = 0
+            for target, leg in HORSE_MOVES[sq]:
+                if not occupied >> leg & 1:
+                    targets |= 1 << target
+        elif piece_type == ELEPHANT:
+            targets = 0
+            for target, eye in ELEPHANT_MOVES[color][sq]:
+                if not occupied >> eye & 1:
+                    targets |= 1 << target
+        elif piece_type == PAWN:
+            targets = PAWN_MOVES[color][sq]
+        elif piece_type == ADVISOR:
+            targets = ADVISOR_MOVES[color][sq]
+        else:
+            targets = KING_MOVES[color][sq]
+        return targets & ~self.occupancy[color]
+
+    def generate_moves(self, color: int) -> List[Tuple[int, int]]:
+        """生成指定颜色的全部伪合法走法，返回(起点下标, 终点下标)列表"""
+        moves = []
+        append = moves.append
+        piece_targets = self.piece_targets
+        for piece_type, mask in enumerate(self.masks[color]):
+            while mask:
+                low = mask & -mask
+                sq = low.bit_length() - 1
+                mask ^= low
+                targets = piece_targets(color, piece_type, sq)
+                while targets:
+                    bit = targets & -targets
+                    append((sq, bit.bit_length() - 1))
+                    targets ^= bit
+        return moves
+
+def verify_against_objects(board) -> List[str]:
+    """用棋子类的走法校验位棋盘走法，返回不一致的描述列表"""
+    position = BitboardPosition.from_board(board)
+    mismatches = []
+    for piece in board.pieces:
+        sq = piece.position.index
+        expected = set()
+        for move in piece.get_possible_moves(board):
+            target = board.get_piece_at(move)
+            if target is None or target.color != piece.color:
+                expected.add(move.index)
+        actual = set(iter_squares(position.object_targets(piece, sq)))
+        if actual != expected:
+            mismatches.append(
+                f"{piece.name}({piece.position.x}, {piece.position.y}): "
+                f"棋子类 {sorted(expected)}，位棋盘 {sorted(actual)}"
+            )
+    return mismatches
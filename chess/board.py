@@ -1,19 +1,142 @@
+from array import array
 from typing import Optional, List, Tuple, Dict, Any
-from .piece import Piece, Position, PieceColor, PieceType
+from .piece import Piece, Position, PieceColor, PieceType, SQUARES
 from .pieces.specific_pieces import King, Advisor, Elephant, Horse, Chariot, Cannon, Pawn
-import json
+from .zobrist import PIECE_KEYS, SIDE_KEY, PositionCache
+from .evaluation import VALUE_TABLES
+
+# 棋盘尺寸：9列10行，共90个交叉点
+BOARD_WIDTH = 9
+BOARD_HEIGHT = 10
+BOARD_SIZE = BOARD_WIDTH * BOARD_HEIGHT
+
+# 可选的走法生成后端
+BACKEND_OBJECTS = "objects"    # 由各棋子类生成走法
+BACKEND_BITBOARD = "bitboard"  # 由位棋盘查表生成走法
+
+def square_index(x: int, y: int) -> int:
+    """将棋盘坐标转换为0-89的格子下标"""
+    return y * BOARD_WIDTH + x
+
+PIECE_CLASSES = {
+    PieceType.KING: King,
+    PieceType.ADVISOR: Advisor,
+    PieceType.ELEPHANT: Elephant,
+    PieceType.HORSE: Horse,
+    PieceType.CHARIOT: Chariot,
+    PieceType.CANNON: Cannon,
+    PieceType.PAWN: Pawn,
+}
+
+# 棋子的4位编码：0表示空位，1-14依次为红方、黑方的各类棋子
+_PIECE_KINDS: List[Optional[Tuple[PieceColor, PieceType]]] = [None] + [
+    (color, piece_type) for color in PieceColor for piece_type in PieceType
+]
+_PIECE_CODES = {kind: code for code, kind in enumerate(_PIECE_KINDS) if kind}
+
+# 走法历史中每步编码为一个整数：起点下标(7位) | 终点下标(7位) | 被吃棋子(4位，0表示未吃子)
+# | 走子棋子(4位，0表示未记录)
+MOVE_HISTORY_TYPECODE = 'I'
+
+def encode_move(from_pos: Position, to_pos: Position, captured: Optional[Piece] = None,
+                piece: Optional[Piece] = None) -> int:
+    """把一步走法（及被吃棋子、走子棋子的颜色和类型）编码为整数"""
+    code = from_pos.index | to_pos.index << 7
+    if captured:
+        code |= _PIECE_CODES[captured.color, captured.piece_type] << 14
+    if piece:
+        code |= _PIECE_CODES[piece.color, piece.piece_type] << 18
+    return code
+
+def decode_move(code: int) -> Tuple[Position, Position, Optional[Tuple[PieceColor, PieceType]]]:
+    """解码encode_move的结果，返回(起点, 终点, 被吃棋子的(颜色, 类型)或None)"""
+    return SQUARES[code & 0x7F], SQUARES[code >> 7 & 0x7F], _PIECE_KINDS[code >> 14 & 0x0F]
+
+def move_score_delta(code: int) -> int:
+    """由走法编码算出这一步对红方视角分数的改变量，编码中必须记录了走子棋子
+
+    >>> from chess.piece import Position
+    >>> board = Board()
+    >>> start = board.score
+    >>> for move in [((7, 2), (4, 2)), ((7, 9), (6, 7)), ((4, 2), (4, 6))]:
+    ...     board.move_piece(*(Position(x, y) for x, y in move))[0]
+    True
+    True
+    True
+    >>> start + sum(move_score_delta(code) for code in board.move_history) == board.score
+    True
+    """
+    mover = _PIECE_KINDS[code >> 18 & 0x0F]
+    if mover is None:
+        raise ValueError("走法编码中没有记录走子棋子")
+    from_index, to_index = code & 0x7F, code >> 7 & 0x7F
+    values = VALUE_TABLES[mover[0]][mover[1]]
+    delta = values[to_index] - values[from_index]
+    captured = _PIECE_KINDS[code >> 14 & 0x0F]
+    if captured:
+        delta -= VALUE_TABLES[captured[0]][captured[1]][to_index]
+    return delta
+
+# FEN中的棋子字母，红方大写、黑方小写；读取时也接受马写作H、相写作E
+_FEN_LETTERS = {
+    PieceType.KING: 'k',
+    PieceType.ADVISOR: 'a',
+    PieceType.ELEPHANT: 'b',
+    PieceType.HORSE: 'n',
+    PieceType.CHARIOT: 'r',
+    PieceType.CANNON: 'c',
+    PieceType.PAWN: 'p',
+}
+_FEN_KINDS = {}
+for _piece_type, _letter in list(_FEN_LETTERS.items()) + [(PieceType.HORSE, 'h'), (PieceType.ELEPHANT, 'e')]:
+    _FEN_KINDS[_letter.upper()] = (PieceColor.RED, _piece_type)
+    _FEN_KINDS[_letter] = (PieceColor.BLACK, _piece_type)
+INITIAL_FEN = "rnbakabnr/9/1c5c1/p1p1p1p1p/9/9/P1P1P1P1P/1C5C1/9/RNBAKABNR w - - 0 1"
+
+# 二进制局面：1字节走子方 + 90个格子各占4位（每字节低4位为偶数格），共46字节
+POSITION_BYTES = 1 + BOARD_SIZE // 2
+
+def _build_byte_table() -> List[Optional[Tuple[Tuple[int, Any, PieceColor], ...]]]:
+    """每个字节值解码出的棋子(格内偏移, 棋子类, 颜色)；含无效编码的字节为None"""
+    table = []
+    for byte in range(256):
+        entries = []
+        for offset, code in enumerate((byte & 0x0F, byte >> 4)):
+            if code >= len(_PIECE_KINDS):
+                entries = None
+                break
+            if code:
+                color, piece_type = _PIECE_KINDS[code]
+                entries.append((offset, PIECE_CLASSES[piece_type], color))
+        table.append(tuple(entries) if entries is not None else None)
+    return table
+
+_BYTE_PIECES = _build_byte_table()
 
 class Board:
-    def __init__(self):
+    def __init__(self, backend: str = BACKEND_OBJECTS, setup: bool = True):
+        """setup为False时创建空棋盘，由调用方放置棋子后调用_rebuild_grid"""
+        if backend not in (BACKEND_OBJECTS, BACKEND_BITBOARD):
+            raise ValueError(f"未知的走法生成后端：{backend}")
+        self.backend = backend
+        self.bitboard = None  # 选择位棋盘后端时与棋子列表同步
         self.pieces: List[Piece] = []
-        self.move_history = []  # 添加移动历史记录
-        self.initialize_board()
+        self.grid: List[Optional[Piece]] = [None] * BOARD_SIZE  # 按格子下标索引的占位数组
+        self.kings: Dict[PieceColor, King] = {}  # 双方将/帅，加速将军检测
+        self.side_to_move = PieceColor.RED
+        self.zobrist_key = 0  # 局面键，随走子增量更新
+        self.score = 0  # 子力与位置分（红方视角），随走子增量更新
+        self.cache = PositionCache()  # 按局面键缓存将军、将死和合法走法
+        self.move_history = array(MOVE_HISTORY_TYPECODE)  # 按encode_move编码的走法历史
+        if setup:
+            self.initialize_board()
     
     def initialize_board(self):
         """初始化棋盘，放置所有棋子"""
         # 清空棋盘和历史记录
         self.pieces.clear()
-        self.move_history.clear()
+        del self.move_history[:]
+        self.side_to_move = PieceColor.RED
         
         # 放置红方棋子
         self.pieces.extend([
@@ -54,109 +177,335 @@ class Board:
             Pawn(PieceColor.BLACK, Position(6, 6)),
             Pawn(PieceColor.BLACK, Position(8, 6)),
         ])
+        self._rebuild_grid()
+
+    def _rebuild_grid(self):
+        """根据棋子列表重建占位数组、局面键（及位棋盘）"""
+        self.grid = [None] * BOARD_SIZE
+        self.kings = {}
+        self.zobrist_key = SIDE_KEY if self.side_to_move == PieceColor.BLACK else 0
+        self.score = 0
+        for piece in self.pieces:
+            index = piece.position.index
+            self.grid[index] = piece
+            self.zobrist_key ^= PIECE_KEYS[piece.color][piece.piece_type][index]
+            self.score += VALUE_TABLES[piece.color][piece.piece_type][index]
+            if isinstance(piece, King):
+                self.kings[piece.color] = piece
+        if self.backend == BACKEND_BITBOARD:
+            from .bitboard import BitboardPosition
+            self.bitboard = BitboardPosition.from_board(self)
+
+    def _set_piece_position(self, piece: Piece, position: Position):
+        """移动棋子并同步占位数组（不处理目标格上的棋子）"""
+        old_index = piece.position.index
+        new_index = position.index
+        if self.grid[old_index] is piece:
+            self.grid[old_index] = None
+        piece.position = position
+        self.grid[new_index] = piece
+        keys = PIECE_KEYS[piece.color][piece.piece_type]
+        self.zobrist_key ^= keys[old_index] ^ keys[new_index]
+        values = VALUE_TABLES[piece.color][piece.piece_type]
+        self.score += values[new_index] - values[old_index]
+        if self.bitboard:
+            self.bitboard.move_object(piece, old_index, new_index)
+
+    def _lift_piece(self, piece: Piece):
+        """把被吃的棋子从占位数组（及位棋盘）中拿走"""
+        index = piece.position.index
+        if self.grid[index] is piece:
+            self.grid[index] = None
+        self.zobrist_key ^= PIECE_KEYS[piece.color][piece.piece_type][index]
+        self.score -= VALUE_TABLES[piece.color][piece.piece_type][index]
+        if self.bitboard:
+            self.bitboard.remove_object(piece, index)
+
+    def _drop_piece(self, piece: Piece):
+        """把被吃的棋子放回占位数组（及位棋盘）"""
+        index = piece.position.index
+        self.grid[index] = piece
+        self.zobrist_key ^= PIECE_KEYS[piece.color][piece.piece_type][index]
+        self.score += VALUE_TABLES[piece.color][piece.piece_type][index]
+        if self.bitboard:
+            self.bitboard.add_object(piece, index)
+
+    def get_piece_moves(self, piece: Piece) -> List[Position]:
+        """获取棋子的走法（不含己方棋子所在格），由当前后端生成"""
+        if self.bitboard:
+            targets = self.bitboard.object_targets(piece, piece.position.index)
+            moves = []
+            while targets:
+                low = targets & -targets
+                moves.append(SQUARES[low.bit_length() - 1])
+                targets ^= low
+            return moves
+        moves = []
+        for move in piece.get_possible_moves(self):
+            target = self.grid[move.index]
+            if target is None or target.color != piece.color:
+                moves.append(move)
+        return moves
 
     def get_king(self, color: PieceColor) -> Optional[King]:
         """获取指定颜色的将/帅"""
+        king = self.kings.get(color)
+        if king and self._is_on_board(king):
+            return king
         for piece in self.pieces:
-            if isinstance(piece, King) and piece.color == color:
+            if isinstance(piece, King) and piece.color == color and self._is_on_board(piece):
+                self.kings[color] = piece
                 return piece
         return None
 
-    def is_check(self, color: PieceColor) -> bool:
-        """检查指定颜色的将/帅是否被将军"""
-        king = self.get_king(color)
-        if not king:
+    def _is_on_board(self, piece: Piece) -> bool:
+        """棋子是否仍在棋盘上（make_move吃掉的棋子暂时留在列表中）"""
+        return self.grid[piece.position.index] is piece
+
+    def _attacker_at(self, x: int, y: int, color: PieceColor, piece_type: PieceType) -> bool:
+        """(x, y)上是否为指定颜色和种类的棋子"""
+        if not (0 <= x < BOARD_WIDTH and 0 <= y < BOARD_HEIGHT):
             return False
+        piece = self.grid[square_index(x, y)]
+        return piece is not None and piece.color == color and piece.piece_type == piece_type
+
+    def is_square_attacked(self, square: Position, by_color: PieceColor) -> bool:
+        """从目标格向外反向查找，判断指定颜色的棋子能否吃到该格"""
+        grid = self.grid
+        sx, sy = square.x, square.y
+        target = grid[square.index]
+        target_is_king = target is not None and target.piece_type == PieceType.KING
         
-        # 检查所有对方棋子是否可以吃到将/帅
-        for piece in self.pieces:
-            if piece.color != color:  # 对方棋子
-                if king.position in piece.get_possible_moves(self):
+        # 车、炮：沿四个方向查找第一个和第二个棋子
+        for dx, dy in ((0, 1), (0, -1), (1, 0), (-1, 0)):
+            x, y = sx + dx, sy + dy
+            found_platform = False
+            while 0 <= x < BOARD_WIDTH and 0 <= y < BOARD_HEIGHT:
+                piece = grid[y * BOARD_WIDTH + x]
+                if piece:
+                    if not found_platform:
+                        if piece.color == by_color:
+                            if piece.piece_type == PieceType.CHARIOT:
+                                return True
+                            # 将帅照面：同一直线上中间无子
+                            if dx == 0 and target_is_king and piece.piece_type == PieceType.KING:
+                                return True
+                        found_platform = True
+                    else:
+                        if piece.color == by_color and piece.piece_type == PieceType.CANNON:
+                            return True
+                        break
+                x += dx
+                y += dy
+        
+        # 马：马腿是目标格的斜向邻格
+        for ex, ey in ((1, 1), (1, -1), (-1, 1), (-1, -1)):
+            leg_x, leg_y = sx + ex, sy + ey
+            if not (0 <= leg_x < BOARD_WIDTH and 0 <= leg_y < BOARD_HEIGHT):
+                continue
+            if grid[square_index(leg_x, leg_y)]:
+                continue
+            if (self._attacker_at(sx + 2 * ex, sy + ey, by_color, PieceType.HORSE) or
+                    self._attacker_at(sx + ex, sy + 2 * ey, by_color, PieceType.HORSE)):
+                return True
+        
+        # 兵/卒：向前一步，过河后可以横走
+        if by_color == PieceColor.RED:
+            if self._attacker_at(sx, sy - 1, by_color, PieceType.PAWN):
+                return True
+            crossed = sy > 4
+        else:
+            if self._attacker_at(sx, sy + 1, by_color, PieceType.PAWN):
+                return True
+            crossed = sy < 5
+        if crossed and (self._attacker_at(sx - 1, sy, by_color, PieceType.PAWN) or
+                        self._attacker_at(sx + 1, sy, by_color, PieceType.PAWN)):
+            return True
+        
+        # 将/帅、士：目标格必须在对方九宫内
+        if by_color == PieceColor.RED:
+            in_palace = 3 <= sx <= 5 and 0 <= sy <= 2
+        else:
+            in_palace = 3 <= sx <= 5 and 7 <= sy <= 9
+        if in_palace:
+            for dx, dy in ((0, 1), (0, -1), (1, 0), (-1, 0)):
+                if self._attacker_at(sx + dx, sy + dy, by_color, PieceType.KING):
                     return True
+            for dx, dy in ((1, 1), (1, -1), (-1, 1), (-1, -1)):
+                if self._attacker_at(sx + dx, sy + dy, by_color, PieceType.ADVISOR):
+                    return True
+        
+        # 相/象：目标格在己方半场且象眼无子
+        own_half = sy <= 4 if by_color == PieceColor.RED else sy >= 5
+        if own_half:
+            for ex, ey in ((1, 1), (1, -1), (-1, 1), (-1, -1)):
+                eye_x, eye_y = sx + ex, sy + ey
+                if not (0 <= eye_x < BOARD_WIDTH and 0 <= eye_y < BOARD_HEIGHT):
+                    continue
+                if grid[square_index(eye_x, eye_y)]:
+                    continue
+                if self._attacker_at(sx + 2 * ex, sy + 2 * ey, by_color, PieceType.ELEPHANT):
+                    return True
+        
         return False
 
+    def set_side_to_move(self, color: PieceColor):
+        """设置走子方（读档时使用），同步更新局面键"""
+        if color != self.side_to_move:
+            self.side_to_move = color
+            self.zobrist_key ^= SIDE_KEY
+
+    def in_check(self, color: PieceColor) -> bool:
+        """不经缓存的将军检测（按所选后端），供走法合法性试探和搜索使用"""
+        if self.bitboard:
+            return self.bitboard.in_check_object(color)
+        king = self.get_king(color)
+        if not king:
+            return False
+        opponent_color = PieceColor.BLACK if color == PieceColor.RED else PieceColor.RED
+        return self.is_square_attacked(king.position, opponent_color)
+
+    def is_check(self, color: PieceColor) -> bool:
+        """检查指定颜色的将/帅是否被将军（包括将帅照面）"""
+        key = (self.zobrist_key, 'check', color)
+        result = self.cache.get(key)
+        if result is None:
+            result = self.in_check(color)
+            self.cache.put(key, result)
+        return result
+
     def is_checkmate(self, color: PieceColor) -> bool:
         """检查指定颜色是否被将死"""
-        if not self.is_check(color):
-            return False
-        
-        # 获取该方所有棋子
-        pieces = [p for p in self.pieces if p.color == color]
-        
-        # 尝试每个棋子的每个可能移动
-        for piece in pieces:
-            original_pos = piece.position
-            possible_moves = piece.get_possible_moves(self)
-            
-            for move in possible_moves:
-                # 尝试移动
-                captured_piece = None
-                target_piece = self.get_piece_at(move)
-                if target_piece:
-                    self.pieces.remove(target_piece)
-                    captured_piece = target_piece
-                
-                piece.position = move
-                
-                # 检查移动后是否仍被将军
-                still_in_check = self.is_check(color)
-                
-                # 恢复位置
-                piece.position = original_pos
-                if captured_piece:
-                    self.pieces.append(captured_piece)
-                
-                # 如果有一种移动可以解除将军，则未被将死
-                if not still_in_check:
-                    return False
-        
-        # 所有移动都无法解除将军，则被将死
-        return True
+        key = (self.zobrist_key, 'checkmate', color)
+        result = self.cache.get(key)
+        if result is None:
+            # 只要有一种移动可以解除将军，则未被将死
+            result = self.is_check(color) and not self.generate_legal_moves(color)
+            self.cache.put(key, result)
+        return result
+
+    def make_move(self, from_pos: Position, to_pos: Position) -> Optional[Piece]:
+        """就地走一步（不检查合法性），返回被吃掉的棋子
+
+        被吃的棋子只从占位数组中拿走，仍保留在棋子列表里，
+        必须用unmake_move按相反顺序恢复。
+        """
+        piece = self.grid[from_pos.index]
+        captured = self.grid[to_pos.index]
+        if captured:
+            self._lift_piece(captured)
+        self._set_piece_position(piece, to_pos)
+        self.side_to_move = PieceColor.BLACK if self.side_to_move == PieceColor.RED else PieceColor.RED
+        self.zobrist_key ^= SIDE_KEY
+        return captured
+
+    def unmake_move(self, from_pos: Position, to_pos: Position, captured: Optional[Piece]):
+        """撤销make_move，精确恢复原局面"""
+        piece = self.grid[to_pos.index]
+        self._set_piece_position(piece, from_pos)
+        if captured:
+            self._drop_piece(captured)
+        self.side_to_move = PieceColor.BLACK if self.side_to_move == PieceColor.RED else PieceColor.RED
+        self.zobrist_key ^= SIDE_KEY
+
+    def generate_pseudo_moves(self, color: PieceColor) -> List[Tuple[Position, Position]]:
+        """生成指定颜色的伪合法走法（未检查走后是否被将军）"""
+        if self.bitboard:
+            return [(SQUARES[from_sq], SQUARES[to_sq])
+                    for from_sq, to_sq in self.bitboard.pseudo_object_moves(color)]
+        moves = []
+        for piece in self.pieces:
+            if piece.color == color and self._is_on_board(piece):
+                from_pos = piece.position
+                for to_pos in self.get_piece_moves(piece):
+                    moves.append((from_pos, to_pos))
+        return moves
+
+    def _iter_piece_legal_moves(self, piece: Piece):
+        """逐个产生棋子走后不会被将军的目标位置"""
+        from_pos = piece.position
+        for to_pos in self.get_piece_moves(piece):
+            captured = self.make_move(from_pos, to_pos)
+            legal = not self.in_check(piece.color)
+            self.unmake_move(from_pos, to_pos, captured)
+            if legal:
+                yield to_pos
+
+    def _iter_legal_moves(self, color: PieceColor):
+        """逐个产生指定颜色的合法走法(起点, 终点)"""
+        if self.bitboard:
+            # 位棋盘后端的走法生成和将军检测全程在掩码上完成
+            for from_sq, to_sq in self.bitboard.legal_object_moves(color):
+                yield SQUARES[from_sq], SQUARES[to_sq]
+            return
+        for piece in self.pieces:
+            if piece.color == color and self._is_on_board(piece):
+                from_pos = piece.position
+                for to_pos in self._iter_piece_legal_moves(piece):
+                    yield from_pos, to_pos
+
+    def get_legal_moves(self, piece: Piece) -> List[Position]:
+        """获取棋子的合法目标位置"""
+        from_pos = piece.position
+        return [to_pos for move_from, to_pos in self.generate_legal_moves(piece.color)
+                if move_from == from_pos]
+
+    def generate_legal_moves(self, color: PieceColor,
+                             use_cache: bool = True) -> List[Tuple[Position, Position]]:
+        """生成指定颜色的全部合法走法，返回(起点, 终点)列表
+
+        搜索、perft等批量遍历应传入use_cache=False，避免挤占界面使用的缓存。
+        """
+        if not use_cache:
+            return list(self._iter_legal_moves(color))
+        key = (self.zobrist_key, 'moves', color)
+        moves = self.cache.get(key)
+        if moves is None:
+            moves = tuple(self._iter_legal_moves(color))
+            self.cache.put(key, moves)
+        return list(moves)
 
     def get_piece_at(self, position: Position) -> Optional[Piece]:
         """获取指定位置的棋子"""
-        for piece in self.pieces:
-            if piece.position.x == position.x and piece.position.y == position.y:
-                return piece
-        return None
+        return self.grid[position.index]
 
-    def move_piece(self, from_pos: Position, to_pos: Position) -> Tuple[bool, str]:
-        """移动棋子，返回(是否成功移动, 提示信息)"""
+    def move_piece(self, from_pos: Position, to_pos: Position,
+                   legal: bool = False) -> Tuple[bool, str]:
+        """移动棋子，返回(是否成功移动, 提示信息)
+
+        legal为True表示调用方已从合法走法中选出这一步，跳过合法性检查。
+        """
         piece = self.get_piece_at(from_pos)
         if not piece:
             return False, "没有找到棋子"
+        
+        original_pos = piece.position
+        if legal:
+            captured_piece = self.make_move(original_pos, to_pos)
+        else:
+            # 检查目标位置是否有己方棋子
+            target_piece = self.get_piece_at(to_pos)
+            if target_piece and target_piece.color == piece.color:
+                return False, "不能吃掉己方棋子"
+                
+            # 检查移动是否合法
+            if to_pos not in self.get_piece_moves(piece):
+                return False, "不符合走子规则"
             
-        # 检查目标位置是否有己方棋子
-        target_piece = self.get_piece_at(to_pos)
-        if target_piece and target_piece.color == piece.color:
-            return False, "不能吃掉己方棋子"
+            # 尝试移动
+            captured_piece = self.make_move(original_pos, to_pos)
             
-        # 检查移动是否合法
-        if to_pos not in piece.get_possible_moves(self):
-            return False, "不符合走子规则"
-        
-        # 尝试移动
-        original_pos = Position(piece.position.x, piece.position.y)  # 创建位置的副本
-        original_target = target_piece
-        if target_piece:
-            self.pieces.remove(target_piece)
-        piece.position = Position(to_pos.x, to_pos.y)  # 创建新的位置对象
-        
-        # 检查移动后是否会导致己方被将军
-        if self.is_check(piece.color):
-            # 恢复移动
-            piece.position = original_pos
-            if original_target:
-                self.pieces.append(original_target)
-            return False, "此移动会导致被将军"
+            # 检查移动后是否会导致己方被将军
+            if self.in_check(piece.color):
+                # 恢复移动
+                self.unmake_move(original_pos, to_pos, captured_piece)
+                return False, "此移动会导致被将军"
+        
+        if captured_piece:
+            self.pieces.remove(captured_piece)
         
         # 记录移动历史
-        self.move_history.append({
-            'piece': piece,
-            'from_pos': original_pos,
-            'to_pos': Position(to_pos.x, to_pos.y),  # 创建位置的副本
-            'captured_piece': original_target
-        })
+        self.move_history.append(encode_move(original_pos, to_pos, captured_piece, piece))
         
         # 检查是否将军对方
         opponent_color = PieceColor.BLACK if piece.color == PieceColor.RED else PieceColor.RED
@@ -172,20 +521,14 @@ class Board:
         if not self.move_history:
             return False
         
-        # 获取最后一步移动的记录
-        last_move = self.move_history.pop()
-        
-        # 恢复棋子位置
-        piece = last_move['piece']
-        piece.position = Position(last_move['from_pos'].x, last_move['from_pos'].y)  # 创建新的位置对象
-        
-        # 如果有被吃掉的棋子，将其放回
-        if last_move['captured_piece']:
-            captured_piece = last_move['captured_piece']
-            # 确保被吃掉的棋子不在棋盘上
-            if captured_piece not in self.pieces:
-                self.pieces.append(captured_piece)
-        
+        # 解码最后一步移动，被吃掉的棋子按记录的颜色和类型重新放回
+        from_pos, to_pos, captured_kind = decode_move(self.move_history.pop())
+        captured_piece = None
+        if captured_kind:
+            color, piece_type = captured_kind
+            captured_piece = PIECE_CLASSES[piece_type](color, to_pos)
+            self.pieces.append(captured_piece)
+        self.unmake_move(from_pos, to_pos, captured_piece)
         return True
 
     def restart_game(self):
@@ -195,6 +538,7 @@ class Board:
     def to_dict(self) -> Dict[str, Any]:
         """将棋盘状态转换为字典"""
         return {
+            'side_to_move': self.side_to_move.name,
             'pieces': [
                 {
                     'type': piece.__class__.__name__,
@@ -206,7 +550,7 @@ class Board:
         }
 
     @classmethod
-    def from_dict(cls, data: Dict[str, Any]) -> 'Board':
+    def from_dict(cls, data: Dict[str, Any], backend: str = BACKEND_OBJECTS) -> 'Board':
         """从字典创建棋盘状态"""
         from .pieces.specific_pieces import (
             King, Advisor, Elephant, Horse, Chariot, Cannon, Pawn
@@ -222,8 +566,8 @@ class Board:
             'Pawn': Pawn
         }
         
-        board = cls()
-        board.pieces.clear()  # 清空当前棋子
+        board = cls(backend, setup=False)
+        board.side_to_move = PieceColor[data.get('side_to_move', PieceColor.RED.name)]
         
         for piece_data in data['pieces']:
             piece_class = piece_classes[piece_data['type']]
@@ -234,4 +578,91 @@ class Board:
             )
             board.pieces.append(piece_class(color, position))
         
-        return board
\ No newline at end of file
+        board._rebuild_grid()
+        return board
+
+    def probe_tablebase(self, directory: Optional[str] = None):
+        """查询残局库（需要NumPy），返回走子方视角的TablebaseResult；没有对应残局库时返回None"""
+        from .tablebase import open_tablebases
+        return open_tablebases(directory).probe(self)
+
+    def tablebase_move(self, directory: Optional[str] = None) -> Optional[Tuple[Position, Position]]:
+        """按残局库给出最佳走法；没有对应残局库时返回None"""
+        from .tablebase import open_tablebases
+        return open_tablebases(directory).best_move(self)
+
+    def to_fen(self) -> str:
+        """转换为FEN串：从黑方底线(y=9)到红方底线逐行书写，w/b表示走子方"""
+        rows = []
+        for y in range(BOARD_HEIGHT - 1, -1, -1):
+            row = ''
+            empty = 0
+            for piece in self.grid[y * BOARD_WIDTH:(y + 1) * BOARD_WIDTH]:
+                if piece is None:
+                    empty += 1
+                    continue
+                if empty:
+                    row += str(empty)
+                    empty = 0
+                letter = _FEN_LETTERS[piece.piece_type]
+                row += letter.upper() if piece.color == PieceColor.RED else letter
+            if empty:
+                row += str(empty)
+            rows.append(row)
+        side = 'w' if self.side_to_move == PieceColor.RED else 'b'
+        return f"{'/'.join(rows)} {side} - - 0 1"
+
+    @classmethod
+    def from_fen(cls, fen: str, backend: str = BACKEND_OBJECTS) -> 'Board':
+        """由FEN串创建棋盘，只使用棋子布局和走子方两个字段"""
+        fields = fen.split()
+        rows = fields[0].split('/') if fields else []
+        if len(rows) != BOARD_HEIGHT:
+            raise ValueError(f"无效的FEN：{fen}")
+        board = cls(backend, setup=False)
+        for row_number, row in enumerate(rows):
+            y = BOARD_HEIGHT - 1 - row_number
+            x = 0
+            for char in row:
+                if char.isdigit():
+                    x += int(char)
+                    continue
+                kind = _FEN_KINDS.get(char)
+                if kind is None or x >= BOARD_WIDTH:
+                    raise ValueError(f"无效的FEN：{fen}")
+                color, piece_type = kind
+                board.pieces.append(PIECE_CLASSES[piece_type](color, SQUARES[y * BOARD_WIDTH + x]))
+                x += 1
+            if x != BOARD_WIDTH:
+                raise ValueError(f"无效的FEN：{fen}")
+        side = fields[1] if len(fields) > 1 else 'w'
+        if side not in ('w', 'r', 'b'):
+            raise ValueError(f"无效的FEN：{fen}")
+        board.side_to_move = PieceColor.BLACK if side == 'b' else PieceColor.RED
+        board._rebuild_grid()
+        return board
+
+    def to_bytes(self) -> bytes:
+        """转换为POSITION_BYTES字节的定长二进制局面"""
+        codes = [_PIECE_CODES[piece.color, piece.piece_type] if piece else 0 for piece in self.grid]
+        data = bytearray(POSITION_BYTES)
+        data[0] = 0 if self.side_to_move == PieceColor.RED else 1
+        data[1:] = bytes(low | high << 4 for low, high in zip(codes[0::2], codes[1::2]))
+        return bytes(data)
+
+    @classmethod
+    def from_bytes(cls, data: bytes, backend: str = BACKEND_OBJECTS) -> 'Board':
+        """由to_bytes的结果创建棋盘"""
+        if len(data) != POSITION_BYTES or data[0] > 1:
+            raise ValueError("无效的二进制局面")
+        board = cls(backend, setup=False)
+        board.side_to_move = PieceColor.BLACK if data[0] else PieceColor.RED
+        pieces = board.pieces
+        for index in range(0, BOARD_SIZE, 2):
+            entries = _BYTE_PIECES[data[1 + index // 2]]
+            if entries is None:
+                raise ValueError("无效的二进制局面")
+            for offset, piece_class, color in entries:
+                pieces.append(piece_class(color, SQUARES[index + offset]))
+        board._rebuild_grid()
+        return board
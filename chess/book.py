@@ -0,0 +1,180 @@
+"""开局库
+
+开局库文件是按(局面键, 走法)排序的定长记录，每条记录包含走法权重和
+走子方视角的胜/和/负局数。打开时只做内存映射，查询时二分查找，
+只有实际访问到的页会被读入。
+
+用法：
+    python -m chess.book build -o book.bin games/*.pgn --max-ply 20
+    python -m chess.book probe book.bin --fen "<FEN>"
+"""
+import argparse
+import mmap
+import os
+import random
+import struct
+import sys
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .archive import read_pgn_games, replay_game, NO_MOVE
+from .board import Board, decode_move
+from .notation import move_to_iccs
+from .piece import PieceColor, Position
+
+Move = Tuple[Position, Position]
+
+_MAGIC = b"XQBOOK01"
+# 局面键、走法编码、权重、胜、和、负（胜负为走子方视角）
+_BOOK_RECORD = struct.Struct(">QHIIII")
+_MAX_COUNT = 0xFFFFFFFF
+
+@dataclass
+class BookEntry:
+    """开局库中某个局面的一个走法"""
+    move: Move
+    weight: int
+    wins: int
+    draws: int
+    losses: int
+
+def book_weight(wins: int, draws: int, losses: int) -> int:
+    """走法权重：胜局计2分、和局计1分"""
+    return min(2 * wins + draws, _MAX_COUNT)
+
+def build_book(games: Iterable[Tuple[Dict[str, str], List[str]]], output: str,
+               max_ply: int = 20, min_games: int = 1) -> int:
+    """由对局生成开局库文件，只统计每局前max_ply步，返回写入的记录数"""
+    counts: Dict[Tuple[int, int], List[int]] = {}
+    for headers, moves in games:
+        fen = headers.get("FEN")
+        positions = replay_game(moves[:max_ply], fen)
+        if positions is None:
+            continue
+        result = headers.get("Result")
+        red_first = not fen or Board.from_fen(fen).side_to_move == PieceColor.RED
+        for ply, (key, move) in enumerate(positions):
+            if move == NO_MOVE:
+                continue
+            stats = counts.setdefault((key, move), [0, 0, 0])
+            red_to_move = (ply % 2 == 0) == red_first
+            if result == "1/2-1/2":
+                stats[1] += 1
+            elif result in ("1-0", "0-1"):
+                stats[0 if (result == "1-0") == red_to_move else 2] += 1
+
+    written = 0
+    with open(output, 'wb') as f:
+        f.write(_MAGIC)
+        for (key, move), (wins, draws, losses) in sorted(counts.items()):
+            if wins + draws + losses < min_games:
+                continue
+            f.write(_BOOK_RECORD.pack(key, move, book_weight(wins, draws, losses),
+                                      min(wins, _MAX_COUNT), min(draws, _MAX_COUNT),
+                                      min(losses, _MAX_COUNT)))
+            written += 1
+    return written
+
+class OpeningBook:
+    """只读的开局库"""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size < len(_MAGIC):
+                raise ValueError(f"不是有效的开局库：{path}")
+            self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._data[:len(_MAGIC)] != _MAGIC:
+            self._data.close()
+            raise ValueError(f"不是有效的开局库：{path}")
+
+    def __enter__(self) -> 'OpeningBook':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self._data.close()
+
+    def __len__(self) -> int:
+        return (len(self._data) - len(_MAGIC)) // _BOOK_RECORD.size
+
+    def _lower_bound(self, key: bytes) -> int:
+        """第一条局面键不小于key的记录序号"""
+        size = _BOOK_RECORD.size
+        base = len(_MAGIC)
+        low, high = 0, len(self)
+        while low < high:
+            middle = (low + high) // 2
+            offset = base + middle * size
+            if self._data[offset:offset + 8] < key:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def lookup(self, board: Board) -> List[BookEntry]:
+        """当前局面在开局库中的合法走法，按权重从高到低排列"""
+        key = board.zobrist_key.to_bytes(8, 'big')
+        data = self._data
+        size = _BOOK_RECORD.size
+        offset = len(_MAGIC) + self._lower_bound(key) * size
+        entries = []
+        while offset < len(data) and data[offset:offset + 8] == key:
+            _, move, weight, wins, draws, losses = _BOOK_RECORD.unpack_from(data, offset)
+            from_pos, to_pos, _ = decode_move(move)
+            entries.append(BookEntry((from_pos, to_pos), weight, wins, draws, losses))
+            offset += size
+        if entries:
+            # 局面键可能冲突，只保留当前局面的合法走法
+            legal = set(board.generate_legal_moves(board.side_to_move))
+            entries = [entry for entry in entries if entry.move in legal]
+        entries.sort(key=lambda entry: entry.weight, reverse=True)
+        return entries
+
+    def choose(self, board: Board, rng: Optional[random.Random] = None) -> Optional[Move]:
+        """按权重随机选择一个开局库走法，没有可用走法时返回None"""
+        entries = [entry for entry in self.lookup(board) if entry.weight > 0]
+        if not entries:
+            return None
+        rng = rng or random
+        return rng.choices([entry.move for entry in entries],
+                           weights=[entry.weight for entry in entries])[0]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m chess.book", description="生成和查询开局库")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build_parser = commands.add_parser("build", help="由PGN棋谱生成开局库")
+    build_parser.add_argument("files", nargs="+", help="PGN文件（ICCS记谱）")
+    build_parser.add_argument("-o", "--output", required=True, help="开局库文件")
+    build_parser.add_argument("--max-ply", type=int, default=20, help="每局统计的步数（默认20）")
+    build_parser.add_argument("--min-games", type=int, default=1, help="走法至少出现的局数（默认1）")
+
+    probe_parser = commands.add_parser("probe", help="查询局面的开局库走法")
+    probe_parser.add_argument("book", help="开局库文件")
+    probe_parser.add_argument("--fen", help="查询的局面，默认为初始局面")
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        def games():
+            for path in args.files:
+                with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                    yield from read_pgn_games(f)
+        count = build_book(games(), args.output, args.max_ply, args.min_games)
+        print(f"写入 {count} 条开局库记录")
+        return 0
+
+    board = Board.from_fen(args.fen) if args.fen else Board()
+    with OpeningBook(args.book) as book:
+        entries = book.lookup(board)
+        if not entries:
+            print("开局库中没有该局面")
+        for entry in entries:
+            print(f"{move_to_iccs(*entry.move)}: 权重 {entry.weight}  "
+                  f"胜 {entry.wins}  和 {entry.draws}  负 {entry.losses}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,133 @@
+"""无界面的命令行入口
+
+只导入规则核心（Board、棋子、FEN），不依赖PyQt6，适合在没有图形环境的
+分析服务器上使用；搜索引擎只在需要电脑走棋时才导入。
+
+用法：
+    python -m chess.cli show --fen "<FEN>" h2e2 h9g7
+    python -m chess.cli moves h2e2
+    python -m chess.cli play --engine black -d 4
+"""
+import argparse
+import sys
+from typing import List
+
+from .board import Board
+from .notation import FILES, iccs_to_move, move_to_iccs
+from .piece import PieceColor
+
+_EMPTY = "．"
+
+def format_board(board: Board) -> str:
+    """棋盘的文本图，黑方在上；行号为ICCS纵坐标，列号为ICCS横坐标"""
+    lines = []
+    for y in range(9, -1, -1):
+        row = []
+        for x in range(9):
+            piece = board.grid[y * 9 + x]
+            row.append(piece.name if piece else _EMPTY)
+        lines.append(f"{y} " + "".join(row))
+    lines.append("  " + "".join(chr(ord(letter) - ord('a') + ord('ａ')) for letter in FILES))
+    return "\n".join(lines)
+
+def format_status(board: Board) -> str:
+    """走子方以及将军、将死或困毙状态"""
+    side = board.side_to_move
+    name = "红方" if side == PieceColor.RED else "黑方"
+    in_check = board.is_check(side)
+    if not board.generate_legal_moves(side):
+        winner = "黑方" if side == PieceColor.RED else "红方"
+        return f"{name}{'被将死' if in_check else '困毙'}，{winner}胜"
+    return f"{name}走棋" + ("（被将军）" if in_check else "")
+
+def play_moves(board: Board, moves: List[str]):
+    """依次走ICCS走法，遇到非法走法时抛出ValueError"""
+    for text in moves:
+        from_pos, to_pos = iccs_to_move(text)
+        piece = board.get_piece_at(from_pos)
+        if piece is None or piece.color != board.side_to_move:
+            raise ValueError(f"{text}：起点没有走子方的棋子")
+        success, message = board.move_piece(from_pos, to_pos)
+        if not success:
+            raise ValueError(f"{text}：{message}")
+
+def _engine_move(board: Board, args, searcher):
+    from .engine.search import SearchLimits
+    limits = SearchLimits(args.depth, args.time)
+    if limits.depth is None and limits.time is None:
+        limits.time = 3.0
+    return searcher.search(board, limits).best_move
+
+def _play(board: Board, args) -> int:
+    """交互对弈：输入ICCS走法，undo悔棋，fen显示局面，quit退出"""
+    engine_color = {"red": PieceColor.RED, "black": PieceColor.BLACK}.get(args.engine)
+    searcher = None
+    if engine_color is not None:
+        from .engine.search import Searcher
+        searcher = Searcher()
+    while True:
+        print(format_board(board))
+        status = format_status(board)
+        print(status)
+        if status.endswith("胜"):
+            return 0
+        if board.side_to_move == engine_color:
+            move = _engine_move(board, args, searcher)
+            print(f"电脑走 {move_to_iccs(*move)}")
+            board.move_piece(*move)
+            continue
+        try:
+            text = input("> ").strip()
+        except EOFError:
+            return 0
+        if text in ("quit", "exit", "q"):
+            return 0
+        if text == "fen":
+            print(board.to_fen())
+        elif text == "undo":
+            # 与电脑对弈时连同电脑的上一步一起悔掉
+            for _ in range(2 if engine_color is not None else 1):
+                board.undo_last_move()
+        elif text:
+            try:
+                play_moves(board, [text])
+            except ValueError as e:
+                print(e)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m chess.cli", description="无界面的中国象棋")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    def add_position_arguments(command_parser):
+        command_parser.add_argument("moves", nargs="*", help="从起始局面依次走的ICCS走法")
+        command_parser.add_argument("--fen", help="起始局面，默认为初始局面")
+
+    add_position_arguments(commands.add_parser("show", help="显示局面、FEN和走子方状态"))
+    add_position_arguments(commands.add_parser("moves", help="列出走子方的全部合法走法"))
+    play_parser = commands.add_parser("play", help="在终端中对弈")
+    add_position_arguments(play_parser)
+    play_parser.add_argument("--engine", choices=("red", "black"), help="电脑执红或执黑，默认双人对弈")
+    play_parser.add_argument("-d", "--depth", type=int, help="电脑的搜索深度")
+    play_parser.add_argument("-t", "--time", type=float, help="电脑每步思考时间（秒，默认3）")
+    args = parser.parse_args(argv)
+
+    try:
+        board = Board.from_fen(args.fen) if args.fen else Board()
+        play_moves(board, args.moves)
+    except ValueError as e:
+        parser.error(str(e))
+
+    if args.command == "show":
+        print(format_board(board))
+        print(board.to_fen())
+        print(format_status(board))
+    elif args.command == "moves":
+        moves = sorted(move_to_iccs(*move) for move in board.generate_legal_moves(board.side_to_move))
+        print(" ".join(moves))
+        print(f"共 {len(moves)} 种走法")
+    else:
+        return _play(board, args)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
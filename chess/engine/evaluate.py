@@ -0,0 +1,5 @@
+from ..piece import PieceColor
+
+def evaluate(board) -> int:
+    """静态评估，返回走子方视角的分数（Board.score随走子增量维护）"""
+    return board.score if board.side_to_move == PieceColor.RED else -board.score
@@ -0,0 +1,133 @@
+"""多进程并行搜索
+
+按根节点划分走法：每个工作进程对分到的根走法做完整的迭代加深搜索，
+最后在所有进程都完成的最大深度上比较各自的最佳分数。工作进程常驻，
+各自的置换表在多次搜索之间保留。
+
+各进程通过共享数组按深度交换已找到的最好根节点分数，开始新一层迭代时
+以它作为根节点的alpha（期望窗口下界），落后的进程只需证明自己的走法更差。
+置换表和走法排序信息不共享，每个进程的第一个根走法仍按全窗口搜索，
+因此总节点数明显多于单进程：初始局面4个进程搜索深度5约多37%
+（不共享分数时约多41%），并行只在核心数足够时才划算。
+"""
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
+
+from ..board import Board
+from ..piece import Position
+from .search import INFINITY, MAX_PLY, Move, Searcher, SearchLimits, SearchResult, probe_tablebase
+
+XY = Tuple[int, int]
+
+_worker_searcher: Optional[Searcher] = None
+
+def _init_worker(stop_event, root_bounds):
+    global _worker_searcher
+    _worker_searcher = Searcher()
+    _worker_searcher.stop_event = stop_event
+    _worker_searcher.root_bounds = root_bounds
+
+def _to_xy(move: Move) -> Tuple[XY, XY]:
+    return (move[0].x, move[0].y), (move[1].x, move[1].y)
+
+def _from_xy(move: Tuple[XY, XY]) -> Move:
+    return Position(*move[0]), Position(*move[1])
+
+def _search_subset(state, root_moves, limits: SearchLimits):
+    """工作进程任务：只搜索分到的根走法，返回每层迭代的结果和节点数"""
+    board = Board.from_bytes(state)
+    iterations = []
+
+    def record(result: SearchResult):
+        iterations.append((
+            result.depth, result.score, _to_xy(result.best_move),
+            [_to_xy(move) for move in result.pv]
+        ))
+
+    result = _worker_searcher.search(
+        board, limits, record, root_moves=[_from_xy(move) for move in root_moves]
+    )
+    return iterations, result.nodes, _to_xy(result.best_move) if result.best_move else None
+
+class ParallelSearcher:
+    """多进程根节点划分搜索器"""
+
+    def __init__(self, workers: Optional[int] = None, tablebase_dir: Optional[str] = None):
+        self.workers = workers or os.cpu_count() or 1
+        self.tablebase_dir = tablebase_dir  # 残局库目录，根局面在库中时直接给出库中走法
+        context = multiprocessing.get_context('spawn')
+        self._stop_event = context.Event()
+        # 按深度索引（含将军延伸），记录各进程目前找到的最好根节点分数
+        self._root_bounds = context.Array('i', MAX_PLY + 2)
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers, mp_context=context,
+            initializer=_init_worker, initargs=(self._stop_event, self._root_bounds)
+        )
+
+    def __enter__(self) -> 'ParallelSearcher':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def stop(self):
+        """通知所有工作进程停止搜索"""
+        self._stop_event.set()
+
+    def close(self):
+        """结束工作进程"""
+        self.stop()
+        self._executor.shutdown(wait=True)
+
+    def search(self, board: Board, limits: Optional[SearchLimits] = None) -> SearchResult:
+        """并行搜索board.side_to_move的最佳走法"""
+        limits = limits or SearchLimits()
+        start = time.perf_counter()
+        self._stop_event.clear()
+        if self.tablebase_dir is not None:
+            try:
+                result = probe_tablebase(board, self.tablebase_dir)
+            except ImportError:
+                self.tablebase_dir = None  # 没有安装NumPy
+            else:
+                if result is not None:
+                    return result
+        moves = board.generate_legal_moves(board.side_to_move, use_cache=False)
+        if not moves:
+            return SearchResult(None, 0, 0, 0, 0.0)
+        with self._root_bounds.get_lock():
+            self._root_bounds[:] = [-INFINITY] * len(self._root_bounds)
+
+        # 轮流分配根走法，节点数限制按进程平分
+        groups = [moves[i::self.workers] for i in range(self.workers)]
+        groups = [group for group in groups if group]
+        worker_limits = SearchLimits(
+            limits.depth, limits.time,
+            limits.nodes // len(groups) if limits.nodes is not None else None
+        )
+        state = board.to_bytes()
+        futures = [
+            self._executor.submit(_search_subset, state, [_to_xy(move) for move in group], worker_limits)
+            for group in groups
+        ]
+        reports = [future.result() for future in futures]
+        elapsed = time.perf_counter() - start
+        nodes = sum(report[1] for report in reports)
+
+        # 在所有进程都完成的最大深度上比较分数
+        completed = [report[0] for report in reports if report[0]]
+        if not completed:
+            fallback = next((report[2] for report in reports if report[2]), _to_xy(moves[0]))
+            return SearchResult(_from_xy(fallback), 0, 0, nodes, elapsed)
+        depth = min(iterations[-1][0] for iterations in completed)
+        best = None
+        for iterations in completed:
+            for iteration_depth, score, best_move, pv in iterations:
+                if iteration_depth == depth and (best is None or score > best[0]):
+                    best = (score, best_move, pv)
+        score, best_move, pv = best
+        pv_moves: List[Move] = [_from_xy(move) for move in pv]
+        return SearchResult(_from_xy(best_move), score, depth, nodes, elapsed, pv_moves)
@@ -0,0 +1,460 @@
+"""Alpha-Beta搜索引擎
+
+在Board上就地走子/撤销进行负极大值Alpha-Beta搜索，配合迭代加深、
+置换表、杀手走法和历史启发排序，可按时间、节点数或深度停止。
+
+用法：
+    python -m chess.engine.search -t 3
+    python -m chess.engine.search -d 5 --file game.chess
+    python -m chess.engine.search -t 10 --jobs 0
+    python -m chess.engine.search -t 3 --book book.bin
+"""
+import argparse
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from ..board import Board, BACKEND_OBJECTS, BACKEND_BITBOARD
+from ..piece import Position
+from ..evaluation import PIECE_VALUES
+from .evaluate import evaluate
+
+Move = Tuple[Position, Position]
+
+MATE_SCORE = 30000
+MATE_BOUND = MATE_SCORE - 1000  # 超过此值的分数表示杀棋
+INFINITY = MATE_SCORE + 1
+MAX_PLY = 64
+
+# 置换表条目类型
+EXACT, LOWER_BOUND, UPPER_BOUND = 0, 1, 2
+
+@dataclass
+class SearchLimits:
+    """搜索限制，未设置的项不生效；全部未设置时搜索到最大深度"""
+    depth: Optional[int] = None
+    time: Optional[float] = None  # 秒
+    nodes: Optional[int] = None
+
+@dataclass
+class SearchResult:
+    """一次搜索的结果"""
+    best_move: Optional[Move]
+    score: int
+    depth: int
+    nodes: int
+    elapsed: float
+    pv: List[Move] = field(default_factory=list)
+
+    @property
+    def nps(self) -> int:
+        """每秒搜索节点数"""
+        return int(self.nodes / self.elapsed) if self.elapsed > 0 else 0
+
+    @property
+    def is_mate(self) -> bool:
+        """分数是否为杀棋分"""
+        return abs(self.score) > MATE_BOUND
+
+def probe_tablebase(board: Board, tablebase_dir: str) -> Optional[SearchResult]:
+    """根局面在残局库中时返回库中的最佳走法和杀棋分数；没有安装NumPy时抛出ImportError"""
+    from ..tablebase import open_tablebases, WIN, LOSS
+    start = time.perf_counter()
+    tablebases = open_tablebases(tablebase_dir)
+    probe = tablebases.probe(board)
+    if probe is None:
+        return None
+    move = tablebases.best_move(board)
+    if move is None:
+        return None
+    if probe.result == WIN:
+        score = MATE_SCORE - probe.plies
+    elif probe.result == LOSS:
+        score = -(MATE_SCORE - probe.plies)
+    else:
+        score = 0
+    return SearchResult(move, score, 0, 0, time.perf_counter() - start, [move])
+
+def _move_key(move: Move) -> int:
+    from_pos, to_pos = move
+    return from_pos.index * 90 + to_pos.index
+
+class Searcher:
+    """负极大值Alpha-Beta搜索器，置换表在多次搜索之间保留"""
+
+    def __init__(self, tt_size: int = 1 << 18, tablebase_dir: Optional[str] = None):
+        self.tablebase_dir = tablebase_dir  # 残局库目录，根局面在库中时直接给出库中走法
+        # 置换表按 局面键 % tt_size 分槽，每槽一个条目(局面键, 深度, 分数, 类型, 最佳走法, 搜索代数)，
+        # 条目数不会超过tt_size
+        self.tt: Dict[int, Tuple[int, int, int, int, Optional[Move], int]] = {}
+        self.tt_size = tt_size
+        self._generation = 0  # 每次搜索加一，旧搜索留下的条目总是可以被替换
+        self.history: Dict[int, int] = {}
+        self.killers: List[List[Optional[Move]]] = [[None, None] for _ in range(MAX_PLY + 1)]
+        self.nodes = 0
+        self.stopped = False
+        self.pondering = False
+        self.stop_event = None  # 可选的跨进程停止事件（multiprocessing.Event），每1024个节点检查一次
+        # 可选的跨进程根节点分数（multiprocessing.Array，按深度索引），并行搜索的各进程借此共享alpha
+        self.root_bounds = None
+        self._root_moves: Optional[Set[Move]] = None
+        self._path: Set[int] = set()
+        self._start = 0.0
+        self._deadline: Optional[float] = None
+        self._node_limit: Optional[int] = None
+        self._ponder_time: Optional[float] = None
+
+    def stop(self):
+        """请求停止搜索，可以从其他线程调用"""
+        self.stopped = True
+
+    def ponderhit(self, time_limit: Optional[float] = None):
+        """后台思考命中：从现在开始按给定时间（默认使用搜索时传入的限制）计时，可以从其他线程调用"""
+        if time_limit is None:
+            time_limit = self._ponder_time
+        self._start = time.perf_counter()
+        self._deadline = self._start + time_limit if time_limit is not None else None
+        self.pondering = False
+
+    def clear(self):
+        """清空置换表和走法排序信息"""
+        self.tt.clear()
+        self.history.clear()
+        self.killers = [[None, None] for _ in range(MAX_PLY + 1)]
+
+    def search(self, board: Board, limits: Optional[SearchLimits] = None,
+               info_callback: Optional[Callable[[SearchResult], None]] = None,
+               ponder: bool = False,
+               started_callback: Optional[Callable[[], None]] = None,
+               root_moves: Optional[List[Move]] = None) -> SearchResult:
+        """迭代加深搜索board.side_to_move的最佳走法，搜索结束后局面保持不变
+
+        ponder为True时为后台思考：不计时，直到ponderhit()后才按limits.time计时。
+        started_callback在搜索状态重置之后、开始搜索之前调用，其他线程可借此
+        补发在搜索开始前到达的stop()/ponderhit()。
+        root_moves不为None时只在这些根节点走法中选择（用于并行搜索划分根节点）。
+        """
+        limits = limits or SearchLimits()
+        start = time.perf_counter()
+        self.nodes = 0
+        self.stopped = False
+        self.pondering = ponder
+        self._path.clear()
+        self._start = start
+        self._ponder_time = limits.time
+        if ponder or limits.time is None:
+            self._deadline = None
+        else:
+            self._deadline = start + limits.time
+        self._node_limit = limits.nodes
+        self._root_moves = set(root_moves) if root_moves is not None else None
+        if started_callback:
+            started_callback()
+        if self.tablebase_dir is not None and root_moves is None:
+            result = self._probe_tablebase(board)
+            if result is not None:
+                if info_callback:
+                    info_callback(result)
+                return result
+        max_depth = min(limits.depth or MAX_PLY, MAX_PLY)
+        if len(self.tt) > self.tt_size:
+            self.tt.clear()  # tt_size调小后旧的分槽不再有效
+        self._generation += 1
+
+        result = SearchResult(None, 0, 0, 0, 0.0)
+        for depth in range(1, max_depth + 1):
+            self._root_best = None
+            score = self._negamax(board, depth, -INFINITY, INFINITY, 0)
+            elapsed = time.perf_counter() - start
+            if self.stopped:
+                # 未完成的迭代结果不可靠，只在还没有任何结果时采用
+                if self._root_best is not None and result.best_move is None:
+                    result.best_move = self._root_best
+                break
+            result = SearchResult(self._root_best, score, depth, self.nodes, elapsed,
+                                  self._extract_pv(board, depth))
+            if info_callback:
+                info_callback(result)
+            if result.best_move is None or abs(score) > MATE_BOUND:
+                break  # 无子可走或已找到杀棋
+            deadline = self._deadline
+            if deadline is not None and time.perf_counter() - self._start > (deadline - self._start) / 2:
+                break  # 下一层大概率来不及完成
+
+        result.nodes = self.nodes
+        result.elapsed = time.perf_counter() - start
+        if result.best_move is None:
+            moves = root_moves or board.generate_legal_moves(board.side_to_move, use_cache=False)
+            if moves:
+                result.best_move = moves[0]
+        return result
+
+    def _probe_tablebase(self, board: Board) -> Optional[SearchResult]:
+        try:
+            return probe_tablebase(board, self.tablebase_dir)
+        except ImportError:
+            self.tablebase_dir = None  # 没有安装NumPy
+            return None
+
+    def _check_limits(self):
+        if self._deadline is not None and time.perf_counter() >= self._deadline:
+            self.stopped = True
+        if self._node_limit is not None and self.nodes >= self._node_limit:
+            self.stopped = True
+        if self.stop_event is not None and self.stop_event.is_set():
+            self.stopped = True
+
+    def _store(self, key: int, depth: int, score: int, flag: int, move: Optional[Move], ply: int):
+        # 杀棋分数按到当前节点的距离存储，读取时再换算
+        if score > MATE_BOUND:
+            score += ply
+        elif score < -MATE_BOUND:
+            score -= ply
+        # 同一局面或旧搜索的条目直接替换，否则保留深度更大的条目
+        slot = key % self.tt_size
+        old = self.tt.get(slot)
+        if old is None or old[0] == key or old[5] != self._generation or depth >= old[1]:
+            self.tt[slot] = (key, depth, score, flag, move, self._generation)
+
+    def _probe(self, key: int) -> Optional[Tuple[int, int, int, int, Optional[Move], int]]:
+        """取出该局面的置换表条目，槽中是其他局面时返回None"""
+        entry = self.tt.get(key % self.tt_size)
+        if entry is not None and entry[0] == key:
+            return entry
+        return None
+
+    def _order_moves(self, board: Board, moves: List[Move], tt_move: Optional[Move],
+                     ply: int) -> List[Move]:
+        killers = self.killers[ply]
+        history = self.history
+        grid = board.grid
+        scored = []
+        for move in moves:
+            from_pos, to_pos = move
+            if move == tt_move:
+                order = 1 << 30
+            else:
+                captured = grid[to_pos.index]
+                if captured:
+                    mover = grid[from_pos.index]
+                    order = (1 << 20) + PIECE_VALUES[captured.piece_type] * 16 \
+                        - PIECE_VALUES[mover.piece_type] // 16
+                elif move == killers[0] or move == killers[1]:
+                    order = 1 << 19
+                else:
+                    order = history.get(_move_key(move), 0)
+            scored.append((order, move))
+        scored.sort(key=lambda item: item[0], reverse=True)
+        return [move for _, move in scored]
+
+    def _negamax(self, board: Board, depth: int, alpha: int, beta: int, ply: int) -> int:
+        self.nodes += 1
+        if self.nodes & 1023 == 0:
+            self._check_limits()
+        if self.stopped:
+            return 0
+
+        key = board.zobrist_key
+        if ply > 0 and key in self._path:
+            return 0  # 重复局面按和棋处理
+        color = board.side_to_move
+        in_check = board.in_check(color)
+        if in_check:
+            depth += 1  # 被将军时延伸一层
+        if depth <= 0 or ply >= MAX_PLY:
+            return self._quiesce(board, alpha, beta, ply)
+
+        tt_move = None
+        entry = self._probe(key)
+        if entry is not None:
+            _, entry_depth, entry_score, flag, tt_move, _ = entry
+            if ply > 0 and entry_depth >= depth:
+                if entry_score > MATE_BOUND:
+                    entry_score -= ply
+                elif entry_score < -MATE_BOUND:
+                    entry_score += ply
+                if flag == EXACT:
+                    return entry_score
+                if flag == LOWER_BOUND and entry_score >= beta:
+                    return entry_score
+                if flag == UPPER_BOUND and entry_score <= alpha:
+                    return entry_score
+
+        moves = board.generate_pseudo_moves(color)
+        if ply == 0 and self._root_moves is not None:
+            moves = [move for move in moves if move in self._root_moves]
+        moves = self._order_moves(board, moves, tt_move, ply)
+        original_alpha = alpha
+        best_score = -INFINITY
+        best_move = None
+        legal_moves = 0
+        self._path.add(key)
+        root_bounds = self.root_bounds if ply == 0 else None
+        if root_bounds is not None and root_bounds[depth] - 1 > alpha:
+            # 其他进程已在这一层找到更好的根走法：本进程只需证明自己的走法不如它
+            alpha = original_alpha = root_bounds[depth] - 1
+        for move in moves:
+            from_pos, to_pos = move
+            captured = board.make_move(from_pos, to_pos)
+            if board.in_check(color):
+                board.unmake_move(from_pos, to_pos, captured)
+                continue
+            legal_moves += 1
+            score = -self._negamax(board, depth - 1, -beta, -alpha, ply + 1)
+            board.unmake_move(from_pos, to_pos, captured)
+            if self.stopped:
+                self._path.discard(key)
+                return 0
+            if score > best_score:
+                best_score = score
+                best_move = move
+                if ply == 0:
+                    self._root_best = move
+            if score > alpha:
+                alpha = score
+                if root_bounds is not None:
+                    with root_bounds.get_lock():
+                        if score > root_bounds[depth]:
+                            root_bounds[depth] = score
+            if alpha >= beta:
+                if captured is None:
+                    killers = self.killers[ply]
+                    if killers[0] != move:
+                        killers[1] = killers[0]
+                        killers[0] = move
+                    move_key = _move_key(move)
+                    self.history[move_key] = self.history.get(move_key, 0) + depth * depth
+                break
+        self._path.discard(key)
+
+        if legal_moves == 0:
+            return -MATE_SCORE + ply  # 将死或困毙都判负
+
+        if best_score <= original_alpha:
+            flag = UPPER_BOUND
+        elif best_score >= beta:
+            flag = LOWER_BOUND
+        else:
+            flag = EXACT
+        self._store(key, depth, best_score, flag, best_move, ply)
+        return best_score
+
+    def _quiesce(self, board: Board, alpha: int, beta: int, ply: int) -> int:
+        """静态搜索：只展开吃子走法，避免在交换中途评估"""
+        self.nodes += 1
+        if self.nodes & 1023 == 0:
+            self._check_limits()
+        if self.stopped:
+            return 0
+
+        stand_pat = evaluate(board)
+        if stand_pat >= beta or ply >= MAX_PLY:
+            return stand_pat
+        if stand_pat > alpha:
+            alpha = stand_pat
+
+        color = board.side_to_move
+        grid = board.grid
+        captures = [
+            move for move in board.generate_pseudo_moves(color)
+            if grid[move[1].index] is not None
+        ]
+        for move in self._order_moves(board, captures, None, ply):
+            from_pos, to_pos = move
+            captured = board.make_move(from_pos, to_pos)
+            if board.in_check(color):
+                board.unmake_move(from_pos, to_pos, captured)
+                continue
+            score = -self._quiesce(board, -beta, -alpha, ply + 1)
+            board.unmake_move(from_pos, to_pos, captured)
+            if self.stopped:
+                return 0
+            if score >= beta:
+                return score
+            if score > alpha:
+                alpha = score
+        return alpha
+
+    def _extract_pv(self, board: Board, depth: int) -> List[Move]:
+        """沿置换表中的最佳走法取出主要变例"""
+        pv: List[Move] = []
+        made = []
+        seen = set()
+        while len(pv) < depth:
+            entry = self._probe(board.zobrist_key)
+            if entry is None or entry[4] is None or board.zobrist_key in seen:
+                break
+            seen.add(board.zobrist_key)
+            move = entry[4]
+            color = board.side_to_move
+            if move not in board.generate_pseudo_moves(color):
+                break
+            captured = board.make_move(*move)
+            if board.in_check(color):
+                board.unmake_move(move[0], move[1], captured)
+                break
+            made.append((move, captured))
+            pv.append(move)
+        for move, captured in reversed(made):
+            board.unmake_move(move[0], move[1], captured)
+        return pv
+
+def format_score(score: int) -> str:
+    """把分数格式化为便于阅读的文本"""
+    if score > MATE_BOUND:
+        return f"杀棋(剩{MATE_SCORE - score}步)"
+    if score < -MATE_BOUND:
+        return f"被杀(剩{MATE_SCORE + score}步)"
+    return str(score)
+
+def main(argv=None):
+    from ..perft import load_board
+    from ..notation import move_to_iccs
+
+    parser = argparse.ArgumentParser(prog="python -m chess.engine.search", description="分析局面")
+    parser.add_argument("-d", "--depth", type=int, help="最大搜索深度")
+    parser.add_argument("-t", "--time", type=float, help="搜索时间（秒）")
+    parser.add_argument("-n", "--nodes", type=int, help="最大搜索节点数")
+    parser.add_argument("-f", "--file", help="从存档文件读取局面，默认使用初始局面")
+    parser.add_argument("--fen", help="使用FEN串指定局面")
+    parser.add_argument("--book", help="开局库文件，局面在库中时直接给出库中走法")
+    parser.add_argument("--tablebases", help="残局库目录，局面在库中时直接给出库中走法")
+    parser.add_argument("--backend", choices=[BACKEND_OBJECTS, BACKEND_BITBOARD],
+                        default=BACKEND_OBJECTS, help="走法生成后端")
+    parser.add_argument("-j", "--jobs", type=int, default=1,
+                        help="并行搜索进程数，0表示使用全部CPU核心（默认1）")
+    args = parser.parse_args(argv)
+
+    limits = SearchLimits(args.depth, args.time, args.nodes)
+    if limits.depth is None and limits.time is None and limits.nodes is None:
+        limits.time = 5.0
+    board = load_board(args.file, args.backend, args.fen)
+    if args.book:
+        from ..book import OpeningBook
+        with OpeningBook(args.book) as book:
+            move = book.choose(board)
+        if move is not None:
+            print(f"开局库走法 {move_to_iccs(*move)}")
+            return 0
+
+    def report(result: SearchResult):
+        pv = " ".join(move_to_iccs(*move) for move in result.pv)
+        print(f"深度 {result.depth}  分数 {format_score(result.score)}  节点 {result.nodes}  "
+              f"{result.nps} 节点/秒  用时 {result.elapsed:.2f} 秒  变例 {pv}")
+
+    if args.jobs == 1:
+        result = Searcher(tablebase_dir=args.tablebases).search(board, limits, report)
+    else:
+        from .parallel import ParallelSearcher
+        with ParallelSearcher(args.jobs or None, tablebase_dir=args.tablebases) as searcher:
+            result = searcher.search(board, limits)
+        report(result)
+    if result.best_move is None:
+        print("无子可走")
+    else:
+        print(f"最佳走法 {move_to_iccs(*result.best_move)}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
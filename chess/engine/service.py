@@ -0,0 +1,181 @@
+"""在独立进程中运行搜索的引擎服务
+
+界面或其他调用方通过EngineProcess发送搜索请求，引擎进程在后台线程中接收
+stop/ponderhit等命令，因此可以在搜索进行中随时打断。搜索器在进程内常驻，
+置换表在后台思考（ponder）和正式搜索之间共享。指定开局库时，
+开局库中有的局面直接返回库中走法，不再搜索；指定残局库目录时，
+残局库中有的局面直接按库中结果走棋。
+"""
+import multiprocessing
+import queue
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+from .search import Searcher, SearchLimits, SearchResult
+
+XY = Tuple[int, int]
+
+def _move_to_xy(move) -> Optional[Tuple[XY, XY]]:
+    if move is None:
+        return None
+    from_pos, to_pos = move
+    return (from_pos.x, from_pos.y), (to_pos.x, to_pos.y)
+
+def _result_to_dict(request_id: int, result: SearchResult) -> Dict[str, Any]:
+    return {
+        'request_id': request_id,
+        'best_move': _move_to_xy(result.best_move),
+        'ponder_move': _move_to_xy(result.pv[1]) if len(result.pv) > 1 else None,
+        'score': result.score,
+        'depth': result.depth,
+        'nodes': result.nodes,
+        'nps': result.nps,
+        'elapsed': result.elapsed,
+        'pv': [_move_to_xy(move) for move in result.pv],
+        'book': False,
+    }
+
+def _book_result(request_id: int, move) -> Dict[str, Any]:
+    return {
+        'request_id': request_id,
+        'best_move': _move_to_xy(move),
+        'ponder_move': None,
+        'score': 0,
+        'depth': 0,
+        'nodes': 0,
+        'nps': 0,
+        'elapsed': 0.0,
+        'pv': [_move_to_xy(move)],
+        'book': True,
+    }
+
+def _engine_main(conn, book_path: Optional[str] = None, tablebase_dir: Optional[str] = None):
+    """引擎进程入口：主线程执行搜索，后台线程接收命令"""
+    from ..board import Board
+    from ..book import OpeningBook
+
+    searcher = Searcher(tablebase_dir=tablebase_dir)
+    book = None
+    if book_path:
+        try:
+            book = OpeningBook(book_path)
+        except (OSError, ValueError):
+            book = None  # 开局库不可用时照常搜索
+    requests: "queue.Queue[Optional[tuple]]" = queue.Queue()
+    send_lock = threading.Lock()
+    # stop/ponderhit作用于收到命令时已经提交的全部请求，
+    # 若请求还在排队，则在其搜索开始时补发
+    state_lock = threading.Lock()
+    received = {'last': 0, 'stop': 0, 'ponderhit': 0, 'ponder_time': None}
+
+    def send(message):
+        with send_lock:
+            conn.send(message)
+
+    def listen():
+        while True:
+            try:
+                command = conn.recv()
+            except EOFError:
+                command = ('quit',)
+            with state_lock:
+                if command[0] == 'search':
+                    received['last'] = command[1]
+                    requests.put(command)
+                elif command[0] == 'stop':
+                    received['stop'] = received['last']
+                    searcher.stop()
+                elif command[0] == 'ponderhit':
+                    received['ponderhit'] = received['last']
+                    received['ponder_time'] = command[1]
+                    searcher.ponderhit(command[1])
+                elif command[0] == 'quit':
+                    searcher.stop()
+                    requests.put(None)
+                    return
+
+    threading.Thread(target=listen, daemon=True).start()
+    while True:
+        command = requests.get()
+        if command is None:
+            break
+        _, request_id, state, limits, ponder = command
+
+        def started(request_id=request_id):
+            with state_lock:
+                if request_id <= received['stop']:
+                    searcher.stop()
+                elif ponder and request_id <= received['ponderhit']:
+                    searcher.ponderhit(received['ponder_time'])
+
+        board = Board.from_bytes(state)
+        if book and not ponder:
+            move = book.choose(board)
+            if move is not None:
+                send(('bestmove', _book_result(request_id, move)))
+                continue
+        result = searcher.search(
+            board, limits,
+            lambda info: send(('info', _result_to_dict(request_id, info))),
+            ponder=ponder,
+            started_callback=started
+        )
+        send(('bestmove', _result_to_dict(request_id, result)))
+
+class EngineProcess:
+    """引擎子进程的句柄，所有方法都不会阻塞调用线程（recv除外）"""
+
+    def __init__(self, book_path: Optional[str] = None, tablebase_dir: Optional[str] = None):
+        context = multiprocessing.get_context('spawn')
+        self._conn, child_conn = context.Pipe()
+        self._process = context.Process(
+            target=_engine_main, args=(child_conn, book_path, tablebase_dir), daemon=True
+        )
+        self._process.start()
+        child_conn.close()
+        self._next_request_id = 0
+        self._alive = True
+
+    def is_alive(self) -> bool:
+        """引擎进程是否仍可用；发送命令失败或进程退出后为False"""
+        return self._alive and self._process.is_alive()
+
+    def _send(self, message) -> bool:
+        """发送命令，引擎进程已退出时标记为不可用并返回False"""
+        try:
+            self._conn.send(message)
+        except (BrokenPipeError, OSError):
+            self._alive = False
+            return False
+        return True
+
+    def search(self, state: bytes, limits: SearchLimits, ponder: bool = False) -> Optional[int]:
+        """请求搜索Board.to_bytes()描述的局面，返回请求编号；引擎进程已退出时返回None
+
+        ponder为True时不计时，直到收到ponderhit才开始按limits计时。
+        """
+        self._next_request_id += 1
+        if not self._send(('search', self._next_request_id, state, limits, ponder)):
+            return None
+        return self._next_request_id
+
+    def stop(self) -> bool:
+        """立即停止当前搜索，引擎会尽快返回已有的最佳走法；引擎进程已退出时返回False"""
+        return self._send(('stop',))
+
+    def ponderhit(self, time_limit: Optional[float]) -> bool:
+        """对手走了预测的着法，后台思考转为正式搜索并开始计时；引擎进程已退出时返回False"""
+        return self._send(('ponderhit', time_limit))
+
+    def recv(self) -> Tuple[str, Dict[str, Any]]:
+        """阻塞等待引擎消息，返回('info'|'bestmove', 内容)；进程退出时抛出EOFError"""
+        return self._conn.recv()
+
+    def close(self):
+        """结束引擎进程"""
+        self._send(('quit',))
+        self._alive = False
+        self._process.join(timeout=1.0)
+        if self._process.is_alive():
+            self._process.terminate()
+        self._conn.close()
@@ -0,0 +1,319 @@
+"""UCCI/UCI文本协议引擎
+
+从标准输入逐行读取命令，在标准输出上回复，可以接入支持UCCI（或UCI）协议的
+对弈管理器和分析界面。主线程只负责读取命令，搜索在后台线程中进行，
+因此stop和ponderhit在搜索中途也能在几毫秒内生效；搜索过程中每完成一层
+输出一行info。有限的搜索总会算完并输出bestmove，即使输入已经结束，
+或在搜索中途收到了position、go等命令（这些命令会等搜索结束后再处理）。
+
+支持的命令：ucci/uci、isready、setoption、position、banmoves、go、
+ponderhit、stop、ucinewgame、quit。走法使用ICCS坐标（如 h2e2）。
+go支持UCCI的 time/movestogo/increment（默认单位为秒，setoption usemillisec true
+后为毫秒）和UCI的 wtime/btime/winc/binc/movetime（毫秒），以及depth、nodes、
+infinite、ponder。
+
+用法：
+    python -m chess.engine.ucci
+"""
+import argparse
+import sys
+import threading
+from typing import IO, Dict, List, Optional
+
+from ..board import Board
+from ..notation import iccs_to_move, move_to_iccs
+from ..piece import PieceColor
+from .search import MATE_BOUND, MATE_SCORE, Move, Searcher, SearchLimits, SearchResult
+
+ENGINE_NAME = "Xiangqi Python"
+ENGINE_AUTHOR = "chess contributors"
+
+# 估算的置换表每个条目占用的字节数，用于把hashsize（MB）换算为条目数
+_TT_ENTRY_BYTES = 200
+# 每步为通信和界面处理预留的时间（秒）
+_MOVE_OVERHEAD = 0.05
+
+def allocate_time(remaining: float, moves_to_go: Optional[int] = None,
+                  increment: float = 0.0) -> float:
+    """按剩余时间分配这一步的思考时间（秒）"""
+    if moves_to_go:
+        budget = remaining / moves_to_go + increment
+    else:
+        budget = remaining / 30 + increment * 0.8
+    return max(min(budget, remaining * 0.8 - _MOVE_OVERHEAD), 0.01)
+
+class UCCIEngine:
+    """协议状态机：handle()处理一行命令，搜索在后台线程中进行"""
+
+    def __init__(self, output: IO[str] = sys.stdout):
+        self.output = output
+        self.searcher = Searcher()
+        self.board = Board()
+        self.banned: List[Move] = []
+        self.use_millisec = False
+        self.book = None
+        self.use_book = True
+        self._protocol = "ucci"
+        self._send_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._started = threading.Event()
+        # 无限思考和后台思考在收到stop/ponderhit之前不输出bestmove
+        self._release = threading.Event()
+        self._hold = False
+
+    def send(self, line: str):
+        with self._send_lock:
+            self.output.write(line + "\n")
+            self.output.flush()
+
+    def handle(self, line: str) -> bool:
+        """处理一行命令，收到quit时返回False"""
+        tokens = line.split()
+        if not tokens:
+            return True
+        command, args = tokens[0], tokens[1:]
+        if command in ("ucci", "uci"):
+            self._protocol = command
+            self.send(f"id name {ENGINE_NAME}")
+            self.send(f"id author {ENGINE_AUTHOR}")
+            if command == "ucci":
+                self.send("option usemillisec type check default false")
+                self.send("option bookfiles type string default <empty>")
+                self.send("option usebook type check default true")
+                self.send("option egtbpaths type string default <empty>")
+                self.send("option hashsize type spin min 1 max 1024 default 50")
+            self.send(f"{command}ok")
+        elif command == "isready":
+            self.send("readyok")
+        elif command == "setoption":
+            self._wait()
+            self._set_option(args)
+        elif command == "ucinewgame":
+            self._wait()
+            self.searcher.clear()
+        elif command == "position":
+            self._wait()
+            self._set_position(args)
+        elif command == "banmoves":
+            self._wait()
+            self._set_banned(args)
+        elif command == "go":
+            self._wait()
+            self._go(args)
+        elif command == "ponderhit":
+            # 此后按普通的限时搜索处理
+            self._hold = False
+            self.searcher.ponderhit()
+            self._release.set()
+        elif command == "stop":
+            self._hold = False
+            self.searcher.stop()
+            self._release.set()
+        elif command == "quit":
+            self._wait(stop=True)
+            if self._protocol == "ucci":
+                self.send("bye")
+            return False
+        else:
+            self.send(f"info string 未知命令：{command}")
+        return True
+
+    def run(self, stream: IO[str]):
+        """逐行读取命令直到quit或输入结束"""
+        for line in stream:
+            if not self.handle(line):
+                return
+        # 输入结束后不会再有stop，只有无限思考和后台思考需要主动停止
+        self._wait(stop=self._hold)
+
+    def _wait(self, stop: bool = False):
+        """等待正在进行的搜索结束
+
+        有限的搜索会正常算完；stop为True（quit）或当前是无限思考、后台思考时
+        先停止搜索，否则会一直等不到结果。
+        """
+        if self._thread is None:
+            return
+        if stop or self._hold:
+            if not stop and self._thread.is_alive():
+                self.send("info string 收到新命令，停止当前搜索")
+            self.searcher.stop()
+            self._release.set()
+        self._thread.join()
+        self._thread = None
+
+    def _set_option(self, args: List[str]):
+        # UCCI: setoption <名称> <值>；UCI: setoption name <名称> value <值>
+        if args and args[0] == "name":
+            args = args[1:]
+            if "value" in args:
+                split = args.index("value")
+                args = args[:split] + args[split + 1:]
+        if not args:
+            return
+        name, value = args[0].lower(), " ".join(args[1:])
+        if name == "usemillisec":
+            self.use_millisec = value.lower() == "true"
+        elif name == "usebook":
+            self.use_book = value.lower() == "true"
+        elif name == "bookfiles":
+            self.book = None
+            if value and value != "<empty>":
+                from ..book import OpeningBook
+                try:
+                    self.book = OpeningBook(value)
+                except (OSError, ValueError) as e:
+                    self.send(f"info string 开局库不可用：{e}")
+        elif name == "egtbpaths":
+            self.searcher.tablebase_dir = value if value and value != "<empty>" else None
+        elif name == "hashsize":
+            try:
+                self.searcher.tt_size = max(int(value), 1) * (1 << 20) // _TT_ENTRY_BYTES
+            except ValueError:
+                self.send(f"info string 无效的hashsize：{value}")
+
+    def _set_position(self, args: List[str]):
+        """position {fen <FEN> | startpos} [moves <走法>...]"""
+        moves: List[str] = []
+        if "moves" in args:
+            split = args.index("moves")
+            args, moves = args[:split], args[split + 1:]
+        try:
+            if args and args[0] == "fen":
+                board = Board.from_fen(" ".join(args[1:]))
+            else:
+                board = Board()
+        except ValueError as e:
+            self.send(f"info string 无效的局面：{e}")
+            return
+        for text in moves:
+            try:
+                success, message = board.move_piece(*iccs_to_move(text))
+            except ValueError as e:
+                success, message = False, str(e)
+            if not success:
+                self.send(f"info string 忽略非法走法 {text}：{message}")
+                break
+        self.board = board
+        self.banned = []
+
+    def _set_banned(self, args: List[str]):
+        banned = []
+        for text in args:
+            try:
+                banned.append(iccs_to_move(text))
+            except ValueError:
+                self.send(f"info string 无效的走法：{text}")
+        self.banned = banned
+
+    def _parse_go(self, args: List[str]):
+        """返回(搜索限制, 是否后台思考, 是否无限思考)"""
+        values: Dict[str, float] = {}
+        flags = set()
+        index = 0
+        while index < len(args):
+            token = args[index]
+            if token in ("ponder", "infinite", "draw"):
+                flags.add(token)
+                index += 1
+                continue
+            if index + 1 < len(args):
+                try:
+                    values[token] = float(args[index + 1])
+                    index += 2
+                    continue
+                except ValueError:
+                    pass
+            index += 1
+
+        limits = SearchLimits()
+        if "depth" in values:
+            limits.depth = int(values["depth"])
+        if "nodes" in values:
+            limits.nodes = int(values["nodes"])
+        red = self.board.side_to_move == PieceColor.RED
+        if "movetime" in values:
+            limits.time = values["movetime"] / 1000
+        elif "time" in values:
+            unit = 1000 if self.use_millisec else 1
+            limits.time = allocate_time(values["time"] / unit,
+                                        int(values.get("movestogo", 0)) or None,
+                                        values.get("increment", 0.0) / unit)
+        elif ("wtime" if red else "btime") in values:
+            limits.time = allocate_time(values["wtime" if red else "btime"] / 1000,
+                                        int(values.get("movestogo", 0)) or None,
+                                        values.get("winc" if red else "binc", 0.0) / 1000)
+        infinite = "infinite" in flags
+        if infinite:
+            limits = SearchLimits(limits.depth)
+        return limits, "ponder" in flags, infinite
+
+    def _go(self, args: List[str]):
+        limits, ponder, infinite = self._parse_go(args)
+        board = self.board
+        root_moves = None
+        if self.banned:
+            root_moves = [move for move in board.generate_legal_moves(board.side_to_move, use_cache=False)
+                          if move not in self.banned]
+            if not root_moves:
+                self.send("nobestmove")
+                return
+        if self.book is not None and self.use_book and not ponder and not infinite:
+            move = self.book.choose(board)
+            if move is not None and (root_moves is None or move in root_moves):
+                self.send("info string 开局库走法")
+                self.send(f"bestmove {move_to_iccs(*move)}")
+                return
+
+        self._started.clear()
+        self._release.clear()
+        hold = self._hold = ponder or infinite
+        self._thread = threading.Thread(target=self._search, daemon=True,
+                                        args=(board, limits, ponder, hold, root_moves))
+        self._thread.start()
+        # 等搜索器重置好状态再处理后续命令，保证随后的stop/ponderhit不会丢失
+        self._started.wait()
+
+    def _search(self, board: Board, limits: SearchLimits, ponder: bool, hold: bool,
+                root_moves: Optional[List[Move]]):
+        result = self.searcher.search(board, limits, self._send_info, ponder=ponder,
+                                      started_callback=self._started.set, root_moves=root_moves)
+        if hold and not self.searcher.stopped:
+            self._release.wait()  # 提前算完时等待stop或ponderhit
+        if result.best_move is None:
+            self.send("nobestmove")
+            return
+        line = f"bestmove {move_to_iccs(*result.best_move)}"
+        if len(result.pv) > 1:
+            line += f" ponder {move_to_iccs(*result.pv[1])}"
+        self.send(line)
+
+    def _send_info(self, result: SearchResult):
+        if abs(result.score) > MATE_BOUND and self._protocol == "uci":
+            plies = MATE_SCORE - abs(result.score)
+            score = f"mate {(plies + 1) // 2 if result.score > 0 else -((plies + 1) // 2)}"
+        elif self._protocol == "uci":
+            score = f"cp {result.score}"
+        else:
+            score = str(result.score)
+        pv = " ".join(move_to_iccs(*move) for move in result.pv)
+        self.send(f"info depth {result.depth} score {score} time {int(result.elapsed * 1000)} "
+                  f"nodes {result.nodes} nps {result.nps} pv {pv}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m chess.engine.ucci",
+                                     description="以UCCI/UCI协议在标准输入输出上运行引擎")
+    parser.add_argument("--book", help="开局库文件（也可用setoption bookfiles指定）")
+    parser.add_argument("--tablebases", help="残局库目录（也可用setoption egtbpaths指定）")
+    args = parser.parse_args(argv)
+
+    engine = UCCIEngine(sys.stdout)
+    if args.book:
+        engine.handle(f"setoption bookfiles {args.book}")
+    if args.tablebases:
+        engine.handle(f"setoption egtbpaths {args.tablebases}")
+    engine.run(sys.stdin)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
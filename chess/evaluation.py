@@ -0,0 +1,101 @@
+from typing import Dict, List
+from .piece import PieceColor, PieceType
+
+# 子力价值（单位约为1/100个兵）
+PIECE_VALUES = {
+    PieceType.KING: 0,
+    PieceType.ADVISOR: 120,
+    PieceType.ELEPHANT: 120,
+    PieceType.HORSE: 270,
+    PieceType.CHARIOT: 600,
+    PieceType.CANNON: 285,
+    PieceType.PAWN: 30,
+}
+
+# 位置分表，以红方视角书写：第一行为红方底线(y=0)，每行从x=0到x=8
+_POSITION_TABLES = {
+    PieceType.KING: [
+        [0, 0, 0, 1, 5, 1, 0, 0, 0],
+        [0, 0, 0, -8, -8, -8, 0, 0, 0],
+        [0, 0, 0, -15, -15, -15, 0, 0, 0],
+    ] + [[0] * 9] * 7,
+    PieceType.ADVISOR: [
+        [0, 0, 0, 0, 0, 0, 0, 0, 0],
+        [0, 0, 0, 0, 3, 0, 0, 0, 0],
+        [0, 0, 0, -1, 0, -1, 0, 0, 0],
+    ] + [[0] * 9] * 7,
+    PieceType.ELEPHANT: [
+        [0, 0, 0, 0, 0, 0, 0, 0, 0],
+        [0, 0, 0, 0, 0, 0, 0, 0, 0],
+        [-2, 0, 0, 0, 3, 0, 0, 0, -2],
+        [0, 0, 0, 0, 0, 0, 0, 0, 0],
+        [0, 0, -1, 0, 0, 0, -1, 0, 0],
+    ] + [[0] * 9] * 5,
+    PieceType.HORSE: [
+        [0, -4, 0, 0, 0, 0, 0, -4, 0],
+        [0, 2, 4, 4, -2, 4, 4, 2, 0],
+        [4, 2, 8, 8, 4, 8, 8, 2, 4],
+        [2, 6, 8, 6, 10, 6, 8, 6, 2],
+        [4, 12, 16, 14, 12, 14, 16, 12, 4],
+        [6, 16, 14, 18, 16, 18, 14, 16, 6],
+        [8, 24, 18, 24, 20, 24, 18, 24, 8],
+        [12, 14, 16, 20, 18, 20, 16, 14, 12],
+        [4, 10, 28, 16, 8, 16, 28, 10, 4],
+        [4, 8, 16, 12, 4, 12, 16, 8, 4],
+    ],
+    PieceType.CHARIOT: [
+        [-2, 10, 6, 14, 12, 14, 6, 10, -2],
+        [8, 4, 8, 16, 8, 16, 8, 4, 8],
+        [4, 8, 6, 14, 12, 14, 6, 8, 4],
+        [6, 10, 8, 14, 14, 14, 8, 10, 6],
+        [12, 16, 14, 20, 20, 20, 14, 16, 12],
+        [12, 14, 12, 18, 18, 18, 12, 14, 12],
+        [12, 18, 16, 22, 22, 22, 16, 18, 12],
+        [12, 12, 12, 18, 18, 18, 12, 12, 12],
+        [16, 20, 18, 24, 26, 24, 18, 20, 16],
+        [14, 14, 12, 18, 16, 18, 12, 14, 14],
+    ],
+    PieceType.CANNON: [
+        [0, 0, 2, 6, 6, 6, 2, 0, 0],
+        [0, 2, 4, 6, 6, 6, 4, 2, 0],
+        [4, 0, 8, 6, 10, 6, 8, 0, 4],
+        [0, 0, 0, 2, 4, 2, 0, 0, 0],
+        [-2, 0, 4, 2, 6, 2, 4, 0, -2],
+        [0, 0, 0, 2, 8, 2, 0, 0, 0],
+        [0, 0, -2, 4, 10, 4, -2, 0, 0],
+        [2, 2, 0, -10, -8, -10, 0, 2, 2],
+        [2, 2, 0, -4, -14, -4, 0, 2, 2],
+        [6, 4, 0, -10, -12, -10, 0, 4, 6],
+    ],
+    PieceType.PAWN: [
+        [0, 0, 0, 0, 0, 0, 0, 0, 0],
+        [0, 0, 0, 0, 0, 0, 0, 0, 0],
+        [0, 0, 0, 0, 0, 0, 0, 0, 0],
+        [0, 0, -2, 0, 4, 0, -2, 0, 0],
+        [2, 0, 8, 0, 8, 0, 8, 0, 2],
+        # 过河后可以横走，价值明显提高
+        [36, 42, 48, 48, 50, 48, 48, 42, 36],
+        [40, 50, 60, 64, 70, 64, 60, 50, 40],
+        [44, 56, 72, 90, 110, 90, 72, 56, 44],
+        [48, 66, 86, 110, 150, 110, 86, 66, 48],
+        [30, 33, 36, 39, 42, 39, 36, 33, 30],
+    ],
+}
+
+def _build_value_tables() -> Dict[PieceColor, Dict[PieceType, List[int]]]:
+    """按格子下标展开子力+位置分表；黑方取镜像并取负，使分数始终为红方视角"""
+    tables: Dict[PieceColor, Dict[PieceType, List[int]]] = {PieceColor.RED: {}, PieceColor.BLACK: {}}
+    for piece_type, rows in _POSITION_TABLES.items():
+        material = PIECE_VALUES[piece_type]
+        red = [0] * 90
+        black = [0] * 90
+        for y in range(10):
+            for x in range(9):
+                red[y * 9 + x] = material + rows[y][x]
+                black[y * 9 + x] = -(material + rows[9 - y][x])
+        tables[PieceColor.RED][piece_type] = red
+        tables[PieceColor.BLACK][piece_type] = black
+    return tables
+
+# VALUE_TABLES[颜色][棋子类型][格子下标]：红方为正、黑方为负
+VALUE_TABLES = _build_value_tables()
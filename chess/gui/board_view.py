@@ -1,13 +1,28 @@
 from PyQt6.QtWidgets import QWidget, QMessageBox
-from PyQt6.QtCore import Qt, QRect, QPoint, pyqtSignal
-from PyQt6.QtGui import QPainter, QPen, QColor, QFont, QBrush
+from PyQt6.QtCore import Qt, QRect, QRectF, QPoint, QPointF, QTimer, pyqtSignal
+from PyQt6.QtGui import QPainter, QPen, QColor, QFont, QBrush, QPixmap
 from ..board import Board
-from ..piece import PieceColor, Position
-from typing import Dict, Any
+from ..piece import Piece, PieceColor, Position, SQUARES
+from typing import Dict, Any, Iterable, List, Optional, Set, Tuple
+import time
+
+class MoveAnimation:
+    """一步棋的滑动动画：棋子缓存图从起点中心滑到终点中心"""
+    __slots__ = ('piece', 'captured', 'start', 'end', 'started', 'rect')
+
+    def __init__(self, piece: Piece, captured: Optional[Piece], start: QPointF, end: QPointF):
+        self.piece = piece          # 走动的棋子（已在终点）
+        self.captured = captured    # 被吃的棋子，棋子到达前仍画在终点
+        self.start = start
+        self.end = end
+        self.started = time.perf_counter()
+        self.rect = QRect()         # 上一帧棋子缓存图所占的范围
 
 class BoardView(QWidget):
     # 添加信号
     game_state_changed = pyqtSignal()
+    engine_info_changed = pyqtSignal(str)
+    engine_thinking_changed = pyqtSignal(bool)  # 电脑开始或结束正式思考（不含后台思考）
     
     def __init__(self):
         super().__init__()
@@ -49,9 +64,48 @@ class BoardView(QWidget):
             'red_bg': '#ffe6e6',
             'black_bg': '#e6e6e6'
         }
+        
+        # 绘制缓存：静态棋盘只画一次，棋子按(类型, 颜色, 大小, 主题)预先画成小图
+        self._board_pixmap: Optional[QPixmap] = None
+        self._piece_sprites: Dict[Tuple[Any, ...], QPixmap] = {}
+        
+        # 本回合的合法走法表（起点 -> 终点集合）和将军状态，局面每次变化后计算一次，
+        # 走法提示、点击校验和状态栏都读取它
+        self.legal_moves: Dict[Position, Set[Position]] = {}
+        self.in_check = False
+        self.update_legal_moves()
+        
+        # 局部重绘：上次刷新时各格的棋子和带标记（选中框、走法提示、将军框）的格子
+        self._drawn_grid: List[Optional[Tuple[Any, ...]]] = self._grid_snapshot()
+        self._marked_squares: Set[Position] = set()
+        
+        # 走子动画：定时器按约60帧/秒推进，每帧只重绘走动棋子的范围
+        self.animation_duration = 0.15  # 秒，0表示不播放动画
+        self._animation: Optional[MoveAnimation] = None
+        self._animation_timer = QTimer(self)
+        self._animation_timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self._animation_timer.setInterval(16)
+        self._animation_timer.timeout.connect(self._animation_step)
+        
+        # 电脑对手：引擎在独立进程中搜索，结果通过信号返回
+        self.engine_color: Optional[PieceColor] = None  # None表示双人对弈
+        self.engine_time = 3.0     # 每步思考时间（秒）
+        self.engine_ponder = True  # 对方思考时后台思考
+        self.engine_book: Optional[str] = None  # 开局库文件
+        self.engine_tablebases: Optional[str] = None  # 残局库目录
+        self._engine = None
+        self._engine_thread = None
+        self._search_id = None     # 正在进行的正式搜索
+        self._ponder_id = None     # 正在进行的后台思考
+        self._ponder_move = None   # 后台思考所预测的对方着法
+        self._ponder_result = None # 对方落子前就已完成的后台思考结果
+        self._engine_restarted = False  # 引擎进程意外退出后是否已自动重启过一次
 
     def mousePressEvent(self, event):
         """处理鼠标点击事件"""
+        self.finish_animation()  # 动画未播完时直接跳到终点，不阻塞点击
+        if self.is_engine_turn():
+            return  # 电脑思考中，忽略点击
         if event.button() == Qt.MouseButton.LeftButton and not self.game_over:
             pos = self._pixel_to_board_pos(event.position())
             if pos is None:
@@ -63,29 +117,267 @@ class BoardView(QWidget):
                 if self.selected_pos == pos:
                     self.selected_piece = None
                     self.selected_pos = None
+                    self._refresh()
                     self.game_state_changed.emit()
                 else:
-                    if pos in self.selected_piece.get_possible_moves(self.board):
-                        success, message = self.board.move_piece(self.selected_pos, pos)
-                        if success:
-                            self.current_player = (PieceColor.BLACK 
-                                if self.current_player == PieceColor.RED 
-                                else PieceColor.RED)
-                            if message:
-                                QMessageBox.information(self, "提示", message)
-                                if "将死" in message:
-                                    self.game_over = True
-                            self.game_state_changed.emit()
+                    if pos in self.legal_moves.get(self.selected_pos, ()):
+                        from_pos = self.selected_pos
+                        if self._apply_move(from_pos, pos) and self.is_engine_turn():
+                            self._start_engine_turn(((from_pos.x, from_pos.y), (pos.x, pos.y)))
                     
                     self.selected_piece = None
                     self.selected_pos = None
+                    self._refresh()
             
             elif clicked_piece and clicked_piece.color == self.current_player:
                 self.selected_piece = clicked_piece
                 self.selected_pos = pos
+                self._refresh()
                 self.game_state_changed.emit()
-            
-            self.update()
+
+    def _apply_move(self, from_pos: Position, to_pos: Position) -> bool:
+        """走一步棋并切换回合，返回是否成功"""
+        if to_pos not in self.legal_moves.get(from_pos, ()):
+            return False
+        self.finish_animation()
+        captured = self.board.get_piece_at(to_pos)
+        _, message = self.board.move_piece(from_pos, to_pos, legal=True)
+        self._start_animation(from_pos, to_pos, captured)
+        self.current_player = (PieceColor.BLACK 
+            if self.current_player == PieceColor.RED 
+            else PieceColor.RED)
+        self.selected_piece = None
+        self.selected_pos = None
+        self.update_legal_moves()
+        if not self.legal_moves:
+            # 象棋中无子可走即判负
+            self.game_over = True
+            if "将死" not in message:
+                message = "困毙！游戏结束"
+        self._refresh()
+        if message:
+            QMessageBox.information(self, "提示", message)
+        self.game_state_changed.emit()
+        return True
+
+    def _square_center(self, pos: Position) -> QPointF:
+        return QPointF(self.margin + pos.x * self.cell_size, self.margin + pos.y * self.cell_size)
+
+    def _start_animation(self, from_pos: Position, to_pos: Position, captured: Optional[Piece]):
+        """开始播放刚走完的一步棋的动画"""
+        if self.animation_duration <= 0:
+            return
+        self._animation = MoveAnimation(self.board.get_piece_at(to_pos), captured,
+                                        self._square_center(from_pos), self._square_center(to_pos))
+        self._animation_step()
+        self._animation_timer.start()
+
+    def _sprite_rect(self, center: QPointF) -> QRect:
+        """中心在center的棋子缓存图所占的范围（向外取整）"""
+        half = self.piece_size / 2 + 2
+        return QRectF(center.x() - half, center.y() - half, 2 * half, 2 * half).toAlignedRect()
+
+    def _animation_position(self, animation: MoveAnimation) -> QPointF:
+        """按已播放时间计算棋子当前的中心位置（先快后慢）"""
+        t = min((time.perf_counter() - animation.started) / self.animation_duration, 1.0)
+        t = 1 - (1 - t) ** 2
+        return animation.start + (animation.end - animation.start) * t
+
+    def _animation_step(self):
+        """推进一帧：只重绘棋子上一帧和这一帧所占的范围"""
+        animation = self._animation
+        if animation is None:
+            self._animation_timer.stop()
+            return
+        center = self._animation_position(animation)
+        rect = self._sprite_rect(center)
+        self.update(animation.rect.united(rect))
+        animation.rect = rect
+        if center == animation.end:
+            self.finish_animation()
+
+    def finish_animation(self):
+        """立即结束正在播放的动画，棋子直接画在终点"""
+        animation = self._animation
+        if animation is None:
+            return
+        self._animation = None
+        self._animation_timer.stop()
+        self.update(animation.rect.united(self._sprite_rect(animation.end)))
+
+    def update_legal_moves(self):
+        """重新计算当前回合的合法走法表和将军状态"""
+        moves: Dict[Position, Set[Position]] = {}
+        if not self.game_over:
+            for from_pos, to_pos in self.board.generate_legal_moves(self.current_player):
+                moves.setdefault(from_pos, set()).add(to_pos)
+        self.legal_moves = moves
+        self.in_check = self.board.is_check(self.current_player)
+
+    def set_engine(self, color: Optional[PieceColor], time_limit: float, ponder: bool,
+                   book_path: Optional[str] = None, tablebase_dir: Optional[str] = None):
+        """设置电脑对手，color为None时为双人对弈"""
+        self.cancel_engine()
+        if book_path != self.engine_book or tablebase_dir != self.engine_tablebases:
+            self.shutdown_engine()  # 开局库和残局库在引擎进程启动时指定，更换后需要重启
+            self.engine_book = book_path
+            self.engine_tablebases = tablebase_dir
+        self.engine_color = color
+        self.engine_time = time_limit
+        self.engine_ponder = ponder
+        self.start_engine_if_needed()
+
+    def is_engine_turn(self) -> bool:
+        """当前是否轮到电脑走棋"""
+        return (self.engine_color is not None and not self.game_over
+                and self.current_player == self.engine_color)
+
+    def start_engine_if_needed(self):
+        """轮到电脑时开始思考"""
+        if self.is_engine_turn() and self._search_id is None:
+            self._start_engine_turn(None)
+
+    def _ensure_engine(self):
+        """按需启动引擎进程和接收线程，已退出的引擎进程会被替换"""
+        if self._engine is not None and not self._engine.is_alive():
+            self.shutdown_engine()
+        if self._engine is None:
+            from ..engine.service import EngineProcess
+            from .engine_thread import EngineThread
+            self._engine = EngineProcess(self.engine_book, self.engine_tablebases)
+            self._engine_thread = EngineThread(self._engine, self)
+            self._engine_thread.info_received.connect(self._on_engine_info)
+            self._engine_thread.best_move_received.connect(self._on_engine_best_move)
+            self._engine_thread.engine_exited.connect(self._on_engine_exited)
+            self._engine_thread.start()
+        return self._engine
+
+    def _start_engine_turn(self, last_move):
+        """开始电脑的回合；若对方走了后台思考预测的着法，则直接沿用后台思考"""
+        from ..engine.search import SearchLimits
+        engine = self._ensure_engine()
+        if self._ponder_id is not None:
+            if last_move is not None and last_move == self._ponder_move:
+                if self._ponder_result is not None:
+                    result = self._ponder_result
+                    self._ponder_id = None
+                    self._ponder_result = None
+                    self._set_search_id(result['request_id'])
+                    self._on_engine_best_move(result)
+                else:
+                    self._set_search_id(self._ponder_id)
+                    self._ponder_id = None
+                    if not engine.ponderhit(self.engine_time):
+                        self._engine_failed()
+                return
+            engine.stop()
+            self._ponder_id = None
+            self._ponder_result = None
+        self.engine_info_changed.emit("电脑思考中…")
+        search_id = engine.search(self.board.to_bytes(), SearchLimits(time=self.engine_time))
+        if search_id is None:
+            self._engine_failed()
+            return
+        self._set_search_id(search_id)
+
+    def _on_engine_exited(self, engine):
+        """引擎进程退出；正常关闭的旧进程不处理"""
+        if engine is self._engine:
+            self._engine_failed()
+
+    def _engine_failed(self):
+        """引擎进程意外退出：丢弃它，轮到电脑时自动重启一次，仍然失败则提示"""
+        self.shutdown_engine()
+        if self.is_engine_turn() and not self._engine_restarted:
+            self._engine_restarted = True
+            self._start_engine_turn(None)
+        else:
+            self.engine_info_changed.emit("引擎进程已退出，悔棋或重新开始可重新启动引擎")
+
+    def _set_search_id(self, search_id):
+        """记录正在进行的正式搜索，思考状态变化时发出engine_thinking_changed"""
+        thinking = search_id is not None
+        changed = thinking != (self._search_id is not None)
+        self._search_id = search_id
+        if changed:
+            self.engine_thinking_changed.emit(thinking)
+
+    def is_thinking(self) -> bool:
+        """电脑是否正在正式思考"""
+        return self._search_id is not None
+
+    def _start_pondering(self, predicted_move):
+        """电脑走子后，假设对方走预测的着法，提前思考下一步"""
+        from ..engine.search import SearchLimits
+        (fx, fy), (tx, ty) = predicted_move
+        board = Board.from_bytes(self.board.to_bytes())
+        success, _ = board.move_piece(Position(fx, fy), Position(tx, ty))
+        if not success:
+            return
+        self._ponder_move = predicted_move
+        self._ponder_result = None
+        # 引擎进程已退出时为None，等到电脑的回合再重启
+        self._ponder_id = self._engine.search(
+            board.to_bytes(), SearchLimits(time=self.engine_time), ponder=True
+        )
+
+    def _on_engine_info(self, data: Dict[str, Any]):
+        """显示引擎的搜索进度"""
+        if data['request_id'] != self._search_id:
+            return
+        from ..engine.search import format_score
+        self.engine_info_changed.emit(
+            f"电脑思考：深度 {data['depth']}  分数 {format_score(data['score'])}  "
+            f"{data['nps']} 节点/秒"
+        )
+
+    def _on_engine_best_move(self, data: Dict[str, Any]):
+        """引擎给出着法"""
+        request_id = data['request_id']
+        if request_id == self._ponder_id:
+            self._ponder_result = data  # 等对方落子后再决定是否采用
+            return
+        if request_id != self._search_id:
+            return  # 已取消的搜索
+        self._set_search_id(None)
+        self._engine_restarted = False
+        self.engine_info_changed.emit("开局库走法" if data.get('book') else "")
+        if data['best_move'] is None:
+            # 电脑无子可走
+            self.game_over = True
+            self.game_state_changed.emit()
+            self._refresh()
+            return
+        (fx, fy), (tx, ty) = data['best_move']
+        self.selected_piece = None
+        self.selected_pos = None
+        self._apply_move(Position(fx, fy), Position(tx, ty))
+        if self.engine_ponder and data['ponder_move'] and not self.game_over:
+            self._start_pondering(data['ponder_move'])
+
+    def stop_engine(self):
+        """让电脑立即按目前找到的最佳着法走棋"""
+        if self._search_id is not None and self._engine is not None and not self._engine.stop():
+            self._engine_failed()
+
+    def cancel_engine(self):
+        """取消电脑的思考并丢弃结果"""
+        if self._engine is not None and (self._search_id is not None or self._ponder_id is not None):
+            self._engine.stop()
+        self._set_search_id(None)
+        self._ponder_id = None
+        self._ponder_move = None
+        self._ponder_result = None
+        self.engine_info_changed.emit("")
+
+    def shutdown_engine(self):
+        """关闭引擎进程"""
+        self.cancel_engine()
+        if self._engine is not None:
+            self._engine.close()
+            self._engine_thread.wait(1000)
+            self._engine = None
+            self._engine_thread = None
 
     def _pixel_to_board_pos(self, point: QPoint) -> Position:
         """将像素坐标转换为棋盘坐标"""
@@ -96,20 +388,116 @@ class BoardView(QWidget):
             return Position(x, y)
         return None
 
+    def _new_pixmap(self, width: int, height: int) -> QPixmap:
+        """按屏幕缩放比例创建透明的缓存图"""
+        ratio = self.devicePixelRatioF()
+        pixmap = QPixmap(round(width * ratio), round(height * ratio))
+        pixmap.setDevicePixelRatio(ratio)
+        pixmap.fill(Qt.GlobalColor.transparent)
+        return pixmap
+
+    def _board_cache(self) -> QPixmap:
+        """静态棋盘的缓存图，与控件同样大小"""
+        pixmap = self._board_pixmap
+        if pixmap is None or pixmap.devicePixelRatio() != self.devicePixelRatioF():
+            pixmap = self._new_pixmap(self.width(), self.height())
+            painter = QPainter(pixmap)
+            painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+            self._draw_board(painter)
+            painter.end()
+            self._board_pixmap = pixmap
+        return pixmap
+
+    def _piece_sprite(self, piece: Piece) -> QPixmap:
+        """棋子的缓存图，四周比棋子大2像素以容纳边框"""
+        theme = (self.theme_colors['red_piece'], self.theme_colors['red_bg'],
+                 self.theme_colors['black_piece'], self.theme_colors['black_bg'])
+        key = (piece.piece_type, piece.color, self.piece_size, theme, self.devicePixelRatioF())
+        sprite = self._piece_sprites.get(key)
+        if sprite is None:
+            sprite = self._new_pixmap(self.piece_size + 4, self.piece_size + 4)
+            painter = QPainter(sprite)
+            painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+            self._draw_piece(painter, piece, QRect(2, 2, self.piece_size, self.piece_size))
+            painter.end()
+            self._piece_sprites[key] = sprite
+        return sprite
+
+    def set_piece_size(self, size: int):
+        """修改棋子大小，清除棋子缓存图"""
+        if size != self.piece_size:
+            self.piece_size = size
+            self._piece_sprites.clear()
+            self.update()
+
+    def _square_rect(self, pos: Position) -> QRect:
+        """格子上可能绘制内容（棋子、选中框、走法提示、将军框）的范围"""
+        half = self.piece_size // 2 + 7
+        return QRect(
+            self.margin + pos.x * self.cell_size - half,
+            self.margin + pos.y * self.cell_size - half,
+            2 * half,
+            2 * half
+        )
+
+    def _grid_snapshot(self) -> List[Optional[Tuple[Any, ...]]]:
+        """各格棋子的(颜色, 类型)，用于找出两次刷新之间变化的格子"""
+        return [(piece.color, piece.piece_type) if piece else None for piece in self.board.grid]
+
+    def _current_marks(self) -> Set[Position]:
+        """当前带有选中框、走法提示或将军框的格子"""
+        marks = set()
+        if self.selected_piece:
+            marks.add(self.selected_pos)
+            marks.update(self.legal_moves.get(self.selected_pos, ()))
+        if not self.game_over and self.in_check:
+            king = self.board.get_king(self.current_player)
+            if king:
+                marks.add(king.position)
+        return marks
+
+    def _refresh(self, squares: Iterable[Position] = ()):
+        """只重绘上次刷新以来变化的格子：棋子变化的格子以及新旧标记所在的格子"""
+        grid = self._grid_snapshot()
+        dirty = set(squares)
+        dirty.update(pos for pos, old, new in zip(SQUARES, self._drawn_grid, grid) if old != new)
+        marks = self._current_marks()
+        dirty |= marks ^ self._marked_squares
+        self._drawn_grid = grid
+        self._marked_squares = marks
+        for pos in dirty:
+            self.update(self._square_rect(pos))
+
     def paintEvent(self, event):
         painter = QPainter(self)
         painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        rect = event.rect()
         
-        self._draw_board(painter)
+        # 只绘制与需要重绘的区域相交的部分
+        board_pixmap = self._board_cache()
+        ratio = board_pixmap.devicePixelRatio()
+        painter.drawPixmap(
+            QRectF(rect), board_pixmap,
+            QRectF(rect.x() * ratio, rect.y() * ratio, rect.width() * ratio, rect.height() * ratio)
+        )
         
         if self.selected_piece:
             self._draw_selected_highlight(painter)
-            self._draw_possible_moves(painter)
+            self._draw_possible_moves(painter, rect)
         
-        self._draw_pieces(painter)
+        self._draw_pieces(painter, rect)
         
-        if not self.game_over and self.board.is_check(self.current_player):
+        if not self.game_over and self.in_check:
             self._draw_check_indicator(painter)
+        
+        animation = self._animation
+        if animation is not None:
+            # 动画中的棋子画在最上层，被吃的棋子在它到达前仍留在终点
+            offset = QPointF(self.piece_size / 2 + 2, self.piece_size / 2 + 2)
+            if animation.captured:
+                painter.drawPixmap(animation.end - offset, self._piece_sprite(animation.captured))
+            painter.drawPixmap(self._animation_position(animation) - offset,
+                               self._piece_sprite(animation.piece))
 
     def _draw_board(self, painter):
         """绘制棋盘"""
@@ -195,48 +583,48 @@ class BoardView(QWidget):
             self.margin + 9 * self.cell_size
         )
 
-    def _draw_pieces(self, painter):
-        """绘制棋子"""
-        painter.setFont(self.piece_font)
-        
+    def _draw_pieces(self, painter, rect: QRect):
+        """绘制与rect相交的棋子"""
+        offset = self.piece_size // 2 + 2
+        size = self.piece_size + 4
+        moving = self._animation.piece if self._animation else None
         for piece in self.board.pieces:
-            # 计算棋子的中心位置
-            center_x = self.margin + piece.position.x * self.cell_size
-            center_y = self.margin + piece.position.y * self.cell_size
-            
-            # 计算棋子的外框矩形
-            piece_rect = QRect(
-                center_x - self.piece_size // 2,
-                center_y - self.piece_size // 2,
-                self.piece_size,
-                self.piece_size
-            )
-            
-            # 设置棋子颜色（使用主题颜色）
-            if piece.color == PieceColor.RED:
-                text_color = QColor(self.theme_colors['red_piece'])
-                bg_color = QColor(self.theme_colors['red_bg'])
-            else:
-                text_color = QColor(self.theme_colors['black_piece'])
-                bg_color = QColor(self.theme_colors['black_bg'])
-            
-            # 绘制棋子背景（圆形）
-            painter.setPen(Qt.PenStyle.NoPen)
-            painter.setBrush(QBrush(bg_color))
-            painter.drawEllipse(piece_rect)
-            
-            # 绘制棋子边框
-            painter.setPen(QPen(QColor(0, 0, 0), 2))
-            painter.setBrush(Qt.BrushStyle.NoBrush)
-            painter.drawEllipse(piece_rect)
-            
-            # 绘制棋子文字
-            painter.setPen(QPen(text_color))
-            painter.drawText(
-                piece_rect,
-                Qt.AlignmentFlag.AlignCenter,
-                piece.name
-            )
+            if piece is moving:
+                continue  # 由动画绘制
+            # 棋子缓存图的左上角
+            x = self.margin + piece.position.x * self.cell_size - offset
+            y = self.margin + piece.position.y * self.cell_size - offset
+            if rect.intersects(QRect(x, y, size, size)):
+                painter.drawPixmap(x, y, self._piece_sprite(piece))
+
+    def _draw_piece(self, painter, piece: Piece, piece_rect: QRect):
+        """在piece_rect中绘制一个棋子"""
+        # 设置棋子颜色（使用主题颜色）
+        if piece.color == PieceColor.RED:
+            text_color = QColor(self.theme_colors['red_piece'])
+            bg_color = QColor(self.theme_colors['red_bg'])
+        else:
+            text_color = QColor(self.theme_colors['black_piece'])
+            bg_color = QColor(self.theme_colors['black_bg'])
+        
+        # 绘制棋子背景（圆形）
+        painter.setPen(Qt.PenStyle.NoPen)
+        painter.setBrush(QBrush(bg_color))
+        painter.drawEllipse(piece_rect)
+        
+        # 绘制棋子边框
+        painter.setPen(QPen(QColor(0, 0, 0), 2))
+        painter.setBrush(Qt.BrushStyle.NoBrush)
+        painter.drawEllipse(piece_rect)
+        
+        # 绘制棋子文字
+        painter.setFont(self.piece_font)
+        painter.setPen(QPen(text_color))
+        painter.drawText(
+            piece_rect,
+            Qt.AlignmentFlag.AlignCenter,
+            piece.name
+        )
 
     def _draw_selected_highlight(self, painter):
         """绘制选中棋子的高亮效果"""
@@ -259,13 +647,13 @@ class BoardView(QWidget):
         painter.setBrush(Qt.BrushStyle.NoBrush)
         painter.drawRect(highlight_rect)
 
-    def _draw_possible_moves(self, painter):
-        """绘制可能的移动位置"""
+    def _draw_possible_moves(self, painter, rect: QRect):
+        """绘制与rect相交的可能移动位置"""
         if not self.selected_piece:
             return
             
-        # 获取可能的移动位置
-        possible_moves = self.selected_piece.get_possible_moves(self.board)
+        # 从本回合的合法走法表中取出目标位置
+        possible_moves = self.legal_moves.get(self.selected_pos, ())
         
         # 设置画笔
         painter.setPen(QPen(QColor(0, 255, 0), 2))
@@ -275,6 +663,8 @@ class BoardView(QWidget):
         for pos in possible_moves:
             center_x = self.margin + pos.x * self.cell_size
             center_y = self.margin + pos.y * self.cell_size
+            if not rect.intersects(QRect(center_x - 6, center_y - 6, 12, 12)):
+                continue
             
             # 绘制小圆点
             painter.drawEllipse(
@@ -310,43 +700,79 @@ class BoardView(QWidget):
         """执行悔棋操作"""
         if self.game_over:
             return False
-            
-        if self.board.undo_last_move():
+        
+        # 与电脑对弈时，轮到自己走棋则连同电脑的上一步一起悔掉
+        plies = 1
+        if self.engine_color is not None and not self.is_engine_turn():
+            plies = 2
+        self.cancel_engine()
+        self.finish_animation()
+        
+        undone = 0
+        while undone < plies and self.board.undo_last_move():
             # 切换回上一个玩家
             self.current_player = (PieceColor.BLACK 
                 if self.current_player == PieceColor.RED 
                 else PieceColor.RED)
+            undone += 1
             
+        if undone:
             # 清除选中状态
             self.selected_piece = None
             self.selected_pos = None
+            self.update_legal_moves()
             
-            # 重绘棋盘
-            self.update()
+            # 重绘变化的格子
+            self._refresh()
             self.game_state_changed.emit()
+            self.start_engine_if_needed()
             return True
             
         return False
 
+    def restart_game(self):
+        """重新开始游戏"""
+        self.cancel_engine()
+        self.finish_animation()
+        self.board.initialize_board()
+        self.current_player = PieceColor.RED
+        self.selected_piece = None
+        self.selected_pos = None
+        self.game_over = False
+        self.update_legal_moves()
+        self._refresh()
+        self.game_state_changed.emit()
+        self.start_engine_if_needed()
+
     def save_state(self) -> Dict[str, Any]:
         """保存游戏状态"""
         return {
-            'board': self.board.to_dict(),
+            'fen': self.board.to_fen(),
             'current_player': self.current_player.name,
             'game_over': self.game_over
         }
 
     def load_state(self, state: Dict[str, Any]):
         """加载游戏状态"""
-        self.board = Board.from_dict(state['board'])
+        self.cancel_engine()
+        self.finish_animation()
+        if 'fen' in state:
+            self.board = Board.from_fen(state['fen'])
+        else:
+            self.board = Board.from_dict(state['board'])  # 旧版JSON存档
         self.current_player = PieceColor[state['current_player']]
+        self.board.set_side_to_move(self.current_player)
         self.game_over = state['game_over']
         self.selected_piece = None
         self.selected_pos = None
-        self.update()
+        self.update_legal_moves()
+        self._refresh()
         self.game_state_changed.emit()
+        self.start_engine_if_needed()
 
     def update_theme(self, colors: Dict[str, str]):
         """更新主题颜色"""
         self.theme_colors = colors
+        self._board_pixmap = None
+        self._piece_sprites.clear()
         self.update()
\ No newline at end of file
@@ -0,0 +1,24 @@
+from PyQt6.QtCore import QThread, pyqtSignal
+from ..engine.service import EngineProcess
+
+class EngineThread(QThread):
+    """在后台线程中等待引擎进程的消息，并以信号形式转发给界面线程"""
+    info_received = pyqtSignal(dict)
+    best_move_received = pyqtSignal(dict)
+    engine_exited = pyqtSignal(object)  # 引擎进程退出（含正常关闭），参数为EngineProcess
+
+    def __init__(self, engine: EngineProcess, parent=None):
+        super().__init__(parent)
+        self.engine = engine
+
+    def run(self):
+        while True:
+            try:
+                kind, data = self.engine.recv()
+            except (EOFError, OSError):
+                self.engine_exited.emit(self.engine)
+                break  # 引擎进程已退出
+            if kind == 'info':
+                self.info_received.emit(data)
+            elif kind == 'bestmove':
+                self.best_move_received.emit(data)
@@ -7,7 +7,7 @@ from .board_view import BoardView
 from ..piece import PieceColor
 import json
 from typing import Dict, Any
-from .settings_dialog import SettingsDialog
+from .settings_dialog import SettingsDialog, OPPONENT_HUMAN, OPPONENT_ENGINE_RED, OPPONENT_ENGINE_BLACK
 
 class MainWindow(QMainWindow):
     def __init__(self):
@@ -32,6 +32,8 @@ class MainWindow(QMainWindow):
         
         # 连接信号
         self.board_view.game_state_changed.connect(self.update_status)
+        self.board_view.engine_info_changed.connect(self.engine_label.setText)
+        self.board_view.engine_thinking_changed.connect(self.stop_button.setVisible)
         
         # 初化状态显示
         self.update_status()
@@ -40,7 +42,12 @@ class MainWindow(QMainWindow):
         self.settings = {
             'board_theme': "经典",
             'piece_size': 50,
-            'sound_enabled': False
+            'sound_enabled': False,
+            'opponent': OPPONENT_HUMAN,
+            'engine_time': 3,
+            'engine_ponder': True,
+            'opening_book': '',
+            'tablebase_dir': ''
         }
 
     def _create_status_bar(self):
@@ -81,9 +88,21 @@ class MainWindow(QMainWindow):
         self.check_label.setStyleSheet("color: red;")
         status_layout.addWidget(self.check_label)
         
+        self.score_label = QLabel()
+        status_layout.addWidget(self.score_label)
+        
+        self.engine_label = QLabel()
+        status_layout.addWidget(self.engine_label)
+        
         # 添加弹性空间
         status_layout.addStretch()
         
+        # 让电脑立即走棋，只在电脑思考时显示
+        self.stop_button = QPushButton("立即走棋")
+        self.stop_button.clicked.connect(self.stop_engine)
+        self.stop_button.setVisible(False)
+        status_layout.addWidget(self.stop_button)
+        
         # 添加按钮
         restart_button = QPushButton("重新开始")
         restart_button.clicked.connect(self.restart_game)
@@ -119,8 +138,13 @@ class MainWindow(QMainWindow):
         current_player = "红方" if self.board_view.current_player == PieceColor.RED else "黑方"
         self.turn_label.setText(f"当前回合：{current_player}")
         
+        # 更新局面评分（红方视角），局面在残局库中时附上残局库结果
+        self.score_label.setText(
+            f"局面评分：{self.board_view.board.score:+d}{self._tablebase_hint()}"
+        )
+        
         # 更新将军状态
-        if self.board_view.board.is_check(self.board_view.current_player):
+        if self.board_view.in_check:
             self.check_label.setText("将军！")
         else:
             self.check_label.setText("")
@@ -130,15 +154,40 @@ class MainWindow(QMainWindow):
             winner = "红方" if self.board_view.current_player == PieceColor.BLACK else "黑方"
             self.turn_label.setText(f"游戏结束 - {winner}胜！")
 
+    def _tablebase_hint(self) -> str:
+        """残局库对当前局面的结论"""
+        directory = self.board_view.engine_tablebases
+        if not directory or self.board_view.game_over:
+            return ""
+        try:
+            from ..tablebase import DRAW, WIN
+            result = self.board_view.board.probe_tablebase(directory)
+        except ImportError:
+            return ""  # 没有安装NumPy
+        if result is None:
+            return ""
+        if result.result == DRAW:
+            return "  残局库：和棋"
+        side_to_move = self.board_view.board.side_to_move
+        winner = side_to_move if result.result == WIN else (
+            PieceColor.BLACK if side_to_move == PieceColor.RED else PieceColor.RED)
+        name = "红方" if winner == PieceColor.RED else "黑方"
+        if result.plies == 0:
+            return f"  残局库：{name}胜"  # 走子方已无子可走
+        return f"  残局库：{name}{result.plies}步内杀棋"
+
     def restart_game(self):
         """重新开始游戏"""
-        self.board_view.board.initialize_board()
-        self.board_view.current_player = PieceColor.RED
-        self.board_view.selected_piece = None
-        self.board_view.selected_pos = None
-        self.board_view.game_over = False
-        self.board_view.update()
-        self.update_status()
+        self.board_view.restart_game()
+
+    def stop_engine(self):
+        """让电脑立即走棋"""
+        self.board_view.stop_engine()
+
+    def closeEvent(self, event):
+        """关闭窗口时结束引擎进程"""
+        self.board_view.shutdown_engine()
+        super().closeEvent(event)
 
     def undo_move(self):
         """悔棋功能"""
@@ -165,7 +214,7 @@ class MainWindow(QMainWindow):
                 
                 # 保存到文件
                 with open(file_path, 'w', encoding='utf-8') as f:
-                    json.dump(state, f, ensure_ascii=False, indent=2)
+                    json.dump(state, f, ensure_ascii=False, separators=(',', ':'))
                 
                 QMessageBox.information(self, "提示", "游戏保存成功")
             except Exception as e:
@@ -209,8 +258,7 @@ class MainWindow(QMainWindow):
         """应用设置"""
         # 更新棋子大小
         if settings['piece_size'] != self.settings['piece_size']:
-            self.board_view.piece_size = settings['piece_size']
-            self.board_view.update()
+            self.board_view.set_piece_size(settings['piece_size'])
         
         # 更新棋盘主题
         if settings['board_theme'] != self.settings['board_theme']:
@@ -220,6 +268,23 @@ class MainWindow(QMainWindow):
         if settings['sound_enabled'] != self.settings['sound_enabled']:
             # TODO: 实现音效控制
             pass
+        
+        # 更新电脑对手
+        engine_keys = ('opponent', 'engine_time', 'engine_ponder', 'opening_book', 'tablebase_dir')
+        if any(settings[key] != self.settings[key] for key in engine_keys):
+            engine_colors = {
+                OPPONENT_HUMAN: None,
+                OPPONENT_ENGINE_RED: PieceColor.RED,
+                OPPONENT_ENGINE_BLACK: PieceColor.BLACK
+            }
+            self.board_view.set_engine(
+                engine_colors[settings['opponent']],
+                settings['engine_time'],
+                settings['engine_ponder'],
+                settings['opening_book'] or None,
+                settings['tablebase_dir'] or None
+            )
+            self.update_status()
 
     def _apply_theme(self, theme: str):
         """应用棋盘主题"""
@@ -1,9 +1,14 @@
 from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, 
                            QPushButton, QComboBox, QSpinBox, QCheckBox,
-                           QGroupBox)
+                           QGroupBox, QLineEdit, QFileDialog)
 from PyQt6.QtCore import Qt
 from typing import Dict, Any
 
+# 对手选项
+OPPONENT_HUMAN = "双人对弈"
+OPPONENT_ENGINE_BLACK = "电脑执黑"
+OPPONENT_ENGINE_RED = "电脑执红"
+
 class SettingsDialog(QDialog):
     def __init__(self, parent=None, current_settings=None):
         super().__init__(parent)
@@ -20,6 +25,7 @@ class SettingsDialog(QDialog):
         layout.addWidget(self._create_board_settings())
         layout.addWidget(self._create_piece_settings())
         layout.addWidget(self._create_sound_settings())
+        layout.addWidget(self._create_engine_settings())
         
         # 添加按钮
         button_layout = QHBoxLayout()
@@ -86,10 +92,94 @@ class SettingsDialog(QDialog):
         
         return group
 
+    def _create_engine_settings(self):
+        """创建电脑对手设置组"""
+        group = QGroupBox("电脑对手")
+        layout = QVBoxLayout(group)
+        
+        # 对手
+        opponent_layout = QHBoxLayout()
+        opponent_label = QLabel("对手：")
+        self.opponent_combo = QComboBox()
+        self.opponent_combo.addItems([OPPONENT_HUMAN, OPPONENT_ENGINE_BLACK, OPPONENT_ENGINE_RED])
+        self.opponent_combo.setCurrentText(
+            self.current_settings.get('opponent', OPPONENT_HUMAN)
+        )
+        opponent_layout.addWidget(opponent_label)
+        opponent_layout.addWidget(self.opponent_combo)
+        layout.addLayout(opponent_layout)
+        
+        # 每步思考时间
+        time_layout = QHBoxLayout()
+        time_label = QLabel("每步思考时间（秒）：")
+        self.engine_time_spin = QSpinBox()
+        self.engine_time_spin.setRange(1, 60)
+        self.engine_time_spin.setValue(
+            self.current_settings.get('engine_time', 3)
+        )
+        time_layout.addWidget(time_label)
+        time_layout.addWidget(self.engine_time_spin)
+        layout.addLayout(time_layout)
+        
+        # 后台思考
+        self.ponder_check = QCheckBox("对方思考时后台思考")
+        self.ponder_check.setChecked(
+            self.current_settings.get('engine_ponder', True)
+        )
+        layout.addWidget(self.ponder_check)
+        
+        # 开局库
+        book_layout = QHBoxLayout()
+        book_label = QLabel("开局库：")
+        self.book_edit = QLineEdit(self.current_settings.get('opening_book', ''))
+        self.book_edit.setPlaceholderText("不使用")
+        book_button = QPushButton("浏览…")
+        book_button.clicked.connect(self._choose_book)
+        book_layout.addWidget(book_label)
+        book_layout.addWidget(self.book_edit)
+        book_layout.addWidget(book_button)
+        layout.addLayout(book_layout)
+        
+        # 残局库
+        tablebase_layout = QHBoxLayout()
+        tablebase_label = QLabel("残局库目录：")
+        self.tablebase_edit = QLineEdit(self.current_settings.get('tablebase_dir', ''))
+        self.tablebase_edit.setPlaceholderText("不使用")
+        tablebase_button = QPushButton("浏览…")
+        tablebase_button.clicked.connect(self._choose_tablebase_dir)
+        tablebase_layout.addWidget(tablebase_label)
+        tablebase_layout.addWidget(self.tablebase_edit)
+        tablebase_layout.addWidget(tablebase_button)
+        layout.addLayout(tablebase_layout)
+        
+        return group
+
+    def _choose_book(self):
+        """选择开局库文件"""
+        file_path, _ = QFileDialog.getOpenFileName(
+            self,
+            "选择开局库",
+            "",
+            "开局库 (*.bin);;所有文件 (*.*)"
+        )
+        if file_path:
+            self.book_edit.setText(file_path)
+
+    def _choose_tablebase_dir(self):
+        """选择残局库目录"""
+        directory = QFileDialog.getExistingDirectory(self, "选择残局库目录")
+        if directory:
+            self.tablebase_edit.setText(directory)
+
     def get_settings(self) -> Dict[str, Any]:
         """获取设置值"""
         return {
             'board_theme': self.theme_combo.currentText(),
             'piece_size': self.size_spin.value(),
-            'sound_enabled': self.sound_check.isChecked()
+            'sound_enabled': self.sound_check.isChecked(),
+            'opponent': self.opponent_combo.currentText(),
+            'engine_time': self.engine_time_spin.value(),
+            'engine_ponder': self.ponder_check.isChecked(),
+            'opening_book': self.book_edit.text().strip(),
+            'tablebase_dir': self.tablebase_edit.text().strip()
         } 
\ No newline at end of file
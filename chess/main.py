@@ -1,12 +1,19 @@
 import sys
-from PyQt6.QtWidgets import QApplication
-from .gui.main_window import MainWindow
 
 def main():
+    # 图形界面在这里才导入PyQt6，规则核心和命令行工具不依赖Qt
+    try:
+        from PyQt6.QtWidgets import QApplication
+    except ImportError:
+        print("图形界面需要PyQt6（pip install PyQt6）；无界面使用请运行 python -m chess.cli",
+              file=sys.stderr)
+        sys.exit(1)
+    from .gui.main_window import MainWindow
+
     app = QApplication(sys.argv)
     window = MainWindow()
     window.show()
     sys.exit(app.exec())
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
@@ -0,0 +1,357 @@
+"""无界面的引擎自对弈
+
+两个引擎配置在多个工作进程中并行对弈，每个开局交换先后手各下一局。
+每局结束时立即向JSONL文件追加一行结果，并按序贯概率比检验（SPRT）
+判断Elo差是否已足够确定，达到接受/拒绝边界时提前停止。
+
+引擎配置写成逗号分隔的键值对，可用的键为name、depth、time、nodes、
+book、tablebases，例如 "name=new,depth=4" 或 "name=old,time=0.2,book=book.bin"。
+第一个配置为被测引擎，Elo差和SPRT都以它的视角计算。
+
+用法：
+    python -m chess.match -e name=new,depth=4 -e name=old,depth=3 -g 200 -o games.jsonl
+    python -m chess.match -e depth=4 -e depth=4,book=book.bin --openings openings.txt --sprt
+"""
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from .board import Board, INITIAL_FEN
+from .notation import iccs_to_move, move_to_iccs
+from .piece import PieceColor
+
+# 终局原因
+CHECKMATE = "checkmate"      # 被将死
+NO_MOVES = "no_moves"        # 困毙，象棋中无子可走判负
+REPETITION = "repetition"    # 同一局面出现三次，按和棋处理
+MAX_PLIES = "max_plies"      # 达到步数上限，按和棋处理
+
+@dataclass
+class EngineConfig:
+    """对弈中一方引擎的设置"""
+    name: str
+    depth: Optional[int] = None
+    time: Optional[float] = None  # 每步秒数
+    nodes: Optional[int] = None
+    book: Optional[str] = None
+    tablebases: Optional[str] = None
+
+    @classmethod
+    def parse(cls, spec: str, default_name: str) -> 'EngineConfig':
+        """解析 "name=new,depth=4" 形式的引擎配置"""
+        config = cls(default_name)
+        converters = {'name': str, 'depth': int, 'time': float, 'nodes': int,
+                      'book': str, 'tablebases': str}
+        for item in filter(None, (part.strip() for part in spec.split(','))):
+            key, sep, value = item.partition('=')
+            key = key.strip()
+            if not sep or key not in converters:
+                raise ValueError(f"无效的引擎配置项：{item}")
+            try:
+                setattr(config, key, converters[key](value.strip()))
+            except ValueError:
+                raise ValueError(f"无效的引擎配置项：{item}") from None
+        if config.depth is None and config.time is None and config.nodes is None:
+            config.depth = 3
+        return config
+
+@dataclass
+class GameResult:
+    """一局对弈的结果，result为红方视角的 "1-0"、"0-1" 或 "1/2-1/2" """
+    game: int
+    red: str
+    black: str
+    opening: str
+    result: str
+    reason: str
+    plies: int
+    moves: List[str]
+    elapsed: float
+
+    def score_for(self, name: str) -> float:
+        """指定引擎在这一局的得分"""
+        if self.result == "1/2-1/2":
+            return 0.5
+        winner = self.red if self.result == "1-0" else self.black
+        return 1.0 if winner == name else 0.0
+
+_worker_engines: Dict[str, Any] = {}
+
+def _engine(config: EngineConfig):
+    """工作进程中按配置缓存的(搜索器, 开局库)"""
+    from .engine.search import Searcher
+
+    engine = _worker_engines.get(config.name)
+    if engine is None:
+        book = None
+        if config.book:
+            from .book import OpeningBook
+            book = OpeningBook(config.book)
+        engine = _worker_engines[config.name] = (Searcher(tablebase_dir=config.tablebases), book)
+    return engine
+
+def play_game(game: int, opening: str, red: EngineConfig, black: EngineConfig,
+              max_plies: int = 300, seed: int = 0) -> GameResult:
+    """从opening局面下完一局，返回结果"""
+    from .engine.search import SearchLimits
+
+    start = time.perf_counter()
+    board = Board.from_fen(opening)
+    rng = random.Random(seed)
+    configs = {PieceColor.RED: red, PieceColor.BLACK: black}
+    for config in configs.values():
+        _engine(config)[0].clear()
+    seen = {board.zobrist_key: 1}
+    moves: List[str] = []
+    result, reason = "1/2-1/2", MAX_PLIES
+    while len(moves) < max_plies:
+        side = board.side_to_move
+        if not board.generate_legal_moves(side, use_cache=False):
+            result = "0-1" if side == PieceColor.RED else "1-0"
+            reason = CHECKMATE if board.is_check(side) else NO_MOVES
+            break
+        config = configs[side]
+        searcher, book = _engine(config)
+        move = book.choose(board, rng) if book else None
+        if move is None:
+            move = searcher.search(board, SearchLimits(config.depth, config.time, config.nodes)).best_move
+        success, message = board.move_piece(*move)
+        if not success:
+            raise RuntimeError(f"{config.name} 走出非法走法 {move_to_iccs(*move)}：{message}")
+        moves.append(move_to_iccs(*move))
+        count = seen[board.zobrist_key] = seen.get(board.zobrist_key, 0) + 1
+        if count >= 3:
+            reason = REPETITION
+            break
+    return GameResult(game, red.name, black.name, opening, result, reason,
+                      len(moves), moves, time.perf_counter() - start)
+
+def load_openings(path: str) -> List[str]:
+    """读取开局文件，每行一个FEN或一串从初始局面开始的ICCS走法，#开头为注释"""
+    openings = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for number, line in enumerate(f, 1):
+            line = line.split('#', 1)[0].strip()
+            if not line:
+                continue
+            try:
+                if '/' in line:
+                    board = Board.from_fen(line)
+                else:
+                    board = Board()
+                    for text in line.split():
+                        success, message = board.move_piece(*iccs_to_move(text))
+                        if not success:
+                            raise ValueError(f"{text} {message}")
+            except ValueError as e:
+                raise ValueError(f"{path} 第{number}行：{e}") from None
+            openings.append(board.to_fen())
+    return openings
+
+def randomize_opening(fen: str, plies: int, rng: random.Random) -> str:
+    """在开局局面后随机走plies步，用于增加对局的多样性"""
+    board = Board.from_fen(fen)
+    for _ in range(plies):
+        moves = board.generate_legal_moves(board.side_to_move, use_cache=False)
+        if not moves:
+            break
+        board.move_piece(*rng.choice(moves))
+    return board.to_fen()
+
+def elo_from_score(score: float) -> float:
+    """由得分率换算Elo差"""
+    score = min(max(score, 1e-6), 1 - 1e-6)
+    return -400 * math.log10(1 / score - 1)
+
+def _score_from_elo(elo: float) -> float:
+    return 1 / (1 + 10 ** (-elo / 400))
+
+def _score_stats(wins: int, draws: int, losses: int) -> Tuple[int, float, float]:
+    """对局数、平均得分和单局得分的方差"""
+    games = wins + draws + losses
+    if games == 0:
+        return 0, 0.5, 0.0
+    score = (wins + 0.5 * draws) / games
+    variance = (wins * (1 - score) ** 2 + draws * (0.5 - score) ** 2 + losses * score ** 2) / games
+    return games, score, variance
+
+def elo_estimate(wins: int, draws: int, losses: int) -> Tuple[float, float]:
+    """Elo差及其95%置信区间的半宽"""
+    games, score, variance = _score_stats(wins, draws, losses)
+    elo = elo_from_score(score)
+    if games == 0 or variance == 0:
+        return elo, math.inf
+    margin = 1.96 * math.sqrt(variance / games)
+    return elo, (elo_from_score(score + margin) - elo_from_score(score - margin)) / 2
+
+@dataclass
+class SPRT:
+    """序贯概率比检验：H0为Elo差等于elo0，H1为Elo差等于elo1"""
+    elo0: float = 0.0
+    elo1: float = 10.0
+    alpha: float = 0.05
+    beta: float = 0.05
+
+    @property
+    def bounds(self) -> Tuple[float, float]:
+        """对数似然比的(下界, 上界)，低于下界接受H0，高于上界接受H1"""
+        return (math.log(self.beta / (1 - self.alpha)), math.log((1 - self.beta) / self.alpha))
+
+    def llr(self, wins: int, draws: int, losses: int) -> float:
+        """用正态近似计算对数似然比
+
+        全胜、全负或全和时方差为0，改用多一胜一负时的方差：
+
+        >>> round(SPRT().llr(0, 3, 0), 4)
+        -0.0031
+        >>> round(SPRT().llr(10, 0, 0), 2)
+        0.93
+        """
+        games, score, variance = _score_stats(wins, draws, losses)
+        if games == 0:
+            return 0.0
+        if variance == 0:
+            variance = _score_stats(wins + 1, draws, losses + 1)[2]
+        score0, score1 = _score_from_elo(self.elo0), _score_from_elo(self.elo1)
+        return games * (score1 - score0) * (2 * score - score0 - score1) / (2 * variance)
+
+    def status(self, wins: int, draws: int, losses: int) -> Optional[str]:
+        """达到边界时返回 "H0" 或 "H1"，否则返回None"""
+        llr = self.llr(wins, draws, losses)
+        lower, upper = self.bounds
+        if llr <= lower:
+            return "H0"
+        if llr >= upper:
+            return "H1"
+        return None
+
+def _schedule(openings: List[str], games: int, random_plies: int,
+              seed: int) -> List[Tuple[int, str, bool]]:
+    """生成(对局号, 开局FEN, 被测引擎是否执红)，同一开局交换先后手各下一局"""
+    schedule = []
+    for game in range(games):
+        pair = game // 2
+        opening = openings[pair % len(openings)]
+        if random_plies:
+            opening = randomize_opening(opening, random_plies, random.Random(seed + pair))
+        schedule.append((game, opening, game % 2 == 0))
+    return schedule
+
+def run_match(first: EngineConfig, second: EngineConfig, games: int,
+              openings: Optional[List[str]] = None, workers: Optional[int] = None,
+              output: Optional[str] = None, sprt: Optional[SPRT] = None,
+              max_plies: int = 300, random_plies: int = 0, seed: int = 0,
+              callback=None) -> Tuple[int, int, int]:
+    """并行对弈，返回被测引擎(first)的(胜, 和, 负)
+
+    每局结束后写入output并调用callback(结果, 胜, 和, 负)；给出sprt时达到边界即停止。
+    """
+    if first.name == second.name:
+        raise ValueError("两个引擎配置的名称不能相同")
+    schedule = _schedule(openings or [INITIAL_FEN], games, random_plies, seed)
+    workers = workers or os.cpu_count() or 1
+    wins = draws = losses = 0
+    context = multiprocessing.get_context('spawn')
+    log = open(output, 'a', encoding='utf-8') if output else None
+    executor = ProcessPoolExecutor(max_workers=workers, mp_context=context)
+    try:
+        futures = []
+        for game, opening, first_red in schedule:
+            red, black = (first, second) if first_red else (second, first)
+            futures.append(executor.submit(play_game, game, opening, red, black,
+                                           max_plies, seed + game))
+        for future in as_completed(futures):
+            result = future.result()
+            score = result.score_for(first.name)
+            if score == 1.0:
+                wins += 1
+            elif score == 0.5:
+                draws += 1
+            else:
+                losses += 1
+            if log:
+                log.write(json.dumps(asdict(result), ensure_ascii=False) + "\n")
+                log.flush()
+            if callback:
+                callback(result, wins, draws, losses)
+            if sprt and sprt.status(wins, draws, losses):
+                break
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+        if log:
+            log.close()
+    return wins, draws, losses
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m chess.match", description="引擎自对弈")
+    parser.add_argument("-e", "--engine", action="append", required=True,
+                        help="引擎配置，如 name=new,depth=4；需要指定两次，第一个为被测引擎")
+    parser.add_argument("-g", "--games", type=int, default=100, help="最多对局数（默认100）")
+    parser.add_argument("-j", "--jobs", type=int, default=0,
+                        help="并行对局的进程数，0表示使用全部CPU核心（默认0）")
+    parser.add_argument("-o", "--output", help="追加写入每局结果的JSONL文件")
+    parser.add_argument("--openings", help="开局文件，每行一个FEN或一串ICCS走法")
+    parser.add_argument("--random-plies", type=int, default=0, help="开局后随机走的步数（默认0）")
+    parser.add_argument("--max-plies", type=int, default=300, help="判和的步数上限（默认300）")
+    parser.add_argument("--seed", type=int, default=0, help="随机数种子")
+    parser.add_argument("--sprt", action="store_true", help="进行SPRT检验，达到边界时提前停止")
+    parser.add_argument("--elo0", type=float, default=0.0, help="SPRT的H0 Elo差（默认0）")
+    parser.add_argument("--elo1", type=float, default=10.0, help="SPRT的H1 Elo差（默认10）")
+    parser.add_argument("--alpha", type=float, default=0.05, help="SPRT的第一类错误率（默认0.05）")
+    parser.add_argument("--beta", type=float, default=0.05, help="SPRT的第二类错误率（默认0.05）")
+    args = parser.parse_args(argv)
+
+    if len(args.engine) != 2:
+        parser.error("需要指定两个引擎配置")
+    try:
+        first = EngineConfig.parse(args.engine[0], "engine1")
+        second = EngineConfig.parse(args.engine[1], "engine2")
+        openings = load_openings(args.openings) if args.openings else None
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+    if first.name == second.name:
+        parser.error("两个引擎配置的名称不能相同")
+    if openings is not None and not openings:
+        parser.error("开局文件中没有开局")
+    sprt = SPRT(args.elo0, args.elo1, args.alpha, args.beta) if args.sprt else None
+    reasons = {CHECKMATE: "将死", NO_MOVES: "困毙", REPETITION: "重复局面", MAX_PLIES: "步数上限"}
+
+    def report(result: GameResult, wins: int, draws: int, losses: int):
+        if result.result == "1/2-1/2":
+            outcome = "和棋"
+        else:
+            outcome = (result.red if result.result == "1-0" else result.black) + " 胜"
+        elo, margin = elo_estimate(wins, draws, losses)
+        line = (f"第{result.game + 1}局 {result.red}(红) - {result.black}(黑)：{outcome}"
+                f"（{reasons[result.reason]}，{result.plies}步）  "
+                f"胜-和-负 {wins}-{draws}-{losses}  Elo {elo:+.1f} ± {margin:.1f}")
+        if sprt:
+            lower, upper = sprt.bounds
+            line += f"  LLR {sprt.llr(wins, draws, losses):.2f} ({lower:.2f}, {upper:.2f})"
+        print(line, flush=True)
+
+    wins, draws, losses = run_match(first, second, args.games, openings, args.jobs or None,
+                                    args.output, sprt, args.max_plies, args.random_plies,
+                                    args.seed, report)
+    elo, margin = elo_estimate(wins, draws, losses)
+    print(f"{first.name} 对 {second.name}：胜-和-负 {wins}-{draws}-{losses}  Elo {elo:+.1f} ± {margin:.1f}")
+    if sprt:
+        status = sprt.status(wins, draws, losses)
+        if status == "H1":
+            print(f"SPRT：接受H1，{first.name} 至少强 {sprt.elo1:g} Elo")
+        elif status == "H0":
+            print(f"SPRT：接受H0，{first.name} 没有强 {sprt.elo1:g} Elo")
+        else:
+            print("SPRT：未得出结论")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,23 @@
+from typing import Tuple
+from .piece import Position
+
+# ICCS坐标记谱：列用a-i表示(x=0-8)，行用0-9表示(y=0-9，红方底线为0)，如 "h2e2"
+
+FILES = "abcdefghi"
+
+def square_to_iccs(position: Position) -> str:
+    """将棋盘坐标转换为ICCS格子名"""
+    return f"{FILES[position.x]}{position.y}"
+
+def move_to_iccs(from_pos: Position, to_pos: Position) -> str:
+    """将一步棋转换为ICCS记法"""
+    return square_to_iccs(from_pos) + square_to_iccs(to_pos)
+
+def iccs_to_move(text: str) -> Tuple[Position, Position]:
+    """解析ICCS记法（如 "h2e2" 或 "H2-E2"），返回(起点, 终点)"""
+    text = text.strip().lower().replace("-", "")
+    if len(text) != 4 or text[0] not in FILES or text[2] not in FILES \
+            or not text[1].isdigit() or not text[3].isdigit():
+        raise ValueError(f"无效的ICCS走法：{text}")
+    return (Position(FILES.index(text[0]), int(text[1])),
+            Position(FILES.index(text[2]), int(text[3])))
@@ -0,0 +1,116 @@
+"""走法生成器节点计数工具
+
+用法：
+    python -m chess.perft -d 4
+    python -m chess.perft -d 5 --divide --jobs 8
+    python -m chess.perft -d 3 --file game.chess --backend bitboard
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from .board import Board, BACKEND_OBJECTS, BACKEND_BITBOARD
+from .piece import PieceColor, Position
+from .notation import move_to_iccs
+
+Move = Tuple[Position, Position]
+
+def perft(board: Board, depth: int) -> int:
+    """统计从当前局面（board.side_to_move先走）出发depth层合法走法树的叶子数"""
+    moves = board.generate_legal_moves(board.side_to_move, use_cache=False)
+    if depth <= 1:
+        return len(moves) if depth == 1 else 1
+    nodes = 0
+    for from_pos, to_pos in moves:
+        captured = board.make_move(from_pos, to_pos)
+        nodes += perft(board, depth - 1)
+        board.unmake_move(from_pos, to_pos, captured)
+    return nodes
+
+def divide(board: Board, depth: int) -> List[Tuple[Move, int]]:
+    """按根节点走法分别统计叶子数"""
+    results = []
+    for from_pos, to_pos in board.generate_legal_moves(board.side_to_move, use_cache=False):
+        captured = board.make_move(from_pos, to_pos)
+        results.append(((from_pos, to_pos), perft(board, depth - 1)))
+        board.unmake_move(from_pos, to_pos, captured)
+    return results
+
+def _perft_root_move(args) -> int:
+    """进程池任务：在子进程中重建局面并统计一个根走法下的叶子数"""
+    state, backend, from_xy, to_xy, depth = args
+    board = Board.from_bytes(state, backend)
+    from_pos, to_pos = Position(*from_xy), Position(*to_xy)
+    board.make_move(from_pos, to_pos)
+    return perft(board, depth - 1)
+
+def parallel_divide(board: Board, depth: int, jobs: int) -> List[Tuple[Move, int]]:
+    """把根节点走法分配到进程池中统计"""
+    moves = board.generate_legal_moves(board.side_to_move, use_cache=False)
+    state = board.to_bytes()
+    tasks = [
+        (state, board.backend, (f.x, f.y), (t.x, t.y), depth)
+        for f, t in moves
+    ]
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        counts = list(executor.map(_perft_root_move, tasks))
+    return list(zip(moves, counts))
+
+def load_board(path: Optional[str], backend: str, fen: Optional[str] = None) -> Board:
+    """从FEN串或存档文件读取局面，都未指定时使用初始局面"""
+    if fen:
+        return Board.from_fen(fen, backend)
+    if not path:
+        return Board(backend)
+    with open(path, 'r', encoding='utf-8') as f:
+        state: Dict[str, Any] = json.load(f)
+    if 'fen' in state:
+        return Board.from_fen(state['fen'], backend)
+    board = Board.from_dict(state['board'], backend)  # 旧版JSON存档
+    if 'current_player' in state:
+        board.set_side_to_move(PieceColor[state['current_player']])
+    return board
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m chess.perft", description="统计合法走法树的节点数")
+    parser.add_argument("-d", "--depth", type=int, default=3, help="搜索深度（默认3）")
+    parser.add_argument("-f", "--file", help="从存档文件读取局面，默认使用初始局面")
+    parser.add_argument("--fen", help="使用FEN串指定局面")
+    parser.add_argument("--divide", action="store_true", help="按根节点走法分别输出节点数")
+    parser.add_argument("-j", "--jobs", type=int, default=1,
+                        help="并行进程数，0表示使用全部CPU核心（默认1）")
+    parser.add_argument("--backend", choices=[BACKEND_OBJECTS, BACKEND_BITBOARD],
+                        default=BACKEND_OBJECTS, help="走法生成后端")
+    args = parser.parse_args(argv)
+
+    if args.depth < 1:
+        parser.error("深度必须大于0")
+    board = load_board(args.file, args.backend, args.fen)
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+
+    start = time.perf_counter()
+    if jobs > 1:
+        results = parallel_divide(board, args.depth, jobs)
+    elif args.divide:
+        results = divide(board, args.depth)
+    else:
+        results = None
+        nodes = perft(board, args.depth)
+    if results is not None:
+        nodes = sum(count for _, count in results)
+    elapsed = time.perf_counter() - start
+
+    if args.divide and results is not None:
+        for (from_pos, to_pos), count in results:
+            print(f"{move_to_iccs(from_pos, to_pos)}: {count}")
+        print(f"走法数: {len(results)}")
+    nps = nodes / elapsed if elapsed > 0 else 0.0
+    print(f"深度 {args.depth}: {nodes} 个节点，用时 {elapsed:.3f} 秒，{nps:,.0f} 节点/秒")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,11 +1,13 @@
 from enum import Enum
-from dataclasses import dataclass
 from typing import List, Tuple
 
 class PieceColor(Enum):
     RED = "红"
     BLACK = "黑"
 
+    # 成员是单例且按身份比较，用对象哈希代替Enum按名称计算的哈希，加快各类按颜色查表
+    __hash__ = object.__hash__
+
 class PieceType(Enum):
     KING = "帅将"
     ADVISOR = "士"
@@ -15,42 +17,86 @@ class PieceType(Enum):
     CANNON = "炮"
     PAWN = "兵卒"
 
-@dataclass
+    __hash__ = object.__hash__
+
 class Position:
-    x: int  # 0-8
-    y: int  # 0-9
+    """棋盘上的交叉点
+
+    90个交叉点在导入时预先创建，Position(x, y)直接返回同一个不可变对象，
+    因此比较、哈希和作为字典键都很快，走法生成也不再分配新对象。
+    """
+    __slots__ = ('x', 'y', 'index')
+
+    def __new__(cls, x: int, y: int) -> 'Position':
+        if 0 <= x <= 8 and 0 <= y <= 9:
+            return SQUARES[y * 9 + x]
+        raise ValueError(f"坐标超出棋盘：({x}, {y})")
+
+    @classmethod
+    def from_index(cls, index: int) -> 'Position':
+        """由0-89的格子下标取得交叉点"""
+        return SQUARES[index]
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Position是不可变对象")
+
+    def __hash__(self) -> int:
+        return self.index
+
+    def __reduce__(self):
+        # 反序列化时重新取得预先创建的对象
+        return (Position, (self.x, self.y))
+
+    def __repr__(self) -> str:
+        return f"Position(x={self.x}, y={self.y})"
+
+def _create_squares():
+    squares = []
+    for index in range(90):
+        square = object.__new__(Position)
+        object.__setattr__(square, 'x', index % 9)   # 0-8
+        object.__setattr__(square, 'y', index // 9)  # 0-9
+        object.__setattr__(square, 'index', index)
+        squares.append(square)
+    return tuple(squares)
+
+SQUARES = _create_squares()  # 按格子下标(y * 9 + x)排列的全部交叉点
+
+# 棋子名称表：(颜色, 类型) -> 中文名称
+PIECE_NAMES = {
+    (PieceColor.RED, PieceType.KING): "帅",
+    (PieceColor.RED, PieceType.ADVISOR): "仕",
+    (PieceColor.RED, PieceType.ELEPHANT): "相",
+    (PieceColor.RED, PieceType.HORSE): "马",
+    (PieceColor.RED, PieceType.CHARIOT): "车",
+    (PieceColor.RED, PieceType.CANNON): "炮",
+    (PieceColor.RED, PieceType.PAWN): "兵",
+    (PieceColor.BLACK, PieceType.KING): "将",
+    (PieceColor.BLACK, PieceType.ADVISOR): "士",
+    (PieceColor.BLACK, PieceType.ELEPHANT): "象",
+    (PieceColor.BLACK, PieceType.HORSE): "马",
+    (PieceColor.BLACK, PieceType.CHARIOT): "车",
+    (PieceColor.BLACK, PieceType.CANNON): "炮",
+    (PieceColor.BLACK, PieceType.PAWN): "卒",
+}
 
 class Piece:
+    """棋子基类；使用__slots__，名称和走法参数都放在类级别的表中"""
+    __slots__ = ('color', 'piece_type', 'position')
+
     def __init__(self, color: PieceColor, piece_type: PieceType, position: Position):
         self.color = color
         self.piece_type = piece_type
         self.position = position
-        
+
     @property
     def name(self) -> str:
         """返回棋子的中文名称"""
-        if self.color == PieceColor.RED:
-            names = {
-                PieceType.KING: "帅",
-                PieceType.ADVISOR: "仕",
-                PieceType.ELEPHANT: "相",
-                PieceType.HORSE: "马",
-                PieceType.CHARIOT: "车",
-                PieceType.CANNON: "炮",
-                PieceType.PAWN: "兵"
-            }
-        else:
-            names = {
-                PieceType.KING: "将",
-                PieceType.ADVISOR: "士",
-                PieceType.ELEPHANT: "象",
-                PieceType.HORSE: "马",
-                PieceType.CHARIOT: "车",
-                PieceType.CANNON: "炮",
-                PieceType.PAWN: "卒"
-            }
-        return names[self.piece_type]
+        return PIECE_NAMES[self.color, self.piece_type]
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.color.name}, {self.position!r})"
 
     def get_possible_moves(self, board) -> List[Position]:
         """获取所有可能的移动位置，需要在子类中实现"""
-        raise NotImplementedError
\ No newline at end of file
+        raise NotImplementedError
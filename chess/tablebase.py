@@ -0,0 +1,378 @@
+"""残局库：用逆向分析求解子力很少的残局
+
+子力组合写作"红方-黑方"，如 "KR-KAA"（车帅对双士将）、"KNP-K"。字母与FEN相同：
+K将帅、A士、B相象、N马、R车、C炮、P兵卒，每方必须有且只有一个K。
+
+每种棋子只在它能到达的格子上编号（将帅9格、士5格、相7格、兵55格、其余90格），
+可到达的格子由pieces/specific_pieces.py中的走法在空棋盘上推出。局面下标为
+走子方 * 摆法数 + 各棋子格子编号按位置进制组合的结果，同类棋子的不同排列各占一个下标。
+
+生成时先对每个局面用Board生成合法走法，得到后继局面（吃子后的局面查子力更少的
+残局库，必要时递归生成），再用NumPy按杀棋步数逐层回推。结果以.npy文件保存，
+每个局面一个整数：正数n表示走子方n步（半回合）内杀棋，负数-n表示走子方
+n-1步后被杀，0表示和棋或不合法局面。查询时以内存映射方式打开，只读取用到的页。
+
+用法：
+    python -m chess.tablebase generate KR-KAA -o tablebases
+    python -m chess.tablebase probe --fen "<FEN>" -d tablebases
+"""
+import argparse
+import itertools
+import os
+import sys
+import time
+from array import array
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .board import Board, PIECE_CLASSES
+from .piece import PieceColor, PieceType, Position, SQUARES
+
+Move = Tuple[Position, Position]
+
+# 默认的残局库目录，可用环境变量XIANGQI_TABLEBASES指定
+DEFAULT_DIRECTORY = os.environ.get("XIANGQI_TABLEBASES", "tablebases")
+MAX_TABLE_SIZE = 50_000_000  # 单个残局库的局面数上限
+
+WIN, DRAW, LOSS = 1, 0, -1
+
+_LETTERS = {
+    'K': PieceType.KING,
+    'A': PieceType.ADVISOR,
+    'B': PieceType.ELEPHANT,
+    'N': PieceType.HORSE,
+    'R': PieceType.CHARIOT,
+    'C': PieceType.CANNON,
+    'P': PieceType.PAWN,
+}
+_TYPE_LETTERS = {piece_type: letter for letter, piece_type in _LETTERS.items()}
+_TYPE_ORDER = {piece_type: order for order, piece_type in enumerate(_LETTERS.values())}
+
+@dataclass
+class TablebaseResult:
+    """残局库查询结果：result为WIN/DRAW/LOSS（走子方视角），plies为到杀棋的半回合数"""
+    result: int
+    plies: int
+
+def _opponent(color: PieceColor) -> PieceColor:
+    return PieceColor.BLACK if color == PieceColor.RED else PieceColor.RED
+
+def _reachable_squares() -> Dict[Tuple[PieceColor, PieceType], Tuple[int, ...]]:
+    """从初始局面出发，按各棋子类在空棋盘上的走法求出每种棋子能到达的格子"""
+    board = Board(setup=False)
+    starts: Dict[Tuple[PieceColor, PieceType], List[int]] = {}
+    for piece in Board().pieces:
+        starts.setdefault((piece.color, piece.piece_type), []).append(piece.position.index)
+    squares = {}
+    for (color, piece_type), indexes in starts.items():
+        seen = set(indexes)
+        pending = list(indexes)
+        while pending:
+            piece = PIECE_CLASSES[piece_type](color, SQUARES[pending.pop()])
+            for move in piece.get_possible_moves(board):
+                if move.index not in seen:
+                    seen.add(move.index)
+                    pending.append(move.index)
+        squares[color, piece_type] = tuple(sorted(seen))
+    return squares
+
+REACHABLE_SQUARES = _reachable_squares()
+
+def parse_material(material: str) -> List[Tuple[PieceColor, PieceType]]:
+    """解析子力组合，返回按规范顺序排列的(颜色, 类型)列表"""
+    sides = material.upper().split('-')
+    if len(sides) != 2:
+        raise ValueError(f"无效的子力组合：{material}")
+    pieces = []
+    for color, letters in zip((PieceColor.RED, PieceColor.BLACK), sides):
+        if letters.count('K') != 1 or any(letter not in _LETTERS for letter in letters):
+            raise ValueError(f"无效的子力组合：{material}")
+        types = sorted((_LETTERS[letter] for letter in letters), key=_TYPE_ORDER.get)
+        pieces.extend((color, piece_type) for piece_type in types)
+    return pieces
+
+def material_name(pieces) -> str:
+    """由(颜色, 类型)序列得到规范的子力组合名称"""
+    sides = {PieceColor.RED: [], PieceColor.BLACK: []}
+    for color, piece_type in pieces:
+        sides[color].append(piece_type)
+    return '-'.join(
+        ''.join(_TYPE_LETTERS[piece_type] for piece_type in sorted(sides[color], key=_TYPE_ORDER.get))
+        for color in (PieceColor.RED, PieceColor.BLACK)
+    )
+
+class _Layout:
+    """某个子力组合的局面编号方式"""
+
+    def __init__(self, material: str):
+        self.slots = parse_material(material)
+        self.name = material_name(self.slots)
+        self.squares = [REACHABLE_SQUARES[slot] for slot in self.slots]
+        # local[i][格子下标] = 该格在第i个棋子可到达格子中的序号，不可到达为-1
+        self.local = []
+        for squares in self.squares:
+            local = [-1] * 90
+            for number, square in enumerate(squares):
+                local[square] = number
+            self.local.append(local)
+        self.strides = []
+        stride = 1
+        for squares in reversed(self.squares):
+            self.strides.append(stride)
+            stride *= len(squares)
+        self.strides.reverse()
+        self.placements = stride
+        self.size = 2 * stride
+
+    def index(self, placed: List[Tuple[PieceColor, PieceType, int]], side: PieceColor) -> int:
+        """由(颜色, 类型, 格子下标)列表和走子方计算局面下标，棋子不可能出现在该格时返回-1"""
+        taken = [False] * len(self.slots)
+        index = 0 if side == PieceColor.RED else self.placements
+        for color, piece_type, square in placed:
+            for slot, kind in enumerate(self.slots):
+                if not taken[slot] and kind == (color, piece_type):
+                    taken[slot] = True
+                    number = self.local[slot][square]
+                    if number < 0:
+                        return -1
+                    index += number * self.strides[slot]
+                    break
+            else:
+                return -1
+        return index
+
+def decode_value(value: int) -> TablebaseResult:
+    if value > 0:
+        return TablebaseResult(WIN, value)
+    if value < 0:
+        return TablebaseResult(LOSS, -value - 1)
+    return TablebaseResult(DRAW, 0)
+
+def _without(material: str, color: PieceColor, piece_type: PieceType) -> str:
+    slots = parse_material(material)
+    slots.remove((color, piece_type))
+    return material_name(slots)
+
+def generate(material: str, directory: str = DEFAULT_DIRECTORY, verbose: bool = False,
+             _tables: Optional[Dict[str, np.ndarray]] = None) -> np.ndarray:
+    """生成子力组合的残局库（及吃子后需要的子残局库），写入directory并返回数组"""
+    layout = _Layout(material)
+    tables = _tables if _tables is not None else {}
+    if layout.name in tables:
+        return tables[layout.name]
+    if layout.size > MAX_TABLE_SIZE:
+        raise ValueError(f"残局库过大：{layout.name} 共 {layout.size} 个局面")
+
+    # 先准备吃子后转入的子残局库
+    for color, piece_type in set(layout.slots):
+        if piece_type != PieceType.KING:
+            generate(_without(layout.name, color, piece_type), directory, verbose, tables)
+
+    start = time.perf_counter()
+    board = Board(setup=False)
+    pieces = [PIECE_CLASSES[piece_type](color, SQUARES[0]) for color, piece_type in layout.slots]
+    slot_of = {piece: slot for slot, piece in enumerate(pieces)}
+    board.pieces.extend(pieces)
+
+    size = layout.size
+    valid = np.zeros(size, dtype=bool)
+    counts = np.zeros(size, dtype=np.int32)
+    successors = (array('q'), array('q'))  # 按走子方分开，使后继按局面下标顺序排列
+    # 吃子后的局面值已知，作为附加节点放在数组末尾，按局面值去重
+    external_values: Dict[int, int] = {}
+
+    for placement, squares in enumerate(itertools.product(*layout.squares)):
+        if len(set(squares)) != len(squares):
+            continue
+        for piece, square in zip(pieces, squares):
+            piece.position = SQUARES[square]
+        board._rebuild_grid()
+        for side_number, side in enumerate((PieceColor.RED, PieceColor.BLACK)):
+            index = side_number * layout.placements + placement
+            # 轮到side走时对方的将帅不能正被攻击
+            if board.is_square_attacked(board.get_king(_opponent(side)).position, side):
+                continue
+            valid[index] = True
+            successor_base = (1 - side_number) * layout.placements + placement  # 对方走棋的同一摆法
+            moves = board.generate_legal_moves(side, use_cache=False)
+            counts[index] = len(moves)
+            side_successors = successors[side_number]
+            for from_pos, to_pos in moves:
+                piece = board.grid[from_pos.index]
+                captured = board.grid[to_pos.index]
+                if captured is None:
+                    slot = slot_of[piece]
+                    local = layout.local[slot]
+                    side_successors.append(
+                        successor_base + (local[to_pos.index] - local[from_pos.index]) * layout.strides[slot]
+                    )
+                    continue
+                sub = _Layout(_without(layout.name, captured.color, captured.piece_type))
+                placed = [
+                    (other.color, other.piece_type, to_pos.index if other is piece else other.position.index)
+                    for other in pieces if other is not captured
+                ]
+                value = int(tables[sub.name][sub.index(placed, _opponent(side))])
+                node = external_values.setdefault(value, size + len(external_values))
+                side_successors.append(node)
+
+    # 逐层回推：第k轮确定k步杀（有后继为k-1步被杀）和k步被杀（后继全为不超过k-1步的胜局）
+    external = sorted(external_values.items(), key=lambda item: item[1])
+    total = size + len(external)
+    status = np.zeros(total, dtype=np.int8)
+    distance = np.zeros(total, dtype=np.int32)
+    for value, node in external:
+        decoded = decode_value(value)
+        status[node] = decoded.result
+        distance[node] = decoded.plies
+    succ = np.concatenate([np.frombuffer(part, dtype=np.int64) if part else np.zeros(0, dtype=np.int64)
+                           for part in successors])
+    owner = np.repeat(np.arange(size), counts)
+
+    mated = valid & (counts == 0)
+    status[:size][mated] = LOSS
+    max_external = int(distance[size:].max()) if external else 0
+    k = 1
+    while True:
+        succ_status = status[succ]
+        succ_distance = distance[succ]
+        unresolved = valid & (status[:size] == 0)
+        wins = np.bincount(owner, weights=(succ_status == LOSS) & (succ_distance == k - 1), minlength=size)
+        settled = np.bincount(owner, weights=(succ_status == WIN) & (succ_distance <= k - 1), minlength=size)
+        win_now = unresolved & (wins > 0)
+        loss_now = unresolved & (counts > 0) & (settled == counts)
+        status[:size][win_now] = WIN
+        distance[:size][win_now] = k
+        status[:size][loss_now] = LOSS
+        distance[:size][loss_now] = k
+        if not win_now.any() and not loss_now.any() and k > max_external + 1:
+            break
+        k += 1
+
+    values = np.where(status[:size] == WIN, distance[:size],
+                      np.where(status[:size] == LOSS, -(distance[:size] + 1), 0))
+    dtype = np.int8 if np.abs(values).max(initial=0) < 127 else np.int16
+    table = values.astype(dtype)
+    tables[layout.name] = table
+    os.makedirs(directory, exist_ok=True)
+    np.save(os.path.join(directory, f"{layout.name}.npy"), table)
+    if verbose:
+        wins = int((table > 0).sum())
+        longest = int(table.max(initial=0))
+        print(f"{layout.name}: {size} 个局面，{int(valid.sum())} 个合法，{wins} 个走子方胜，"
+              f"最长 {longest} 步杀，用时 {time.perf_counter() - start:.1f} 秒")
+    return table
+
+class Tablebases:
+    """残局库目录，按需以内存映射方式打开各子力组合的残局库"""
+
+    def __init__(self, directory: str = DEFAULT_DIRECTORY):
+        self.directory = directory
+        self._tables: Dict[str, Optional[np.ndarray]] = {}
+        self._layouts: Dict[str, _Layout] = {}
+
+    def _table(self, name: str) -> Optional[np.ndarray]:
+        if name not in self._tables:
+            path = os.path.join(self.directory, f"{name}.npy")
+            self._tables[name] = np.load(path, mmap_mode='r') if os.path.exists(path) else None
+            if self._tables[name] is not None:
+                self._layouts[name] = _Layout(name)
+        return self._tables[name]
+
+    def probe(self, board: Board) -> Optional[TablebaseResult]:
+        """查询board.side_to_move视角的胜负和杀棋步数，没有对应残局库或局面不合法时返回None"""
+        opponent_king = board.get_king(_opponent(board.side_to_move))
+        if opponent_king is None or board.is_square_attacked(opponent_king.position, board.side_to_move):
+            return None
+        placed = [(piece.color, piece.piece_type, piece.position.index)
+                  for piece in board.grid if piece is not None]
+        side = board.side_to_move
+        name = material_name((color, piece_type) for color, piece_type, _ in placed)
+        table = self._table(name)
+        if table is None:
+            # 红黑互换并上下翻转后查询对称的残局库
+            placed = [(_opponent(color), piece_type, (9 - square // 9) * 9 + square % 9)
+                      for color, piece_type, square in placed]
+            side = _opponent(side)
+            name = material_name((color, piece_type) for color, piece_type, _ in placed)
+            table = self._table(name)
+            if table is None:
+                return None
+        index = self._layouts[name].index(placed, side)
+        if index < 0:
+            return None
+        return decode_value(int(table[index]))
+
+    def best_move(self, board: Board) -> Optional[Move]:
+        """按残局库选择最佳走法：胜时最快杀棋，负时尽量拖延，和棋时保持和棋"""
+        current = self.probe(board)
+        if current is None:
+            return None
+        best = None
+        best_key = None
+        for from_pos, to_pos in board.generate_legal_moves(board.side_to_move, use_cache=False):
+            captured = board.make_move(from_pos, to_pos)
+            after = self.probe(board)
+            board.unmake_move(from_pos, to_pos, captured)
+            if after is None:
+                continue
+            # 后继局面是对方视角：对方被杀越快越好，对方获胜越晚越好
+            if after.result == LOSS:
+                key = (2, -after.plies)
+            elif after.result == DRAW:
+                key = (1, 0)
+            else:
+                key = (0, after.plies)
+            if best_key is None or key > best_key:
+                best, best_key = (from_pos, to_pos), key
+        return best
+
+_opened: Dict[str, Tablebases] = {}
+
+def open_tablebases(directory: Optional[str] = None) -> Tablebases:
+    """取得（并缓存）某个目录的残局库"""
+    directory = directory or DEFAULT_DIRECTORY
+    if directory not in _opened:
+        _opened[directory] = Tablebases(directory)
+    return _opened[directory]
+
+def main(argv=None):
+    from .notation import move_to_iccs
+
+    parser = argparse.ArgumentParser(prog="python -m chess.tablebase", description="生成和查询残局库")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    generate_parser = commands.add_parser("generate", help="生成残局库")
+    generate_parser.add_argument("materials", nargs="+", help="子力组合，如 KR-KAA、KNP-K")
+    generate_parser.add_argument("-o", "--output", default=DEFAULT_DIRECTORY, help="残局库目录")
+
+    probe_parser = commands.add_parser("probe", help="查询局面")
+    probe_parser.add_argument("--fen", required=True, help="查询的局面")
+    probe_parser.add_argument("-d", "--directory", default=DEFAULT_DIRECTORY, help="残局库目录")
+    args = parser.parse_args(argv)
+
+    if args.command == "generate":
+        tables: Dict[str, np.ndarray] = {}
+        for material in args.materials:
+            generate(material, args.output, verbose=True, _tables=tables)
+        return 0
+
+    board = Board.from_fen(args.fen)
+    tablebases = Tablebases(args.directory)
+    result = tablebases.probe(board)
+    if result is None:
+        print("没有对应的残局库或局面不合法")
+    elif result.result == DRAW:
+        print("和棋")
+    else:
+        outcome = "胜" if result.result == WIN else "负"
+        print(f"走子方{outcome}，{result.plies} 步（半回合）")
+    move = tablebases.best_move(board)
+    if move is not None:
+        print(f"最佳走法 {move_to_iccs(*move)}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
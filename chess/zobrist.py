@@ -0,0 +1,58 @@
+import random
+from collections import OrderedDict
+from typing import Any, Dict, List, Hashable
+from .piece import PieceColor, PieceType
+
+# Zobrist键：每种颜色、每种棋子在每个格子上对应一个64位随机数，
+# 局面键为所有棋子键与走子方键的异或，走子时增量更新
+
+_ZOBRIST_SEED = 20240601
+_BOARD_SIZE = 90
+
+def _make_keys():
+    rng = random.Random(_ZOBRIST_SEED)
+    piece_keys: Dict[PieceColor, Dict[PieceType, List[int]]] = {}
+    for color in PieceColor:
+        piece_keys[color] = {}
+        for piece_type in PieceType:
+            piece_keys[color][piece_type] = [rng.getrandbits(64) for _ in range(_BOARD_SIZE)]
+    return piece_keys, rng.getrandbits(64)
+
+PIECE_KEYS, SIDE_KEY = _make_keys()  # SIDE_KEY在黑方走棋时异或进局面键
+
+_MISSING = object()
+
+class PositionCache:
+    """以局面键为索引的有界LRU缓存"""
+
+    def __init__(self, maxsize: int = 4096):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """查找缓存，命中时将其移到最近使用的位置"""
+        value = self._entries.get(key, _MISSING)
+        if value is _MISSING:
+            self.misses += 1
+            return default
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key: Hashable, value: Any):
+        """写入缓存，超出容量时淘汰最久未使用的条目"""
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        """清空缓存"""
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0